@@ -0,0 +1,80 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union
+
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import TeamRoundTagSets, win_correlations
+
+
+class BootstrapIntervals:
+    """
+    Bootstrap confidence intervals of tag/win correlations, indexed by map id and tag id of the tag sets
+    they were calculated from. NaN where no replicate had a defined correlation.
+    """
+
+    def __init__(self, low: np.ndarray, high: np.ndarray, confidence: float, replicates: int):
+        self.low = low
+        self.high = high
+        self.confidence = confidence
+        self.replicates = replicates
+
+    def interval(self, map_id: int, tag_id: int) -> tuple[float, float]:
+        return float(self.low[map_id, tag_id]), float(self.high[map_id, tag_id])
+
+
+def bootstrap_win_correlations(tag_sets: TeamRoundTagSets, replicates: int = 1000, confidence: float = 0.95,
+                               seed: int = 0, workers: Union[int, None] = None,
+                               chunk_size: int = 250) -> BootstrapIntervals:
+    """
+    Percentile bootstrap of correlation between every tag and victory on every map. Team-rounds of a map are
+    resampled with replacement, `chunk_size` replicates at a time. Each (map, chunk) has its own seed derived
+    from `seed`, so results don't depend on the number of `workers` processes.
+    """
+    entry_tags, entry_rows, row_wins, row_maps = tag_sets.arrays()
+    n_maps, n_tags = len(tag_sets.maps), len(tag_sets.tags)
+    chunks = [min(chunk_size, replicates - start) for start in range(0, replicates, chunk_size)]
+    tasks = []
+    for map_id in range(n_maps):
+        rows = np.flatnonzero(row_maps == map_id)
+        local_rows = np.full(len(row_maps), -1, dtype=np.int64)
+        local_rows[rows] = np.arange(len(rows))
+        entries = row_maps[entry_rows] == map_id
+        tag_matrix = np.zeros((len(rows), n_tags))
+        tag_matrix[local_rows[entry_rows[entries]], entry_tags[entries]] = 1.0
+        wins = row_wins[rows].astype(np.float64)
+        for chunk_id, size in enumerate(chunks):
+            tasks.append((map_id, tag_matrix, wins, size, np.random.SeedSequence(seed, spawn_key=(map_id, chunk_id))))
+
+    if workers is None or workers <= 1:
+        results = [_resample(*task[1:]) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_resample, *zip(*[task[1:] for task in tasks])))
+
+    alpha = (1 - confidence) / 2
+    low = np.full((n_maps, n_tags), np.nan)
+    high = np.full((n_maps, n_tags), np.nan)
+    for map_id in range(n_maps):
+        replicated = np.concatenate([r for task, r in zip(tasks, results) if task[0] == map_id]) \
+            if len(chunks) > 0 else np.zeros((0, n_tags))
+        defined = ~np.isnan(replicated).all(axis=0)
+        if defined.any():
+            low[map_id, defined], high[map_id, defined] = \
+                np.nanquantile(replicated[:, defined], [alpha, 1 - alpha], axis=0)
+    return BootstrapIntervals(low, high, confidence, replicates)
+
+
+def _resample(tag_matrix: np.ndarray, wins: np.ndarray, replicates: int,
+              seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    :return: replicates x tags correlations of team-rounds drawn with replacement
+    """
+    n = len(wins)
+    if n == 0:
+        return np.full((replicates, tag_matrix.shape[1]), np.nan)
+    draws = np.random.default_rng(seed).integers(0, n, size=(replicates, n))
+    # how many times each team-round was drawn in each replicate
+    weights = np.bincount((draws + np.arange(replicates)[:, None] * n).ravel(),
+                          minlength=replicates * n).reshape(replicates, n).astype(np.float64)
+    return win_correlations(np.full(replicates, n), weights @ wins,
+                            weights @ tag_matrix, weights @ (tag_matrix * wins[:, None]))
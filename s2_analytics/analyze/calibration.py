@@ -0,0 +1,137 @@
+from array import array
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from s2_analytics.analyze.tag_correlation import DAY_MS
+from s2_analytics.importer import GameDetails, RoundData, GameFilter, epoch_millis
+
+GAMES = "game"
+ROUNDS = "round"
+
+# probabilities are clipped to avoid infinite log-loss of certain predictions
+_EPSILON = 1e-15
+
+
+class _Predictions:
+    def __init__(self, filters: list[str]):
+        self.times = array("q")
+        self.probabilities = array("d")
+        self.outcomes = array("b")
+        self.filter_masks = {name: array("b") for name in filters}
+
+    def add(self, time: int, probability: float, outcome: bool, filter_results: dict[str, bool]):
+        self.times.append(time)
+        self.probabilities.append(probability)
+        self.outcomes.append(outcome)
+        for name, result in filter_results.items():
+            self.filter_masks[name].append(result)
+
+
+class WinProbabilityCalibration:
+    """
+    Compares win probability predicted for Red team before a game with actual outcome of the game (`GAMES`)
+    and of each of its rounds (`ROUNDS`). Ties are left out.
+
+    Named `game_filters` are evaluated during import so that any of them can be applied to queries afterwards,
+    without importing games again.
+    """
+
+    def __init__(self, game_filters: dict[str, GameFilter] = None):
+        self.game_filters = game_filters if game_filters is not None else {}
+        self._predictions = {GAMES: _Predictions(list(self.game_filters)),
+                             ROUNDS: _Predictions(list(self.game_filters))}
+        self._game_id = None
+        self._filter_results = {}
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        if round.winner is None:
+            return
+        self._add(ROUNDS, game, round.winner == "Red")
+
+    def process_game(self, game: GameDetails):
+        if game.winner is None:
+            return
+        self._add(GAMES, game, game.winner == "Red")
+
+    def _add(self, level: str, game: GameDetails, red_won: bool):
+        if self._game_id != game.id:
+            self._game_id = game.id
+            self._filter_results = {name: f(game) for name, f in self.game_filters.items()}
+        self._predictions[level].add(epoch_millis(game.start_time), game.team_win_probabilities["Red"], red_won,
+                                     self._filter_results)
+
+    def arrays(self, level: str = GAMES, filter: Union[str, None] = None) \
+            -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: times (epoch ms), predicted probabilities and outcomes (1 if Red won), in order of time
+        """
+        predictions = self._predictions[level]
+        times = np.frombuffer(predictions.times, dtype=np.int64)
+        probabilities = np.frombuffer(predictions.probabilities, dtype=np.float64)
+        outcomes = np.frombuffer(predictions.outcomes, dtype=np.int8).astype(np.float64)
+        if filter is not None:
+            mask = np.frombuffer(predictions.filter_masks[filter], dtype=np.int8).astype(bool)
+            times, probabilities, outcomes = times[mask], probabilities[mask], outcomes[mask]
+        order = np.argsort(times, kind="stable")
+        return times[order], probabilities[order], outcomes[order]
+
+    def brier_score(self, level: str = GAMES, filter: Union[str, None] = None) -> float:
+        _, probabilities, outcomes = self.arrays(level, filter)
+        return float(np.mean(_squared_errors(probabilities, outcomes))) if len(outcomes) > 0 else float("nan")
+
+    def log_loss(self, level: str = GAMES, filter: Union[str, None] = None) -> float:
+        _, probabilities, outcomes = self.arrays(level, filter)
+        return float(np.mean(_log_losses(probabilities, outcomes))) if len(outcomes) > 0 else float("nan")
+
+    def reliability(self, bins: Union[int, list[float]] = 10, level: str = GAMES,
+                    filter: Union[str, None] = None) -> pd.DataFrame:
+        """
+        Reliability curve: mean predicted probability and observed frequency of Red wins in each probability bin
+        :param bins: number of equal-width bins over [0, 1] or bin edges
+        """
+        _, probabilities, outcomes = self.arrays(level, filter)
+        edges = np.linspace(0, 1, bins + 1) if isinstance(bins, int) else np.asarray(bins, dtype=np.float64)
+        n_bins = len(edges) - 1
+        bin_ids = np.clip(np.searchsorted(edges, probabilities, side="right") - 1, 0, n_bins - 1)
+        counts = np.bincount(bin_ids, minlength=n_bins)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            predicted = np.bincount(bin_ids, weights=probabilities, minlength=n_bins) / counts
+            observed = np.bincount(bin_ids, weights=outcomes, minlength=n_bins) / counts
+        return pd.DataFrame({
+            "bin_start": edges[:-1],
+            "bin_end": edges[1:],
+            "predicted": predicted,
+            "observed": observed,
+            "count": counts,
+        })
+
+    def rolling(self, window_days: int, level: str = GAMES, filter: Union[str, None] = None) -> pd.DataFrame:
+        """
+        Brier score and log-loss over `window_days` days ending with each day having predictions
+        """
+        times, probabilities, outcomes = self.arrays(level, filter)
+        if len(times) == 0:
+            return pd.DataFrame(columns=["date", "brier_score", "log_loss", "count"])
+        cumulative_errors = np.concatenate([[0], np.cumsum(_squared_errors(probabilities, outcomes))])
+        cumulative_losses = np.concatenate([[0], np.cumsum(_log_losses(probabilities, outcomes))])
+        days = np.unique(times // DAY_MS)
+        ends = np.searchsorted(times, (days + 1) * DAY_MS, side="left")
+        starts = np.searchsorted(times, (days + 1 - window_days) * DAY_MS, side="left")
+        counts = ends - starts
+        return pd.DataFrame({
+            "date": pd.to_datetime(days * DAY_MS, unit="ms"),
+            "brier_score": (cumulative_errors[ends] - cumulative_errors[starts]) / counts,
+            "log_loss": (cumulative_losses[ends] - cumulative_losses[starts]) / counts,
+            "count": counts,
+        })
+
+
+def _squared_errors(probabilities: np.ndarray, outcomes: np.ndarray) -> np.ndarray:
+    return (probabilities - outcomes) ** 2
+
+
+def _log_losses(probabilities: np.ndarray, outcomes: np.ndarray) -> np.ndarray:
+    p = np.clip(probabilities, _EPSILON, 1 - _EPSILON)
+    return -(outcomes * np.log(p) + (1 - outcomes) * np.log(1 - p))
@@ -0,0 +1,178 @@
+from array import array
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import Interner
+from s2_analytics.importer import GameDetails, RoundData, EventData, EventFlagCap, epoch_millis
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TEAMS = ["Red", "Blue"]
+
+
+class CapTimings:
+    """
+    Flag caps of all rounds, sorted by round and time since round start. Caps of round `r` are
+    `offsets[r]:offsets[r + 1]`; `cap_score_diff` is Red minus Blue caps after each cap.
+    """
+
+    def __init__(self, maps: Interner, players: Interner, round_games: np.ndarray, round_numbers: np.ndarray,
+                 round_maps: np.ndarray, round_winners: np.ndarray, cap_rounds: np.ndarray,
+                 cap_millis: np.ndarray, cap_teams: np.ndarray, cap_players: np.ndarray):
+        self.maps = maps
+        self.players = players
+        self.round_games = round_games
+        self.round_numbers = round_numbers
+        self.round_maps = round_maps
+        self.round_winners = round_winners
+        order = np.lexsort((cap_millis, cap_rounds))
+        self.cap_rounds = cap_rounds[order]
+        self.cap_millis = cap_millis[order]
+        self.cap_teams = cap_teams[order]
+        self.cap_players = cap_players[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(self.cap_rounds, minlength=len(round_maps)))])
+        self.cap_counts = np.diff(self.offsets)
+        cumulative = np.cumsum(np.where(self.cap_teams == 0, 1, -1))
+        before_round = np.concatenate([[0], cumulative])[self.offsets[:-1]]
+        self.cap_score_diff = cumulative - before_round[self.cap_rounds]
+
+    def caps_per_round_by_map(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        n_maps = len(self.maps)
+        rounds = np.bincount(self.round_maps, minlength=n_maps)
+        caps = np.bincount(self.round_maps, weights=self.cap_counts, minlength=n_maps)
+        df = pd.DataFrame({"mapName": self.maps.values, "rounds": rounds, "caps": caps.astype(np.int64),
+                           "avg_caps_per_round": caps / np.maximum(rounds, 1)})
+        return df[df["rounds"] > 0].sort_values("avg_caps_per_round", ascending=False, kind="stable") \
+            .reset_index(drop=True)
+
+    def first_caps(self) -> "pd.DataFrame":
+        """
+        :return: first cap of every round with a cap
+        """
+        import pandas as pd
+
+        rounds = np.flatnonzero(self.cap_counts > 0)
+        first = self.offsets[rounds]
+        return pd.DataFrame({
+            "game": self.round_games[rounds],
+            "round": self.round_numbers[rounds],
+            "mapName": [self.maps.values[m] for m in self.round_maps[rounds]],
+            "team": [TEAMS[t] for t in self.cap_teams[first]],
+            "playfabId": [self.players.values[p] for p in self.cap_players[first]],
+            "seconds": self.cap_millis[first] / 1000,
+        })
+
+    def intervals(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: round of each cap following another cap in the same round, and seconds since the previous cap
+        """
+        same_round = self.cap_rounds[1:] == self.cap_rounds[:-1]
+        return self.cap_rounds[1:][same_round], np.diff(self.cap_millis)[same_round] / 1000
+
+    def comebacks(self, min_deficit: int = 1) -> "pd.DataFrame":
+        """
+        :return: rounds won by a team that was behind by at least `min_deficit` caps at some point
+        """
+        import pandas as pd
+
+        rounds = np.flatnonzero(self.cap_counts > 0)
+        if len(rounds) == 0:
+            return pd.DataFrame(columns=["game", "round", "mapName", "winner", "deficit"])
+        starts = self.offsets[rounds]
+        lowest = np.minimum.reduceat(self.cap_score_diff, starts)
+        highest = np.maximum.reduceat(self.cap_score_diff, starts)
+        winners = self.round_winners[rounds]
+        deficit = np.where(winners == 0, -lowest, np.where(winners == 1, highest, 0))
+        comeback = deficit >= min_deficit
+        rounds = rounds[comeback]
+        return pd.DataFrame({
+            "game": self.round_games[rounds],
+            "round": self.round_numbers[rounds],
+            "mapName": [self.maps.values[m] for m in self.round_maps[rounds]],
+            "winner": [TEAMS[w] for w in self.round_winners[rounds]],
+            "deficit": deficit[comeback],
+        })
+
+    def first_cap_quantiles(self, quantiles: list[float] = (0.1, 0.25, 0.5, 0.75, 0.9),
+                            by_team: bool = False) -> "pd.DataFrame":
+        """
+        :return: quantiles of seconds to first cap of a round on each map (and for each capping team if `by_team`)
+        """
+        import pandas as pd
+
+        rounds = np.flatnonzero(self.cap_counts > 0)
+        first = self.offsets[rounds]
+        groups = self.round_maps[rounds] * (len(TEAMS) if by_team else 1)
+        if by_team:
+            groups = groups + self.cap_teams[first]
+        n_groups = len(self.maps) * (len(TEAMS) if by_team else 1)
+        counts, values = _grouped_quantiles(groups, self.cap_millis[first] / 1000, n_groups, quantiles)
+        present = np.flatnonzero(counts)
+        df = pd.DataFrame({"mapName": [self.maps.values[g // (len(TEAMS) if by_team else 1)] for g in present]})
+        if by_team:
+            df["team"] = [TEAMS[g % len(TEAMS)] for g in present]
+        df["rounds"] = counts[present]
+        for i, q in enumerate(quantiles):
+            df[f"q{q:g}"] = values[present, i]
+        return df
+
+
+def _grouped_quantiles(groups: np.ndarray, values: np.ndarray, n_groups: int,
+                       quantiles) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Linearly interpolated quantiles (as `np.quantile`) of values of each group from a single sort
+    :return: count of values and group x quantile matrix (NaN for empty groups)
+    """
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    positions = starts[:, None] + np.asarray(quantiles)[None, :] * np.maximum(counts - 1, 0)[:, None]
+    result = np.full(positions.shape, np.nan)
+    present = counts > 0
+    below = np.floor(positions[present]).astype(np.int64)
+    above = np.minimum(below + 1, (starts + counts - 1)[present][:, None])
+    fraction = positions[present] - below
+    result[present] = values[below] + (values[above] - values[below]) * fraction
+    return counts, result
+
+
+class CapTimingCollector:
+    """
+    Collects time since round start of every flag cap into arrays of `CapTimings`
+    """
+
+    def __init__(self):
+        self.maps = Interner()
+        self.players = Interner()
+        self._round_games = array("q")
+        self._round_numbers = array("q")
+        self._round_maps = array("q")
+        self._round_winners = array("q")
+        self._cap_rounds = array("q")
+        self._cap_millis = array("q")
+        self._cap_teams = array("q")
+        self._cap_players = array("q")
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        if isinstance(event, EventFlagCap) and event.capping_team in TEAMS:
+            # rounds are numbered in order of processing, the round is recorded after its events
+            self._cap_rounds.append(len(self._round_maps))
+            self._cap_millis.append(epoch_millis(event.timestamp) - epoch_millis(round.start_time))
+            self._cap_teams.append(TEAMS.index(event.capping_team))
+            self._cap_players.append(self.players.intern(event.capping_player_id))
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self._round_games.append(game.id)
+        self._round_numbers.append(round.number)
+        self._round_maps.append(self.maps.intern(round.map))
+        self._round_winners.append(-1 if round.winner is None else TEAMS.index(round.winner))
+
+    def timings(self) -> CapTimings:
+        return CapTimings(self.maps, self.players, *[np.frombuffer(a, dtype=np.int64).copy() for a in [
+            self._round_games, self._round_numbers, self._round_maps, self._round_winners,
+            self._cap_rounds, self._cap_millis, self._cap_teams, self._cap_players]])
@@ -0,0 +1,180 @@
+from array import array
+from typing import Union
+
+import numpy as np
+
+from s2_analytics.importer import GameDetails, RoundData, EventData, EventKill, epoch_millis
+
+TEAMS = ["Red", "Blue"]
+_TEAM_CODES = {team: code for code, team in enumerate(TEAMS)}
+
+# player codes are packed above game-relative millis in sort keys, and rounds above players
+_TIME_BITS = 32
+
+
+class RoundKillSequence:
+    """
+    Kills of a round sorted by time, with players and teams as integer codes.
+    Kills of many rounds can be searched in one pass when players are coded separately in each round.
+    """
+
+    def __init__(self, times: np.ndarray, killers: np.ndarray, victims: np.ndarray, killer_teams: np.ndarray,
+                 victim_teams: np.ndarray):
+        order = np.argsort(times, kind="stable")
+        self.times = times[order] - (times.min() if len(times) > 0 else 0)
+        self.killers = killers[order]
+        self.victims = victims[order]
+        self.killer_teams = killer_teams[order]
+        self.victim_teams = victim_teams[order]
+        # suicides and team kills are deaths, but not kills
+        self.enemy_kills = self.killer_teams != self.victim_teams
+
+    def trades(self, window_ms: int) -> np.ndarray:
+        """
+        :return: index of each kill of a player who killed a teammate of the killer at most `window_ms` earlier
+        """
+        killers, times = self.killers[self.enemy_kills], self.times[self.enemy_kills]
+        victim_teams = self.victim_teams[self.enemy_kills]
+        keys = (killers << _TIME_BITS) + times
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        # latest kill made by the victim of each kill, at or before the kill
+        previous = np.searchsorted(keys, (self.victims[self.enemy_kills] << _TIME_BITS) + times, side="right") - 1
+        found = previous >= 0
+        previous_kill = order[np.maximum(previous, 0)]
+        found &= killers[previous_kill] == self.victims[self.enemy_kills]
+        found &= times - times[previous_kill] <= window_ms
+        found &= victim_teams[previous_kill] == self.killer_teams[self.enemy_kills]
+        return np.flatnonzero(self.enemy_kills)[found]
+
+    def longest_streaks(self, n_players: int) -> np.ndarray:
+        """
+        :return: most kills each player made in a row without dying, indexed by player code
+        """
+        # kills and deaths of each player in order of time; a kill and a death at the same time count kill first
+        players = np.concatenate([self.killers[self.enemy_kills], self.victims])
+        times = np.concatenate([self.times[self.enemy_kills], self.times])
+        is_death = np.concatenate([np.zeros(self.enemy_kills.sum(), dtype=np.int64),
+                                   np.ones(len(self.victims), dtype=np.int64)])
+        order = np.lexsort((is_death, times, players))
+        players, is_death = players[order], is_death[order]
+        # a new streak starts with each player and after each death
+        starts = np.ones(len(players), dtype=bool)
+        starts[1:] = (players[1:] != players[:-1]) | (is_death[:-1] == 1)
+        streaks = np.cumsum(starts) - 1
+        lengths = np.bincount(streaks, weights=1 - is_death).astype(np.int64) if len(streaks) > 0 \
+            else np.zeros(0, dtype=np.int64)
+        result = np.zeros(n_players, dtype=np.int64)
+        np.maximum.at(result, players[starts], lengths)
+        return result
+
+    def multi_kills(self, window_ms: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: killer and number of kills they made within `window_ms` starting with each of their kills
+        """
+        killers, times = self.killers[self.enemy_kills], self.times[self.enemy_kills]
+        keys = np.sort((killers << _TIME_BITS) + times)
+        counts = np.searchsorted(keys, keys + window_ms, side="right") - np.arange(len(keys))
+        return keys >> _TIME_BITS, counts
+
+
+class KillSequenceRoundTagger:
+    """
+    Tags team-rounds by trade kills, kill streaks and multi-kills, e.g. `trades_3+` if team traded
+    at least 3 kills, `streak_5+` if a player of the team made at least 5 kills in a row without dying and
+    `multikill_2+` if a player made 2 kills within `multi_kill_window_ms`.
+    Rounds are tagged when their game ends (`get_game_round_tags`), kills of all rounds of the game are searched
+    in one array pass.
+    """
+
+    def __init__(self, trade_window_ms: int = 3000, multi_kill_window_ms: int = 2000,
+                 trade_thresholds: tuple[int, ...] = (1, 3, 5), streak_thresholds: tuple[int, ...] = (3, 5, 8),
+                 multi_kill_thresholds: tuple[int, ...] = (2, 3)):
+        self.trade_window_ms = trade_window_ms
+        self.multi_kill_window_ms = multi_kill_window_ms
+        self.trade_thresholds = np.array(trade_thresholds)
+        self.streak_thresholds = np.array(streak_thresholds)
+        self.multi_kill_thresholds = np.array(multi_kill_thresholds)
+        # tag of each threshold column, in order trades, streaks, multi-kills
+        self._tag_names = np.array([f"trades_{t}+" for t in trade_thresholds] +
+                                   [f"streak_{t}+" for t in streak_thresholds] +
+                                   [f"multikill_{t}+" for t in multi_kill_thresholds], dtype=object)
+        self.game_round_tags: Union[list[Union[dict[str, list[str]], None]], None] = None
+        self._reset()
+
+    def _reset(self):
+        # kills of the game in progress, converted to arrays when it ends
+        self._kills: list[EventKill] = []
+        # number of kills before the end of each round and whether the round has a winner
+        self._round_ends = array("q")
+        self._decided: list[bool] = []
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        if isinstance(event, EventKill):
+            self._kills.append(event)
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self._round_ends.append(len(self._kills))
+        self._decided.append(round.winner is not None)
+
+    def process_game(self, game: GameDetails):
+        if self.game_round_tags is not None:
+            raise RuntimeError("tags were not collected after last game")
+        kills = self._kills[:self._round_ends[-1] if len(self._round_ends) > 0 else 0]
+        rounds = np.repeat(np.arange(len(self._round_ends), dtype=np.int64),
+                           np.diff(np.frombuffer(self._round_ends, dtype=np.int64), prepend=0))
+        killer_teams = np.array([_TEAM_CODES.get(k.killer_team, -1) for k in kills], dtype=np.int64)
+        victim_teams = np.array([_TEAM_CODES.get(k.victim_team, -1) for k in kills], dtype=np.int64)
+        known = (killer_teams >= 0) & (victim_teams >= 0)
+        times = np.array([epoch_millis(k.timestamp) for k in kills], dtype=np.int64)[known]
+        player_ids = {}
+        players = np.array([player_ids.setdefault(k.killer_id, len(player_ids)) for k in kills] +
+                           [player_ids.setdefault(k.victim_id, len(player_ids)) for k in kills], dtype=np.int64)
+        # players coded separately in each round, so that kills of different rounds don't form sequences
+        rounds = np.concatenate([rounds, rounds])[np.concatenate([known, known])]
+        round_players, codes = np.unique((rounds << _TIME_BITS) + players[np.concatenate([known, known])],
+                                         return_inverse=True)
+        n_kills = int(known.sum())
+        sequence = RoundKillSequence(times, codes[:n_kills], codes[n_kills:], killer_teams[known], victim_teams[known])
+        tagged = self._tagged(sequence, round_players >> _TIME_BITS, len(self._decided))
+        self.game_round_tags = [
+            {team: self._tag_names[tagged[round * len(TEAMS) + team_id]].tolist() for team_id, team in enumerate(TEAMS)}
+            if decided else None for round, decided in enumerate(self._decided)]
+        self._reset()
+
+    def _tagged(self, sequence: RoundKillSequence, player_rounds: np.ndarray, n_rounds: int) -> np.ndarray:
+        """
+        :return: whether each (round, team) reaches each threshold, in order of tag names
+        """
+        n_teams = len(TEAMS)
+        n_cells = n_rounds * n_teams
+        traded = sequence.trades(self.trade_window_ms)
+        trades = np.bincount(player_rounds[sequence.killers[traded]] * n_teams + sequence.killer_teams[traded],
+                             minlength=n_cells)
+
+        # (round, team) of each player as of their kills and deaths in the round
+        player_teams = np.full(len(player_rounds), -1, dtype=np.int64)
+        player_teams[sequence.victims] = sequence.victim_teams
+        player_teams[sequence.killers] = sequence.killer_teams
+        player_cells = player_rounds * n_teams + player_teams
+        streaks = sequence.longest_streaks(len(player_rounds))
+        longest_streaks = np.zeros(n_cells, dtype=np.int64)
+        known = player_teams >= 0
+        np.maximum.at(longest_streaks, player_cells[known], streaks[known])
+
+        killers, counts = sequence.multi_kills(self.multi_kill_window_ms)
+        multi_kills = np.zeros(n_cells, dtype=np.int64)
+        np.maximum.at(multi_kills, player_cells[killers], counts)
+
+        return np.concatenate([trades[:, None] >= self.trade_thresholds,
+                               longest_streaks[:, None] >= self.streak_thresholds,
+                               multi_kills[:, None] >= self.multi_kill_thresholds], axis=1)
+
+    def get_game_round_tags(self) -> Union[list[Union[dict[str, list[str]], None]], None]:
+        """
+        :return: tags of both teams of each round of the last game, in order of `process_round` calls,
+        None for rounds without a winner
+        """
+        tags = self.game_round_tags
+        self.game_round_tags = None
+        return tags
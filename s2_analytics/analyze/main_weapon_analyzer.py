@@ -1,44 +1,97 @@
-from collections import defaultdict
+from array import array
 from typing import Union, Set
 
-from s2_analytics.analyze.fris_weapon_usage_analyzer import FriWeaponUsageAnalyzer
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import Interner
 from s2_analytics.importer import GameDetails, RoundData, EventData, EventKill
 
 
+class WeaponColumns:
+    """
+    Column layout of kill matrices: one column for each weapon of each group of collected weapons
+    """
+
+    def __init__(self, collected_weapons_groups: list[list[str]]):
+        self.weapons = Interner()
+        self.columns_by_weapon: dict[str, list[int]] = {}
+        column_groups = []
+        column_weapons = []
+        for group_id, group in enumerate(collected_weapons_groups):
+            for weapon in group:
+                self.columns_by_weapon.setdefault(weapon, []).append(len(column_groups))
+                column_groups.append(group_id)
+                column_weapons.append(self.weapons.intern(weapon))
+        self.column_groups = np.array(column_groups, dtype=np.int64)
+        self.count = len(column_groups)
+        # one-hot matrices summing columns by group and by weapon
+        self.group_matrix = np.zeros((self.count, len(collected_weapons_groups)))
+        self.group_matrix[np.arange(self.count), self.column_groups] = 1
+        self.weapon_matrix = np.zeros((self.count, len(self.weapons)))
+        self.weapon_matrix[np.arange(self.count), column_weapons] = 1
+
+
+class TeamRoster:
+    """
+    Players of a game indexed in order of appearance, with index of their team
+    """
+
+    def __init__(self, teams: dict[str, list[str]]):
+        self.teams = list(teams.keys())
+        self.player_index: dict[str, int] = {}
+        team_ids = []
+        for team_id, players in enumerate(teams.values()):
+            for player in players:
+                if player in self.player_index:
+                    team_ids[self.player_index[player]] = team_id
+                else:
+                    self.player_index[player] = len(team_ids)
+                    team_ids.append(team_id)
+        self.team_ids = np.array(team_ids, dtype=np.int64)
+
+
 class MainWeaponAnalyzer:
     """
     Calculates main weapons used by a team based on kill log
     """
 
-    def __init__(self, collected_weapons_groups: list[list[str]], teams: dict[str, list[str]]):
-        self.team_by_player = {}
-        self.teams = teams.keys()
-        for team, players in teams.items():
-            for player in players:
-                self.team_by_player[player] = team
-        self._analyzers: dict[str, FriWeaponUsageAnalyzer] = defaultdict(
-            lambda: FriWeaponUsageAnalyzer(collected_weapons_groups))
+    def __init__(self, collected_weapons_groups: list[list[str]], teams: dict[str, list[str]],
+                 columns: Union[WeaponColumns, None] = None):
+        self.columns = columns if columns is not None else WeaponColumns(collected_weapons_groups)
+        self.roster = TeamRoster(teams)
+        self.teams = self.roster.teams
+        self._kill_cells = array("q")
 
     def process_kill(self, killer_id: str, weapon: str):
-        self._analyzers[killer_id].process_kill(killer_id, weapon)
+        player = self.roster.player_index.get(killer_id)
+        columns = self.columns.columns_by_weapon.get(weapon)
+        if player is None or columns is None:
+            return
+        for column in columns:
+            self._kill_cells.append(player * self.columns.count + column)
+
+    def reset(self):
+        self._kill_cells = array("q")
 
     def report(self) -> dict:
-        main_weapons = {team: defaultdict(lambda: 0) for team in self.teams}
-        mains = []
-        for player in self.team_by_player:
-            players_main_weapons = []
-            for key, value in self._analyzers[player].report().items():
-                if value > 0.5:
-                    players_main_weapons.append(key)
-            for weapon in players_main_weapons:
-                team = self.team_by_player[player]
-                mains.append(team + "/" + player + "/" + weapon)
-                main_weapons[team][weapon] += 1
-
-        result = {}
-        for team in main_weapons:
-            result[team] = dict(main_weapons[team])
+        n_players, n_columns = len(self.roster.team_ids), self.columns.count
+        kills = np.bincount(np.frombuffer(self._kill_cells, dtype=np.int64), minlength=n_players * n_columns) \
+            .reshape(n_players, n_columns)
+        group_kills = (kills @ self.columns.group_matrix)[:, self.columns.column_groups]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(group_kills > 0, kills / group_kills, 0.)
+        usage = ratios @ self.columns.weapon_matrix
+        players, weapons = np.nonzero(usage > 0.5)
 
+        team_ids = self.roster.team_ids[players]
+        counts = np.zeros((len(self.teams), len(self.columns.weapons)), dtype=np.int64)
+        np.add.at(counts, (team_ids, weapons), 1)
+        # weapons of each team in order of first appearance, as players and weapons are listed
+        _, first = np.unique(team_ids * len(self.columns.weapons) + weapons, return_index=True)
+        result = {team: {} for team in self.teams}
+        for i in np.sort(first):
+            team_id, weapon = team_ids[i], weapons[i]
+            result[self.teams[team_id]][self.columns.weapons.values[weapon]] = int(counts[team_id, weapon])
         return result
 
 
@@ -46,13 +99,16 @@ class MainWeaponRoundTagger:
     def __init__(self, collected_weapons: list[list[str]]):
         self.analyzer: Union[MainWeaponAnalyzer, None] = None
         self.collected_weapons = collected_weapons
+        self.columns = WeaponColumns(collected_weapons)
         self.round_tags_by_team = None
+        self._game_id = None
 
     def process_round(self, round: RoundData, game: GameDetails):
         if self.round_tags_by_team is not None:
             raise RuntimeError("tags were not collected after last round")
+        analyzer = self._analyzer(game)
         if round.winner is not None:
-            report = self.analyzer.report()
+            report = analyzer.report()
             self.round_tags_by_team = {}
             for team, main_weapons in report.items():
                 team_tags = {}
@@ -60,13 +116,18 @@ class MainWeaponRoundTagger:
                     team_tags[f"{weapon}_x{count}"] = 1
                 self.round_tags_by_team[team] = team_tags
 
-        self.analyzer = None
+        analyzer.reset()
 
     def process_event(self, event: EventData, round: RoundData, game: GameDetails):
-        if self.analyzer is None:
-            self.analyzer = MainWeaponAnalyzer(self.collected_weapons, game.teams)
         if isinstance(event, EventKill):
-            self.analyzer.process_kill(event.killer_id, event.weapon)
+            self._analyzer(game).process_kill(event.killer_id, event.weapon)
+
+    def _analyzer(self, game: GameDetails) -> MainWeaponAnalyzer:
+        # roster is built once per game and kills are reset after each round
+        if self.analyzer is None or self._game_id != game.id:
+            self.analyzer = MainWeaponAnalyzer(self.collected_weapons, game.teams, self.columns)
+            self._game_id = game.id
+        return self.analyzer
 
     def get_team_round_tags(self) -> dict[str, Set[str]]:
         tags = self.round_tags_by_team
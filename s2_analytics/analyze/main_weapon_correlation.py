@@ -5,8 +5,10 @@ Correlation = namedtuple("Correlation", ["correlation", "sample_count"])
 
 
 class OneWeaponCorrelations:
-    def __init__(self, tag: str, correlations_by_map: dict[str, Correlation]):
+    def __init__(self, tag: str, correlations_by_map: dict[str, Correlation],
+                 confidence_intervals: Union[dict[str, tuple[float, float]], None] = None):
         self.tag = tag
+        self._confidence_intervals = confidence_intervals if confidence_intervals is not None else {}
         self._total_samples = 0
         for correlation in correlations_by_map.values():
             assert isinstance(correlation.sample_count, int)
@@ -30,7 +32,15 @@ class OneWeaponCorrelations:
         else:
             return self._correlations_by_map[map].sample_count
 
+    def confidence_interval(self, map: str) -> Union[tuple[float, float], None]:
+        """
+        :return: (low, high) bootstrap confidence interval of correlation on the map, if it was calculated
+        """
+        return self._confidence_intervals.get(map)
+
     def filter(self, min_samples):
-        return OneWeaponCorrelations(self.tag, {map: data for map, data in self._correlations_by_map.items() if data.sample_count >= min_samples})
+        correlations = {map: data for map, data in self._correlations_by_map.items() if data.sample_count >= min_samples}
+        intervals = {map: interval for map, interval in self._confidence_intervals.items() if map in correlations}
+        return OneWeaponCorrelations(self.tag, correlations, intervals)
 
 
@@ -0,0 +1,117 @@
+from array import array
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from s2_analytics.analyze.tag_correlation import Interner, DAY_MS
+from s2_analytics.constants import TIERS
+from s2_analytics.importer import GameRatings, GameDetails, epoch_millis
+
+# player codes are packed above epoch millis in sort keys; 2^42 ms is ~139 years
+_TIME_BITS = 42
+
+
+class RatingHistory:
+    """
+    Ratings of players after each of their games, sorted by player code and game start time (epoch ms).
+    Records of player with code `c` are `offsets[c]:offsets[c + 1]`.
+    """
+
+    def __init__(self, players: Interner, codes: np.ndarray, times: np.ndarray, mu: np.ndarray,
+                 sigma: np.ndarray, tiers: np.ndarray):
+        order = np.lexsort((times, codes))
+        self.players = players
+        self.codes = codes[order]
+        self.times = times[order]
+        self.mu = mu[order]
+        self.sigma = sigma[order]
+        self.tiers = tiers[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(self.codes, minlength=len(players)))])
+        self._keys = (self.codes.astype(np.int64) << _TIME_BITS) + self.times
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def lower_skill_estimate(self) -> np.ndarray:
+        return self.mu - 3 * self.sigma
+
+    def trajectory(self, player: str) -> pd.DataFrame:
+        """
+        :return: time, mu, sigma and tier after each game of the player
+        """
+        code = self.players.ids.get(player)
+        start, end = (0, 0) if code is None else (self.offsets[code], self.offsets[code + 1])
+        return pd.DataFrame({
+            "time": pd.to_datetime(self.times[start:end], unit="ms"),
+            "mu": self.mu[start:end],
+            "sigma": self.sigma[start:end],
+            "tier": self.tiers[start:end],
+        })
+
+    def ratings_at(self, players: list[str], time_ms: Union[int, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rating of each player after their last game started at or before `time_ms`
+        :return: mu and sigma arrays, NaN for players unknown or not rated yet at that time
+        """
+        codes = np.array([self.players.ids.get(p, -1) for p in players], dtype=np.int64)
+        known = codes >= 0
+        times = np.broadcast_to(np.asarray(time_ms, dtype=np.int64), codes.shape)
+        # index of the last record with key <= (code, time)
+        last = np.searchsorted(self._keys, (codes << _TIME_BITS) + times, side="right") - 1
+        rated = known & (last >= 0)
+        rated[rated] &= self.codes[last[rated]] == codes[rated]
+        mu = np.full(len(codes), np.nan)
+        sigma = np.full(len(codes), np.nan)
+        mu[rated] = self.mu[last[rated]]
+        sigma[rated] = self.sigma[last[rated]]
+        return mu, sigma
+
+    def rating_at(self, player: str, time_ms: int) -> tuple[float, float]:
+        mu, sigma = self.ratings_at([player], time_ms)
+        return float(mu[0]), float(sigma[0])
+
+    def tier_distribution_per_day(self) -> pd.DataFrame:
+        """
+        :return: number of players active on each (UTC) day by tier after their last game of that day,
+            indexed by date with a column per tier
+        """
+        days = self.times // DAY_MS
+        # records are sorted by player and time, so the last record of a player's day precedes a change of either
+        last_of_day = np.ones(len(days), dtype=bool)
+        last_of_day[:-1] = (self.codes[1:] != self.codes[:-1]) | (days[1:] != days[:-1])
+        active_days, inverse = np.unique(days[last_of_day], return_inverse=True)
+        counts = np.bincount(inverse * len(TIERS) + self.tiers[last_of_day],
+                             minlength=len(active_days) * len(TIERS)).reshape(len(active_days), len(TIERS))
+        return pd.DataFrame(counts, columns=TIERS, index=pd.to_datetime(active_days * DAY_MS, unit="ms"))
+
+
+class RatingHistoryCollector:
+    """
+    Collects ratings of players after every game into columns of a `RatingHistory`
+    """
+
+    def __init__(self):
+        self.players = Interner()
+        self._codes = array("q")
+        self._times = array("q")
+        self._mu = array("d")
+        self._sigma = array("d")
+        self._tiers = array("q")
+
+    def process_ratings(self, ratings: GameRatings, game: GameDetails):
+        time = epoch_millis(game.start_time)
+        self._codes.extend(self.players.intern(player) for player in ratings.players)
+        self._times.extend([time] * len(ratings))
+        self._mu.extend(ratings.mu_after)
+        self._sigma.extend(ratings.sigma_after)
+        self._tiers.extend(ratings.tier_after)
+
+    def history(self) -> RatingHistory:
+        return RatingHistory(self.players,
+                             np.frombuffer(self._codes, dtype=np.int64).copy(),
+                             np.frombuffer(self._times, dtype=np.int64).copy(),
+                             np.frombuffer(self._mu, dtype=np.float64).copy(),
+                             np.frombuffer(self._sigma, dtype=np.float64).copy(),
+                             np.frombuffer(self._tiers, dtype=np.int64).copy())
@@ -0,0 +1,148 @@
+import math
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from s2_analytics.analyze.tag_correlation import Interner
+from s2_analytics.importer import GameDetails, RoundData
+
+
+class TrueSkillParameters:
+    def __init__(self, mu: float = 25.0, sigma: float = 25.0 / 3, beta: float = 25.0 / 6, tau: float = 25.0 / 300):
+        self.mu = mu
+        self.sigma = sigma
+        self.beta = beta
+        self.tau = tau
+
+
+class RatingReplay:
+    """
+    Re-rates players by replaying games with TrueSkill updates for two teams (draws are skipped).
+    Games are rated as a whole, or each round separately with ratings kept per (player, map) if `per_map` is set.
+    Which games are rated is decided by game filters of the import.
+
+    State can be saved with `save` and loaded with `load` to continue from the last rated game;
+    games up to that one are ignored when imported again.
+    """
+
+    def __init__(self, parameters: TrueSkillParameters = None, per_map: bool = False, capacity: int = 1024):
+        self.parameters = parameters if parameters is not None else TrueSkillParameters()
+        self.per_map = per_map
+        self.players = Interner()
+        self.mu = np.full(capacity, self.parameters.mu)
+        self.sigma = np.full(capacity, self.parameters.sigma)
+        self.games = np.zeros(capacity, dtype=np.int64)
+        self.last_game_id: Union[int, None] = None
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        if not self.per_map or self._processed(game) or round.winner is None:
+            return
+        self._rate(game.teams, round.winner, lambda player: f"{player}|{round.map}")
+
+    def process_game(self, game: GameDetails):
+        if self._processed(game):
+            return
+        if not self.per_map and game.winner is not None:
+            self._rate(game.teams, game.winner, lambda player: player)
+        self.last_game_id = game.id
+
+    def _processed(self, game: GameDetails) -> bool:
+        return self.last_game_id is not None and game.id <= self.last_game_id
+
+    def _indices(self, keys: list[str]) -> np.ndarray:
+        indices = np.array([self.players.intern(key) for key in keys], dtype=np.int64)
+        if len(self.players) > len(self.mu):
+            self._grow(max(len(self.players), 2 * len(self.mu)))
+        return indices
+
+    def _grow(self, capacity: int):
+        added = capacity - len(self.mu)
+        self.mu = np.concatenate([self.mu, np.full(added, self.parameters.mu)])
+        self.sigma = np.concatenate([self.sigma, np.full(added, self.parameters.sigma)])
+        self.games = np.concatenate([self.games, np.zeros(added, dtype=np.int64)])
+
+    def _rate(self, teams: dict[str, list[str]], winner: str, key):
+        if len(teams) != 2:
+            return
+        winners = self._indices([key(p) for p in teams[winner]])
+        losers = self._indices([key(p) for team, players in teams.items() if team != winner for p in players])
+        if len(winners) == 0 or len(losers) == 0:
+            return
+        players = np.concatenate([winners, losers])
+        p = self.parameters
+        variance = self.sigma[players] ** 2 + p.tau ** 2
+        c2 = variance.sum() + len(players) * p.beta ** 2
+        c = math.sqrt(c2)
+        t = (self.mu[winners].sum() - self.mu[losers].sum()) / c
+        v, w = _v_w_win(t)
+        sign = np.concatenate([np.ones(len(winners)), -np.ones(len(losers))])
+        self.mu[players] += sign * variance / c * v
+        self.sigma[players] = np.sqrt(variance * np.maximum(1 - variance / c2 * w, 1e-12))
+        self.games[players] += 1
+
+    def rating(self, player: str, map: str = None) -> tuple[float, float]:
+        index = self.players.ids.get(player if map is None else f"{player}|{map}")
+        if index is None:
+            return self.parameters.mu, self.parameters.sigma
+        return float(self.mu[index]), float(self.sigma[index])
+
+    def ratings(self) -> pd.DataFrame:
+        """
+        :return: player (and map in per-map mode), mu, sigma, conservative estimate (mu - 3 sigma) and games rated
+        """
+        n = len(self.players)
+        df = pd.DataFrame({"player": self.players.values})
+        if self.per_map:
+            df[["player", "map"]] = df["player"].str.split("|", n=1, expand=True)
+        df["mu"] = self.mu[:n]
+        df["sigma"] = self.sigma[:n]
+        df["lowerSkillEstimate"] = df["mu"] - 3 * df["sigma"]
+        df["games"] = self.games[:n]
+        return df.sort_values("lowerSkillEstimate", ascending=False).reset_index(drop=True)
+
+    def resume_date(self):
+        """
+        :return: start time of the last rated game; import games from there to continue rating
+        """
+        if self.last_game_id is None:
+            return None
+        return datetime.utcfromtimestamp(self.last_game_id / 1000)
+
+    def save(self, path: str):
+        n = len(self.players)
+        np.savez(path, players=np.array(self.players.values, dtype=str), mu=self.mu[:n], sigma=self.sigma[:n],
+                 games=self.games[:n], last_game_id=np.array([-1 if self.last_game_id is None else self.last_game_id]),
+                 per_map=np.array([self.per_map]),
+                 parameters=np.array([self.parameters.mu, self.parameters.sigma, self.parameters.beta,
+                                      self.parameters.tau]))
+
+    @classmethod
+    def load(cls, path: str) -> "RatingReplay":
+        with np.load(path) as data:
+            replay = cls(TrueSkillParameters(*data["parameters"].tolist()), per_map=bool(data["per_map"][0]),
+                         capacity=max(len(data["players"]), 1))
+            for player in data["players"].tolist():
+                replay.players.intern(player)
+            n = len(replay.players)
+            replay.mu[:n] = data["mu"]
+            replay.sigma[:n] = data["sigma"]
+            replay.games[:n] = data["games"]
+            last_game_id = int(data["last_game_id"][0])
+            replay.last_game_id = None if last_game_id < 0 else last_game_id
+        return replay
+
+
+def _v_w_win(t: float) -> tuple[float, float]:
+    """
+    Mean and variance multipliers of TrueSkill update for the winning side, t being the performance difference
+    """
+    cdf = 0.5 * (1 + math.erf(t / math.sqrt(2)))
+    pdf = math.exp(-t * t / 2) / math.sqrt(2 * math.pi)
+    if cdf < 1e-300:
+        # asymptotic value for large upsets
+        v = -t
+    else:
+        v = pdf / cdf
+    return v, v * (v + t)
@@ -0,0 +1,555 @@
+import json
+import os
+import sqlite3
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterable, Union, Iterator, Callable
+
+import numpy as np
+
+from s2_analytics.analyze.main_weapon_correlation import Correlation
+from s2_analytics.importer import epoch_millis
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class Interner:
+    """
+    Maps strings to dense integer ids in order of first appearance
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def intern(self, value: str) -> int:
+        id = self.ids.get(value)
+        if id is None:
+            id = len(self.values)
+            self.ids[value] = id
+            self.values.append(value)
+        return id
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value: str):
+        return value in self.ids
+
+
+def win_correlations(rows, wins, tag_rows, tag_wins) -> np.ndarray:
+    """
+    Phi coefficient (pearson correlation of two binary variables) between each tag and victory,
+    calculated from counts of the contingency table. Undefined (NaN) when tag or victory is constant.
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    wins = np.asarray(wins, dtype=np.float64)
+    tag_rows = np.asarray(tag_rows, dtype=np.float64)
+    tag_wins = np.asarray(tag_wins, dtype=np.float64)
+    if rows.ndim < tag_rows.ndim:
+        rows = np.expand_dims(rows, -1)
+        wins = np.expand_dims(wins, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (rows * tag_wins - tag_rows * wins) / \
+            (np.sqrt(tag_rows * (rows - tag_rows)) * np.sqrt(wins * (rows - wins)))
+
+
+class TagWinCounts:
+    """
+    Sufficient statistics for tag/win correlations: count of team-rounds and won team-rounds
+    overall and for each tag id
+    """
+
+    def __init__(self, rows, wins, tag_rows: np.ndarray, tag_wins: np.ndarray):
+        self.rows = rows
+        self.wins = wins
+        self.tag_rows = tag_rows
+        self.tag_wins = tag_wins
+
+    def correlations(self) -> np.ndarray:
+        return win_correlations(self.rows, self.wins, self.tag_rows, self.tag_wins)
+
+    def __add__(self, other: "TagWinCounts") -> "TagWinCounts":
+        return TagWinCounts(self.rows + other.rows, self.wins + other.wins,
+                            self.tag_rows + other.tag_rows, self.tag_wins + other.tag_wins)
+
+    def __sub__(self, other: "TagWinCounts") -> "TagWinCounts":
+        return TagWinCounts(self.rows - other.rows, self.wins - other.wins,
+                            self.tag_rows - other.tag_rows, self.tag_wins - other.tag_wins)
+
+    def take(self, groups: np.ndarray) -> "TagWinCounts":
+        return TagWinCounts(self.rows[groups], self.wins[groups], self.tag_rows[groups], self.tag_wins[groups])
+
+
+class TagPairCounts:
+    """
+    Sufficient statistics for win correlations of tag pairs: count of team-rounds and won team-rounds overall,
+    and of those having both tags `first[i]` and `second[i]` (tag ids, `first` < `second`)
+    """
+
+    def __init__(self, rows: int, wins: int, first: np.ndarray, second: np.ndarray, pair_rows: np.ndarray,
+                 pair_wins: np.ndarray):
+        self.rows = rows
+        self.wins = wins
+        self.first = first
+        self.second = second
+        self.pair_rows = pair_rows
+        self.pair_wins = pair_wins
+
+    def correlations(self) -> np.ndarray:
+        return win_correlations(self.rows, self.wins, self.pair_rows, self.pair_wins)
+
+
+def correlations_by_group(groups: list[str], tags: list[str], tag_mask: np.ndarray,
+                          counts: TagWinCounts) -> dict[str, dict[str, Correlation]]:
+    """
+    :param counts: per-group (e.g. per-map) counts, rows matching `groups`
+    :return: correlation and sample count of tags present in each group (and allowed by `tag_mask`)
+    """
+    correlations = counts.correlations()
+    result = {}
+    for i, group in enumerate(groups):
+        if counts.rows[i] == 0:
+            continue
+        present = np.flatnonzero((counts.tag_rows[i] > 0) & tag_mask)
+        result[group] = {tags[t]: Correlation(float(correlations[i, t]), int(counts.tag_rows[i, t])) for t in present}
+    return result
+
+
+class TeamRoundTagSets:
+    """
+    Sparse binary team-round x tag matrix. Each team-round (row) keeps integer ids of its tags,
+    whether it was won, on which map and when (epoch millis) it was played.
+    """
+
+    def __init__(self):
+        self.tags = Interner()
+        self.maps = Interner()
+        self._entry_tags = array("i")
+        self._row_offsets = array("q", [0])
+        self._row_wins = array("b")
+        self._row_maps = array("i")
+        self._row_times = array("q")
+        self._snapshot: Union[None, tuple] = None
+        self._times: Union[None, np.ndarray] = None
+
+    def add(self, map: str, tags: Iterable[str], win: bool, time: int = 0):
+        for tag in tags:
+            self._entry_tags.append(self.tags.intern(tag))
+        self._row_offsets.append(len(self._entry_tags))
+        self._row_wins.append(1 if win else 0)
+        self._row_maps.append(self.maps.intern(map))
+        self._row_times.append(time)
+        self._snapshot = None
+
+    @property
+    def row_count(self) -> int:
+        return len(self._row_wins)
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: tag id and row index of every entry, victory flag and map id of every row
+        """
+        if self._snapshot is None:
+            self._times = np.frombuffer(self._row_times, dtype=np.int64).copy()
+            offsets = np.frombuffer(self._row_offsets, dtype=np.int64)
+            entry_rows = np.repeat(np.arange(self.row_count, dtype=np.int64), np.diff(offsets))
+            self._snapshot = (np.frombuffer(self._entry_tags, dtype=np.int32).copy(), entry_rows,
+                              np.frombuffer(self._row_wins, dtype=np.int8).astype(np.int64),
+                              np.frombuffer(self._row_maps, dtype=np.int32).copy())
+        return self._snapshot
+
+    def row_times(self) -> np.ndarray:
+        self.arrays()
+        return self._times
+
+    def map_mask(self, map: str) -> np.ndarray:
+        _, _, _, row_maps = self.arrays()
+        if map not in self.maps:
+            return np.zeros(len(row_maps), dtype=bool)
+        return row_maps == self.maps.ids[map]
+
+    def counts(self, row_mask: Union[None, np.ndarray] = None) -> TagWinCounts:
+        entry_tags, entry_rows, row_wins, _ = self.arrays()
+        if row_mask is not None:
+            entry_mask = row_mask[entry_rows]
+            entry_tags, entry_rows = entry_tags[entry_mask], entry_rows[entry_mask]
+            rows, wins = int(row_mask.sum()), int(row_wins[row_mask].sum())
+        else:
+            rows, wins = len(row_wins), int(row_wins.sum())
+        n_tags = len(self.tags)
+        tag_rows = np.bincount(entry_tags, minlength=n_tags)
+        tag_wins = np.bincount(entry_tags, weights=row_wins[entry_rows], minlength=n_tags).astype(np.int64)
+        return TagWinCounts(rows, wins, tag_rows, tag_wins)
+
+    def counts_by_map(self) -> TagWinCounts:
+        """
+        Counts for all maps in a single pass. Rows of the result are indexed by map id.
+        """
+        _, _, _, row_maps = self.arrays()
+        return self.counts_by_group(row_maps, len(self.maps))
+
+    def counts_by_group(self, row_groups: np.ndarray, n_groups: int) -> TagWinCounts:
+        """
+        Counts for each group of rows in a single pass
+        :param row_groups: group id of every row
+        """
+        entry_tags, entry_rows, row_wins, _ = self.arrays()
+        n_tags = len(self.tags)
+        rows = np.bincount(row_groups, minlength=n_groups)
+        wins = np.bincount(row_groups, weights=row_wins, minlength=n_groups).astype(np.int64)
+        cells = row_groups[entry_rows].astype(np.int64) * n_tags + entry_tags
+        tag_rows = np.bincount(cells, minlength=n_groups * n_tags).reshape(n_groups, n_tags)
+        tag_wins = np.bincount(cells, weights=row_wins[entry_rows], minlength=n_groups * n_tags) \
+            .astype(np.int64).reshape(n_groups, n_tags)
+        return TagWinCounts(rows, wins, tag_rows, tag_wins)
+
+    def pair_counts(self, row_mask: Union[None, np.ndarray] = None, tag_mask: Union[None, np.ndarray] = None,
+                    min_support: int = 1) -> TagPairCounts:
+        """
+        Co-occurrence counts of all pairs of tags (allowed by `tag_mask`) from products of the dense
+        team-round x tag incidence matrix. Only pairs found together in at least `min_support` rows are kept.
+        """
+        entry_tags, entry_rows, row_wins, _ = self.arrays()
+        rows = np.arange(self.row_count) if row_mask is None else np.flatnonzero(row_mask)
+        tags = np.arange(len(self.tags)) if tag_mask is None else np.flatnonzero(tag_mask)
+        row_index = np.full(self.row_count, -1, dtype=np.int64)
+        row_index[rows] = np.arange(len(rows))
+        tag_index = np.full(len(self.tags), -1, dtype=np.int64)
+        tag_index[tags] = np.arange(len(tags))
+        entries = (row_index[entry_rows] >= 0) & (tag_index[entry_tags] >= 0)
+        return _pair_counts(row_index[entry_rows[entries]], tag_index[entry_tags[entries]], row_wins[rows], tags,
+                            min_support)
+
+    def pair_counts_by_map(self, tag_mask: Union[None, np.ndarray] = None, min_support: int = 1) \
+            -> list[TagPairCounts]:
+        """
+        `pair_counts` of rows of each map, indexed by map id. Rows and their entries are grouped by map once,
+        so that the incidence matrix of each map is built from its own rows only.
+        """
+        entry_tags, entry_rows, row_wins, row_maps = self.arrays()
+        n_maps = len(self.maps)
+        tags = np.arange(len(self.tags)) if tag_mask is None else np.flatnonzero(tag_mask)
+        tag_index = np.full(len(self.tags), -1, dtype=np.int64)
+        tag_index[tags] = np.arange(len(tags))
+        row_order = np.argsort(row_maps, kind="stable")
+        row_bounds = np.concatenate([[0], np.cumsum(np.bincount(row_maps, minlength=n_maps))])
+        # position of each row when grouped by map, and entries in order of these positions
+        row_positions = np.empty(self.row_count, dtype=np.int64)
+        row_positions[row_order] = np.arange(self.row_count)
+        entries = tag_index[entry_tags] >= 0
+        entry_positions, entry_tag_index = row_positions[entry_rows[entries]], tag_index[entry_tags[entries]]
+        entry_order = np.argsort(entry_positions, kind="stable")
+        entry_positions, entry_tag_index = entry_positions[entry_order], entry_tag_index[entry_order]
+        entry_bounds = np.searchsorted(entry_positions, row_bounds)
+        grouped_wins = row_wins[row_order]
+        result = []
+        for map_id in range(n_maps):
+            first_row, first_entry, last_entry = row_bounds[map_id], entry_bounds[map_id], entry_bounds[map_id + 1]
+            result.append(_pair_counts(entry_positions[first_entry:last_entry] - first_row,
+                                       entry_tag_index[first_entry:last_entry],
+                                       grouped_wins[first_row:row_bounds[map_id + 1]], tags, min_support))
+        return result
+
+
+def _pair_counts(entry_rows: np.ndarray, entry_tags: np.ndarray, row_wins: np.ndarray, tags: np.ndarray,
+                 min_support: int) -> TagPairCounts:
+    """
+    :param entry_rows: row of every entry, indexing `row_wins`
+    :param entry_tags: index in `tags` of every entry
+    """
+    # float32 products are exact for counts below 2^24
+    incidence = np.zeros((len(row_wins), len(tags)), dtype=np.float32)
+    incidence[entry_rows, entry_tags] = 1
+    won = incidence[row_wins == 1]
+    pair_rows = incidence.T @ incidence
+    pair_wins = won.T @ won
+    first, second = np.nonzero(np.triu(pair_rows >= max(min_support, 1), k=1))
+    return TagPairCounts(len(row_wins), len(won), tags[first], tags[second],
+                         pair_rows[first, second].astype(np.int64), pair_wins[first, second].astype(np.int64))
+
+
+class DailyTagWinStats:
+    """
+    Tag/win contingency counts of team-rounds bucketed by (day, era, map, tag), days being UTC days since unix epoch
+    and eras periods between `era_boundaries` (e.g. weapon mod releases), so that no bucket spans a boundary.
+    Buckets of new days can be merged into stored ones, and counts for any range of buckets are aggregated
+    from them without replaying games.
+    `key` describes what is counted (e.g. filters of games and taggers); statistics stored with another key
+    or other era boundaries aren't loaded.
+    """
+
+    def __init__(self, era_boundaries: Iterable[datetime] = (), key: str = ""):
+        self.era_boundaries = np.array(sorted(epoch_millis(b) for b in era_boundaries), dtype=np.int64)
+        self.key = key
+        # start of imports merged so far, buckets lying wholly after it count all their team-rounds; None if unknown
+        self.covered_since: Union[datetime, None] = None
+        self.maps = Interner()
+        self.tags = Interner()
+        # (day, era, map) buckets: team-rounds and won team-rounds
+        self.round_days = np.zeros(0, dtype=np.int64)
+        self.round_eras = np.zeros(0, dtype=np.int64)
+        self.round_maps = np.zeros(0, dtype=np.int64)
+        self.round_rows = np.zeros(0, dtype=np.int64)
+        self.round_wins = np.zeros(0, dtype=np.int64)
+        # (day, era, map, tag) buckets: tagged team-rounds and won tagged team-rounds
+        self.tag_days = np.zeros(0, dtype=np.int64)
+        self.tag_eras = np.zeros(0, dtype=np.int64)
+        self.tag_maps = np.zeros(0, dtype=np.int64)
+        self.tag_ids = np.zeros(0, dtype=np.int64)
+        self.tag_rows = np.zeros(0, dtype=np.int64)
+        self.tag_wins = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_tag_sets(cls, tag_sets: TeamRoundTagSets, era_boundaries: Iterable[datetime] = (),
+                      key: str = "") -> "DailyTagWinStats":
+        stats = cls(era_boundaries, key)
+        for map in tag_sets.maps.values:
+            stats.maps.intern(map)
+        for tag in tag_sets.tags.values:
+            stats.tags.intern(tag)
+        entry_tags, entry_rows, row_wins, row_maps = tag_sets.arrays()
+        row_times = tag_sets.row_times()
+        n_eras = len(stats.era_boundaries) + 1
+        row_buckets = row_times // DAY_MS * n_eras + stats._eras(row_times)
+        n_maps, n_tags = max(len(stats.maps), 1), max(len(stats.tags), 1)
+
+        keys, inverse = np.unique(row_buckets * n_maps + row_maps, return_inverse=True)
+        stats.round_days, stats.round_eras = keys // n_maps // n_eras, keys // n_maps % n_eras
+        stats.round_maps = keys % n_maps
+        stats.round_rows = np.bincount(inverse, minlength=len(keys))
+        stats.round_wins = np.bincount(inverse, weights=row_wins, minlength=len(keys)).astype(np.int64)
+
+        entry_keys = (row_buckets[entry_rows] * n_maps + row_maps[entry_rows]) * n_tags + entry_tags
+        keys, inverse = np.unique(entry_keys, return_inverse=True)
+        buckets = keys // n_tags // n_maps
+        stats.tag_days, stats.tag_eras = buckets // n_eras, buckets % n_eras
+        stats.tag_maps, stats.tag_ids = keys // n_tags % n_maps, keys % n_tags
+        stats.tag_rows = np.bincount(inverse, minlength=len(keys))
+        stats.tag_wins = np.bincount(inverse, weights=row_wins[entry_rows], minlength=len(keys)).astype(np.int64)
+        return stats
+
+    @property
+    def days(self) -> np.ndarray:
+        return np.unique(self.round_days)
+
+    def resume_date(self) -> Union[datetime, None]:
+        """
+        :return: start of the last collected day; games from that point on should be re-imported and merged
+        """
+        if len(self.round_days) == 0:
+            return None
+        return datetime(1970, 1, 1) + timedelta(days=int(self.round_days.max()))
+
+    def merge(self, other: "DailyTagWinStats") -> "DailyTagWinStats":
+        """
+        Adds buckets of `other`. Days present in both are replaced with buckets from `other`.
+        """
+        if not np.array_equal(self.era_boundaries, other.era_boundaries):
+            raise ValueError("statistics of different eras can't be merged")
+        if len(self.round_days) == 0:
+            self.covered_since = other.covered_since
+        elif self.covered_since is not None and other.covered_since is not None:
+            self.covered_since = min(self.covered_since, other.covered_since)
+        else:
+            self.covered_since = None
+        map_ids = np.array([self.maps.intern(m) for m in other.maps.values] or [0], dtype=np.int64)
+        tag_ids = np.array([self.tags.intern(t) for t in other.tags.values] or [0], dtype=np.int64)
+        keep_rounds = ~np.isin(self.round_days, other.round_days)
+        keep_tags = ~np.isin(self.tag_days, other.round_days)
+        self.round_days = np.concatenate([self.round_days[keep_rounds], other.round_days])
+        self.round_eras = np.concatenate([self.round_eras[keep_rounds], other.round_eras])
+        self.round_maps = np.concatenate([self.round_maps[keep_rounds], map_ids[other.round_maps]])
+        self.round_rows = np.concatenate([self.round_rows[keep_rounds], other.round_rows])
+        self.round_wins = np.concatenate([self.round_wins[keep_rounds], other.round_wins])
+        self.tag_days = np.concatenate([self.tag_days[keep_tags], other.tag_days])
+        self.tag_eras = np.concatenate([self.tag_eras[keep_tags], other.tag_eras])
+        self.tag_maps = np.concatenate([self.tag_maps[keep_tags], map_ids[other.tag_maps]])
+        self.tag_ids = np.concatenate([self.tag_ids[keep_tags], tag_ids[other.tag_ids]])
+        self.tag_rows = np.concatenate([self.tag_rows[keep_tags], other.tag_rows])
+        self.tag_wins = np.concatenate([self.tag_wins[keep_tags], other.tag_wins])
+        return self
+
+    def _eras(self, times: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.era_boundaries, times, side="right")
+
+    def _within(self, days: np.ndarray, eras: np.ndarray, start: Union[datetime, None],
+                end: Union[datetime, None]) -> np.ndarray:
+        """
+        :return: whether buckets of given days and eras lie wholly within [start, end)
+        """
+        lower = np.concatenate([[np.iinfo(np.int64).min], self.era_boundaries])
+        upper = np.concatenate([self.era_boundaries, [np.iinfo(np.int64).max]])
+        within = np.ones(len(days), dtype=bool)
+        if start is not None:
+            within &= np.maximum(days * DAY_MS, lower[eras]) >= epoch_millis(start)
+        if end is not None:
+            within &= np.minimum((days + 1) * DAY_MS, upper[eras]) <= epoch_millis(end)
+        return within
+
+    def within(self, times: np.ndarray, start: Union[datetime, None] = None,
+               end: Union[datetime, None] = None) -> np.ndarray:
+        """
+        :return: whether buckets of team-rounds (or games) played at `times` (epoch millis) lie wholly within
+        [start, end), i.e. whether they are counted in that range
+        """
+        return self._within(times // DAY_MS, self._eras(times), start, end)
+
+    def counts_by_map(self, start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+                      tag_sets: Union[TeamRoundTagSets, None] = None) -> TagWinCounts:
+        """
+        Per-map counts of team-rounds played in [start, end). Only buckets lying wholly within the range are counted.
+        Team-rounds of buckets it covers partly are counted from rows of `tag_sets` if given, and left out otherwise.
+        """
+        counts = self._sum_buckets(self._within(self.round_days, self.round_eras, start, end),
+                                   self._within(self.tag_days, self.tag_eras, start, end))
+        if tag_sets is None:
+            return counts
+        times = tag_sets.row_times()
+        partial = ~self.within(times, start, end) & \
+            (start is None or times >= epoch_millis(start)) & (end is None or times < epoch_millis(end))
+        return counts + self._counts_of_rows(tag_sets, partial)
+
+    def _counts_of_rows(self, tag_sets: TeamRoundTagSets, row_mask: np.ndarray) -> TagWinCounts:
+        """
+        Per-map counts of rows of `tag_sets` selected by `row_mask`, with maps and tags of these statistics
+        """
+        map_ids = np.array([self.maps.intern(m) for m in tag_sets.maps.values], dtype=np.int64)
+        tag_ids = np.array([self.tags.intern(t) for t in tag_sets.tags.values], dtype=np.int64)
+        n_maps, n_tags = len(self.maps), len(self.tags)
+        _, _, _, row_maps = tag_sets.arrays()
+        # rows left out are counted in an extra group, which is dropped
+        row_groups = np.where(row_mask, map_ids[row_maps], n_maps)
+        counts = tag_sets.counts_by_group(row_groups, n_maps + 1)
+        tag_rows = np.zeros((n_maps, n_tags), dtype=np.int64)
+        tag_wins = np.zeros((n_maps, n_tags), dtype=np.int64)
+        tag_rows[:, tag_ids] = counts.tag_rows[:n_maps]
+        tag_wins[:, tag_ids] = counts.tag_wins[:n_maps]
+        return TagWinCounts(counts.rows[:n_maps], counts.wins[:n_maps], tag_rows, tag_wins)
+
+    def whole_days(self, start: Union[datetime, None] = None, end: Union[datetime, None] = None) \
+            -> "DailyTagWinStats":
+        """
+        Statistics of buckets lying wholly within [start, end), e.g. to merge only complete days of an import
+        of games from `start` to `end`
+        """
+        round_buckets = self._within(self.round_days, self.round_eras, start, end)
+        tag_buckets = self._within(self.tag_days, self.tag_eras, start, end)
+        stats = DailyTagWinStats()
+        stats.era_boundaries, stats.key, stats.covered_since = self.era_boundaries, self.key, start
+        stats.maps, stats.tags = self.maps, self.tags
+        stats.round_days, stats.round_eras = self.round_days[round_buckets], self.round_eras[round_buckets]
+        stats.round_maps = self.round_maps[round_buckets]
+        stats.round_rows, stats.round_wins = self.round_rows[round_buckets], self.round_wins[round_buckets]
+        stats.tag_days, stats.tag_eras = self.tag_days[tag_buckets], self.tag_eras[tag_buckets]
+        stats.tag_maps, stats.tag_ids = self.tag_maps[tag_buckets], self.tag_ids[tag_buckets]
+        stats.tag_rows, stats.tag_wins = self.tag_rows[tag_buckets], self.tag_wins[tag_buckets]
+        return stats
+
+    def _sum_buckets(self, round_buckets: np.ndarray, tag_buckets: np.ndarray) -> TagWinCounts:
+        n_maps, n_tags = len(self.maps), len(self.tags)
+        maps = self.round_maps[round_buckets]
+        cells = self.tag_maps[tag_buckets] * n_tags + self.tag_ids[tag_buckets]
+        return TagWinCounts(
+            np.bincount(maps, weights=self.round_rows[round_buckets], minlength=n_maps).astype(np.int64),
+            np.bincount(maps, weights=self.round_wins[round_buckets], minlength=n_maps).astype(np.int64),
+            np.bincount(cells, weights=self.tag_rows[tag_buckets], minlength=n_maps * n_tags)
+            .astype(np.int64).reshape(n_maps, n_tags),
+            np.bincount(cells, weights=self.tag_wins[tag_buckets], minlength=n_maps * n_tags)
+            .astype(np.int64).reshape(n_maps, n_tags))
+
+    def correlations_per_map(self, start: Union[datetime, None] = None, end: Union[datetime, None] = None,
+                             tag_filter: Callable[[str], bool] = None,
+                             tag_sets: Union[TeamRoundTagSets, None] = None) -> dict[str, dict[str, Correlation]]:
+        counts = self.counts_by_map(start, end, tag_sets)
+        tag_mask = np.array([tag_filter is None or tag_filter(t) for t in self.tags.values], dtype=bool)
+        return correlations_by_group(self.maps.values, self.tags.values, tag_mask, counts)
+
+    def since(self, start: datetime, tag_filter: Callable[[str], bool] = None,
+              tag_sets: Union[TeamRoundTagSets, None] = None) -> dict[str, dict[str, Correlation]]:
+        """
+        Correlations of team-rounds played from `start` on, e.g. since release of the latest weapon mod,
+        which is exact when `start` is one of `era_boundaries`.
+        Pass collected `tag_sets` to count the rest of the bucket of `start` from its exact rows rather than leave
+        it out.
+        """
+        return self.correlations_per_map(start, None, tag_filter, tag_sets)
+
+    def sliding_counts(self, window_days: int) -> Iterator[tuple[datetime, TagWinCounts]]:
+        """
+        Per-map counts of `window_days` days ending at each day between first and last collected one.
+        Each step adds buckets of the new day and subtracts buckets of the day leaving the window.
+        """
+        if len(self.round_days) == 0:
+            return
+        round_order = np.argsort(self.round_days, kind="stable")
+        tag_order = np.argsort(self.tag_days, kind="stable")
+        round_days, tag_days = self.round_days[round_order], self.tag_days[tag_order]
+
+        def day_buckets(day: int) -> TagWinCounts:
+            rounds = round_order[np.searchsorted(round_days, day):np.searchsorted(round_days, day, "right")]
+            tags = tag_order[np.searchsorted(tag_days, day):np.searchsorted(tag_days, day, "right")]
+            return self._sum_buckets(rounds, tags)
+
+        counts = self._sum_buckets(round_order[:0], tag_order[:0])
+        for day in range(int(round_days[0]), int(round_days[-1]) + 1):
+            counts = counts + day_buckets(day) - day_buckets(day - window_days)
+            yield datetime(1970, 1, 1) + timedelta(days=day), counts
+
+    def save(self, path: str):
+        con = sqlite3.connect(path)
+        with con:
+            con.execute('DROP TABLE IF EXISTS tag_win_stats_meta')
+            con.execute('DROP TABLE IF EXISTS tag_win_stats_round')
+            con.execute('DROP TABLE IF EXISTS tag_win_stats_tag')
+            con.execute('CREATE TABLE tag_win_stats_meta ("name", "value")')
+            con.execute('CREATE TABLE tag_win_stats_round ("day", "era", "map", "rows", "wins")')
+            con.execute('CREATE TABLE tag_win_stats_tag ("day", "era", "map", "tag", "rows", "wins")')
+            con.executemany("insert into tag_win_stats_meta values (?, ?)", [
+                ("key", self.key),
+                ("era_boundaries", json.dumps(self.era_boundaries.tolist())),
+                ("covered_since", self.covered_since.isoformat() if self.covered_since is not None else None),
+            ])
+            maps, tags = self.maps.values, self.tags.values
+            con.executemany("insert into tag_win_stats_round values (?, ?, ?, ?, ?)",
+                            zip(self.round_days.tolist(), self.round_eras.tolist(), [maps[m] for m in self.round_maps],
+                                self.round_rows.tolist(), self.round_wins.tolist()))
+            con.executemany("insert into tag_win_stats_tag values (?, ?, ?, ?, ?, ?)",
+                            zip(self.tag_days.tolist(), self.tag_eras.tolist(), [maps[m] for m in self.tag_maps],
+                                [tags[t] for t in self.tag_ids], self.tag_rows.tolist(), self.tag_wins.tolist()))
+        con.close()
+
+    @classmethod
+    def load(cls, path: str, era_boundaries: Iterable[datetime] = (), key: str = "") -> "DailyTagWinStats":
+        """
+        :return: statistics stored at `path`, empty ones if there are none with the same `key` and era boundaries
+        """
+        stats = cls(era_boundaries, key)
+        if not os.path.exists(path):
+            return stats
+        con = sqlite3.connect(path)
+        try:
+            meta = dict(con.execute("select name, value from tag_win_stats_meta").fetchall())
+        except sqlite3.OperationalError:
+            # saved without a key
+            meta = {}
+        if meta.get("key") != key or meta.get("era_boundaries") != json.dumps(stats.era_boundaries.tolist()):
+            con.close()
+            return stats
+        rounds = con.execute("select day, era, map, rows, wins from tag_win_stats_round").fetchall()
+        tags = con.execute("select day, era, map, tag, rows, wins from tag_win_stats_tag").fetchall()
+        con.close()
+        if meta["covered_since"] is not None:
+            stats.covered_since = datetime.fromisoformat(meta["covered_since"])
+        if len(rounds) > 0:
+            days, eras, maps, rows, wins = zip(*rounds)
+            stats.round_days, stats.round_eras = np.array(days, dtype=np.int64), np.array(eras, dtype=np.int64)
+            stats.round_rows, stats.round_wins = np.array(rows, dtype=np.int64), np.array(wins, dtype=np.int64)
+            stats.round_maps = np.array([stats.maps.intern(m) for m in maps], dtype=np.int64)
+        if len(tags) > 0:
+            days, eras, maps, tag_names, rows, wins = zip(*tags)
+            stats.tag_days, stats.tag_eras = np.array(days, dtype=np.int64), np.array(eras, dtype=np.int64)
+            stats.tag_rows, stats.tag_wins = np.array(rows, dtype=np.int64), np.array(wins, dtype=np.int64)
+            stats.tag_maps = np.array([stats.maps.intern(m) for m in maps], dtype=np.int64)
+            stats.tag_ids = np.array([stats.tags.intern(t) for t in tag_names], dtype=np.int64)
+        return stats
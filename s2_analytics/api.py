@@ -0,0 +1,156 @@
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from glob import glob
+from typing import Any, Callable, Union
+
+from s2_analytics.collect.map_trends_collector import MapPicks
+from s2_analytics.reports import MAPS_TRENDS, WEAPON_USAGE_TRENDS, WEAPON_WIN_CORRELATION_RANKED, \
+    WEAPON_WIN_CORRELATION_WM
+from s2_analytics.session import Window
+
+API_VERSION = 1
+# inside mkdocs docs dir, so that the site build publishes endpoints into docs/
+API_DIR = f"build/markdown/api/v{API_VERSION}"
+
+DailyValues = dict[str, dict[str, float]]
+
+
+def _write_json(path: str, document: dict):
+    """
+    Writes a compact document, keeping the existing file (and its modification time) if it is the same
+    """
+    content = json.dumps({"version": API_VERSION, **document}, separators=(",", ":"), sort_keys=True)
+    if os.path.isfile(path):
+        with open(path) as f:
+            if f.read() == content:
+                return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _isoformat(time: Union[datetime, None]) -> Union[str, None]:
+    return time.isoformat() if time is not None else None
+
+
+def write_daily_shards(endpoint: str, days: DailyValues, directory: str = API_DIR) -> list[str]:
+    """
+    Writes values of each day into a shard of its month (`<endpoint>/<yyyy-mm>.json`). Days already in a shard
+    but not in `days` are kept, so shards keep history older than windows of reports.
+    :return: paths of written shards, relative to `directory`
+    """
+    by_month: dict[str, DailyValues] = defaultdict(dict)
+    for day, values in days.items():
+        by_month[day[:7]][day] = values
+    shards = []
+    for month, month_days in sorted(by_month.items()):
+        shard = f"{endpoint}/{month}.json"
+        path = os.path.join(directory, shard)
+        if os.path.isfile(path):
+            with open(path) as f:
+                month_days = {**json.load(f)["days"], **month_days}
+        _write_json(path, {"period": month, "days": dict(sorted(month_days.items()))})
+        shards.append(shard)
+    return shards
+
+
+def write_index(directory: str = API_DIR):
+    """
+    Lists endpoints and their shards, so that clients find the shards of the periods they need
+    """
+    endpoints = defaultdict(list)
+    for path in sorted(glob(os.path.join(directory, "**", "*.json"), recursive=True)):
+        relative = os.path.relpath(path, directory).replace(os.sep, "/")
+        if relative == "index.json":
+            continue
+        endpoint, _, name = relative.rpartition("/")
+        endpoints[endpoint or name[:-len(".json")]].append(relative)
+    _write_json(os.path.join(directory, "index.json"), {"endpoints": dict(endpoints)})
+
+
+def days_within(days: DailyValues, window: Union[Window, None]) -> DailyValues:
+    """
+    Days lying fully inside a report's window. Days at its edges have only some of their games
+    and would overwrite complete values written by runs with earlier windows.
+    """
+    if window is None:
+        return days
+    start, end = window
+    return {day: values for day, values in days.items()
+            if start <= datetime.fromisoformat(day) and datetime.fromisoformat(day) + timedelta(days=1) <= end}
+
+
+def weapon_kills_by_day(processors: dict[str, Any]) -> DailyValues:
+    days: DailyValues = defaultdict(dict)
+    for date, weapon, kills in processors["sqlite_collector"].connection.execute(
+            "select date, weaponName, count(1) from event_kill group by date, weaponName order by date, weaponName"):
+        days[date][weapon] = kills
+    return dict(days)
+
+
+def map_picks_by_day(picks: MapPicks) -> DailyValues:
+    days = {}
+    for day, counts in zip(picks.dates(), picks.counts):
+        played = {map: int(count) for map, count in zip(picks.maps.values, counts) if count > 0}
+        if len(played) > 0:
+            days[day.strftime("%Y-%m-%d")] = played
+    return days
+
+
+def correlations_by_map(processors: dict[str, Any]) -> dict[str, dict[str, dict[str, float]]]:
+    statistics = processors["tag_win_stats"].correlations().statistics_per_map(lambda t: t not in ["win", "lose"])
+    return {map: {tag: {"correlation": c.correlation if math.isfinite(c.correlation) else None,
+                        "samples": c.sample_count}
+                  for tag, c in stats.items()}
+            for map, stats in sorted(statistics.items())}
+
+
+def _weapon_usage(processors: dict[str, Any], directory: str, window: Union[Window, None]):
+    write_daily_shards("weapon_kills/daily", days_within(weapon_kills_by_day(processors), window), directory)
+
+
+def _maps_trends(processors: dict[str, Any], directory: str, window: Union[Window, None]):
+    days = map_picks_by_day(processors["map_trends_collector"].picks())
+    write_daily_shards("map_picks/daily", days_within(days, window), directory)
+    summary = processors["summary_collector"].get_summary()
+    _write_json(os.path.join(directory, "summary.json"), {
+        "first_game": _isoformat(summary.first_game_starttime),
+        "last_game": _isoformat(summary.last_game_starttime),
+        "games": summary.total_games,
+        "rounds": summary.total_rounds,
+        "games_by_playlist": dict(summary.games_by_playlist),
+    })
+
+
+def _correlations(name: str) -> Callable[[dict[str, Any], str, Union[Window, None]], None]:
+    def write(processors: dict[str, Any], directory: str, window: Union[Window, None]):
+        _write_json(os.path.join(directory, "correlations", f"{name}.json"), {"maps": correlations_by_map(processors)})
+
+    return write
+
+
+# endpoints written from processors of each session report
+API_ENDPOINTS: dict[str, Callable[[dict[str, Any], str, Union[Window, None]], None]] = {
+    WEAPON_USAGE_TRENDS.name: _weapon_usage,
+    MAPS_TRENDS.name: _maps_trends,
+    WEAPON_WIN_CORRELATION_RANKED.name: _correlations("ranked"),
+    WEAPON_WIN_CORRELATION_WM.name: _correlations("weapon_mod"),
+}
+
+
+def write_endpoints(processors_by_report: dict[str, dict[str, Any]], directory: str = API_DIR,
+                    windows: dict[str, Window] = None):
+    """
+    Writes endpoints of reports whose processors are given (e.g. reports imported by a session run)
+    and updates the index. Endpoints of other reports are left as they are.
+    :param windows: start and end of games imported for each report, daily values are written only for days
+    fully inside them
+    """
+    windows = windows if windows is not None else {}
+    for name, processors in processors_by_report.items():
+        if name in API_ENDPOINTS:
+            API_ENDPOINTS[name](processors, directory, windows.get(name))
+    write_index(directory)
@@ -0,0 +1,165 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from glob import glob
+from typing import Callable, Union
+
+NOTEBOOKS_DIR = "build/notebooks"
+MARKDOWN_DIR = "build/markdown"
+TIMINGS_PATH = "build/notebook_timings.json"
+
+# modules executing notebooks and converting them to markdown
+NOTEBOOK_TOOLS = ["papermill", "nbconvert"]
+
+# environment variable telling a notebook how many CPUs of the build budget it was granted
+CPUS_ENV = "S2_NOTEBOOK_CPUS"
+
+# CPUs requested by notebooks that parallelize their own work, all others get one
+NOTEBOOK_CPUS = {
+    "stats_weapon_win_correlation_ranked.ipynb": 2,
+}
+
+
+def notebook_cpus() -> int:
+    """
+    CPUs a notebook may use for its own worker processes, 1 when it is not executed by the build
+    """
+    return int(os.environ.get(CPUS_ENV, "1"))
+
+
+@dataclass
+class NotebookResult:
+    notebook: str
+    cpus: int
+    seconds: float
+    error: Union[str, None] = None
+
+
+class CpuBudget:
+    """
+    CPUs shared by notebooks executed at the same time. Requests larger than the budget are capped to it,
+    so that a single notebook can always run.
+    """
+
+    def __init__(self, cpus: int):
+        self.cpus = cpus
+        self.available = cpus
+        self._condition = threading.Condition()
+
+    def acquire(self, cpus: int) -> int:
+        cpus = max(1, min(cpus, self.cpus))
+        with self._condition:
+            self._condition.wait_for(lambda: self.available >= cpus)
+            self.available -= cpus
+        return cpus
+
+    def release(self, cpus: int):
+        with self._condition:
+            self.available += cpus
+            self._condition.notify_all()
+
+
+def _run(command: list[str], env: dict[str, str]):
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with {completed.returncode}\n{completed.stdout}")
+
+
+def run_notebook(notebook: str, cpus: int):
+    """
+    Executes a notebook into the build dir and converts the executed copy to markdown
+    """
+    env = {**os.environ, CPUS_ENV: str(cpus)}
+    executed = os.path.join(NOTEBOOKS_DIR, os.path.basename(notebook))
+    _run([sys.executable, "-m", "papermill", "--log-level", "WARNING", "--execution-timeout", "20",
+          notebook, executed], env)
+    _run([sys.executable, "-m", "jupyter", "nbconvert", "--to", "markdown", f"--output-dir={MARKDOWN_DIR}",
+          executed, "--no-input", "--log-level", "ERROR"], env)
+
+
+def missing_tools() -> list[str]:
+    """
+    :return: modules needed by `run_notebook` that aren't installed
+    """
+    return [tool for tool in NOTEBOOK_TOOLS if importlib.util.find_spec(tool) is None]
+
+
+def build_notebooks(notebooks: list[str], cpus: Union[int, None] = None,
+                    notebook_cpus: dict[str, int] = None,
+                    run: Callable[[str, int], None] = run_notebook) -> list[NotebookResult]:
+    """
+    Runs notebooks in parallel within a budget of `cpus` (all of them by default), each one taking as many
+    CPUs as `notebook_cpus` requests for its file name. Notebooks requesting the most CPUs start first.
+    A failing notebook doesn't stop the others, its error is part of its result.
+    """
+    budget = CpuBudget(cpus if cpus is not None else os.cpu_count() or 1)
+    notebook_cpus = notebook_cpus if notebook_cpus is not None else NOTEBOOK_CPUS
+    requested = {notebook: notebook_cpus.get(os.path.basename(notebook), 1) for notebook in notebooks}
+
+    def build(notebook: str) -> NotebookResult:
+        granted = budget.acquire(requested[notebook])
+        started = time.perf_counter()
+        try:
+            run(notebook, granted)
+            error = None
+        except Exception as e:
+            error = str(e)
+        finally:
+            budget.release(granted)
+        return NotebookResult(notebook, granted, time.perf_counter() - started, error)
+
+    results = []
+    ordered = sorted(notebooks, key=lambda n: -requested[n])
+    with ThreadPoolExecutor(max(1, min(budget.cpus, len(notebooks)))) as executor:
+        for future in as_completed([executor.submit(build, notebook) for notebook in ordered]):
+            result = future.result()
+            status = "failed" if result.error is not None else "done"
+            print(f"=== {status}: {result.notebook} ({result.seconds:.1f}s, {result.cpus} cpu) ===", flush=True)
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    from s2_analytics.incremental import BuildManifest, load_fingerprints, notebook_fingerprint, code_version
+    from s2_analytics.render.catalog import RENDERED_REPORTS
+
+    rendered = {f"{report.name}.ipynb" for report in RENDERED_REPORTS}
+    manifest = BuildManifest()
+    version = code_version()
+    # notebooks of session reports are fingerprinted with games they select, others only with their code
+    fingerprints = {f"{name}.ipynb": fingerprint for name, fingerprint in load_fingerprints().items()}
+    notebooks = []
+    for notebook in sorted(glob("*.ipynb")):
+        if notebook in rendered:
+            continue
+        if notebook not in fingerprints:
+            fingerprints[notebook] = notebook_fingerprint(notebook, version)
+        name = os.path.splitext(notebook)[0]
+        if manifest.is_current(name, fingerprints[notebook]):
+            print(f"=== Unchanged: {notebook} ===")
+        else:
+            manifest.forget(name)
+            notebooks.append(notebook)
+    missing = missing_tools()
+    if len(notebooks) > 0 and len(missing) > 0:
+        print(f"Can't execute {len(notebooks)} notebooks, not installed: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    started = time.perf_counter()
+    results = build_notebooks(notebooks)
+    for result in results:
+        if result.error is None:
+            manifest.record(os.path.splitext(result.notebook)[0], fingerprints[result.notebook])
+    manifest.save()
+    with open(TIMINGS_PATH, "w") as f:
+        json.dump([asdict(r) for r in results], f, indent=1)
+    print(f"Executed {len(results)} notebooks in {time.perf_counter() - started:.1f}s")
+    failed = [r for r in results if r.error is not None]
+    for result in failed:
+        print(f"=== {result.notebook} failed ===\n{result.error}", file=sys.stderr)
+    sys.exit(1 if len(failed) > 0 else 0)
@@ -0,0 +1,80 @@
+from array import array
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import Interner
+from s2_analytics.constants import WeaponModEras
+from s2_analytics.importer import GameDetails, RoundData, EventData, EventKill
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class WeaponModEraCollector:
+    """
+    Tags every game with its weapon mod era and counts kills by weapon and rounds by map in each era,
+    so that before/after comparisons across all mods come from a single import
+    """
+
+    def __init__(self, eras: WeaponModEras):
+        self.eras = eras
+        self.weapons = Interner()
+        self.maps = Interner()
+        self.era_by_game: dict[int, int] = {}
+        self._kill_cells = (array("q"), array("q"))
+        self._round_cells = (array("q"), array("q"))
+
+    def process_game(self, game: GameDetails):
+        self.era_by_game[game.id] = self.eras.era_of(game.start_time)
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self._round_cells[0].append(self._era(game))
+        self._round_cells[1].append(self.maps.intern(round.map))
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        if isinstance(event, EventKill):
+            self._kill_cells[0].append(self._era(game))
+            self._kill_cells[1].append(self.weapons.intern(event.weapon))
+
+    def _era(self, game: GameDetails) -> int:
+        era = self.era_by_game.get(game.id)
+        if era is None:
+            era = self.era_by_game[game.id] = self.eras.era_of(game.start_time)
+        return era
+
+    def weapon_usage(self) -> "pd.DataFrame":
+        """
+        :return: era, weapon, kills and percentage of kills in era made with the weapon
+        """
+        return self._shares(self._kill_cells, self.weapons, "weapon", "kills")
+
+    def map_picks(self) -> "pd.DataFrame":
+        """
+        :return: era, map, rounds and percentage of rounds in era played on the map
+        """
+        return self._shares(self._round_cells, self.maps, "map", "rounds")
+
+    def _shares(self, cells: tuple[array, array], values: Interner, value_column: str,
+                count_column: str) -> "pd.DataFrame":
+        import pandas as pd
+
+        eras = np.frombuffer(cells[0], dtype=np.int64)
+        ids = np.frombuffer(cells[1], dtype=np.int64)
+        n_eras, n_values = len(self.eras), len(values)
+        counts = np.bincount(eras * n_values + ids, minlength=n_eras * n_values).reshape(n_eras, n_values)
+        totals = counts.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = np.where(totals > 0, 100.0 * counts / totals, 0.)
+        era_ids, value_ids = np.nonzero(counts)
+        # most frequent first within each era
+        order = np.lexsort((-counts[era_ids, value_ids], era_ids))
+        era_ids, value_ids = era_ids[order], value_ids[order]
+        labels = self.eras.labels()
+        df = pd.DataFrame({
+            "era": [labels[e] for e in era_ids],
+            value_column: [values.values[v] for v in value_ids],
+            count_column: counts[era_ids, value_ids],
+            "percentage": percentages[era_ids, value_ids],
+        })
+        return df
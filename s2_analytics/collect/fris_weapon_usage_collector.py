@@ -1,8 +1,6 @@
 import sqlite3
 from typing import Set
 
-import pandas as pd
-
 from s2_analytics.analyze.fris_weapon_usage_analyzer import FriWeaponUsageAnalyzer
 from s2_analytics.constants import WEAPONS_PRIMARY, WEAPONS_SECONDARY
 from s2_analytics.importer import EventProcessor, RoundProcessor, RoundData, GameDetails, EventData, EventKill
@@ -22,6 +20,17 @@ class FriWeaponUsageCollector(EventProcessor, RoundProcessor):
         self.con: sqlite3.Connection = sqlite3.connect("file::memory:")
         self.finalized = False
         self.cur: sqlite3.Cursor = self.con.cursor()
+        self.dates = set()
+        self.analyzer = self._create_analyzer()
+
+    def __getstate__(self):
+        # analyzer of the round in progress holds lambdas and can't be pickled
+        state = self.__dict__.copy()
+        del state["analyzer"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
         self.analyzer = self._create_analyzer()
 
     def init(self) -> "FriWeaponUsageCollector":
@@ -85,6 +94,8 @@ class FriWeaponUsageCollector(EventProcessor, RoundProcessor):
         self.con.commit()
 
     def get_data(self, weapons_list, avg_period_days: int, min_days: int, total_period_days: int):
+        import pandas as pd
+
         self._finalize()
         weapons_list_str = ", ".join([f"'{x}'" for x in weapons_list])
 
@@ -102,6 +113,9 @@ class FriWeaponUsageCollector(EventProcessor, RoundProcessor):
                 and weapon in ({weapons_list_str})
             order by weapon asc
         """, con=self.con, parse_dates="date")
+        if df.empty:
+            df["usage percentage"] = df["usage"]
+            return df
         df["usage percentage"] = df.groupby("weapon", as_index=False, group_keys=False) \
             .apply(
             lambda grp, freq: grp.rolling(freq, on='date', min_periods=min_days)['usage'].mean(),
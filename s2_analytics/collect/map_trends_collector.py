@@ -0,0 +1,97 @@
+from array import array
+from typing import Callable, Union, TYPE_CHECKING
+
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import Interner, DAY_MS
+from s2_analytics.importer import GameDetails, RoundData, epoch_millis
+from s2_analytics.rolling_average import RollingAveragePeriod, rolling_mean
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class MapPicks:
+    """
+    Rounds played on each map each day as a dense day x map matrix with a row for every calendar day
+    from `first_day` (days since epoch)
+    """
+
+    def __init__(self, maps: Interner, first_day: int, counts: np.ndarray):
+        self.maps = maps
+        self.first_day = first_day
+        self.counts = counts
+
+    def dates(self) -> "pd.DatetimeIndex":
+        import pandas as pd
+
+        return pd.to_datetime((self.first_day + np.arange(len(self.counts))) * DAY_MS, unit="ms")
+
+    def pick_percentages(self) -> np.ndarray:
+        """
+        :return: percentage of rounds of each day played on each map, NaN for days without rounds
+        """
+        totals = self.counts.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(totals > 0, 100.0 * self.counts / totals, np.nan)
+
+    def rolling_pick_percentages(self, period: RollingAveragePeriod,
+                                 maps: Union[Callable[[str], bool], None] = None) -> "pd.DataFrame":
+        """
+        :param maps: which maps to include, all if not given; percentages are always of all rounds of a day
+        :return: mapName, date, pick_percentage and its rolling average for days having rounds, by date and map
+        """
+        import pandas as pd
+
+        percentages = self.pick_percentages()
+        averages = rolling_mean(percentages, period.window_days, period.min_days_for_avg)
+        map_ids = np.array(sorted((i for i, m in enumerate(self.maps.values) if maps is None or maps(m)),
+                                  key=lambda i: self.maps.values[i]), dtype=np.int64)
+        day_ids = np.flatnonzero(self.counts.sum(axis=1) > 0)
+        map_columns, days = np.meshgrid(map_ids, day_ids)
+        days, map_columns = days.ravel(), map_columns.ravel()
+        return pd.DataFrame({
+            "mapName": np.array(self.maps.values, dtype=object)[map_columns],
+            "date": self.dates()[days],
+            "pick_percentage": percentages[days, map_columns],
+            "rolling average": averages[days, map_columns],
+        })
+
+    def last_played(self) -> "pd.DataFrame":
+        """
+        :return: mapName and last day it was played, most recent first
+        """
+        import pandas as pd
+
+        played = self.counts > 0
+        last = len(self.counts) - 1 - np.argmax(played[::-1], axis=0) if len(self.counts) > 0 \
+            else np.zeros(len(self.maps), dtype=np.int64)
+        df = pd.DataFrame({"mapName": self.maps.values, "last_played": self.dates()[last]})
+        return df.sort_values(["last_played", "mapName"], ascending=[False, True], kind="stable") \
+            .reset_index(drop=True)
+
+
+class MapTrendsCollector:
+    """
+    Counts rounds by day and map for map-pick trends
+    """
+
+    def __init__(self):
+        self.maps = Interner()
+        self._round_days = array("q")
+        self._round_maps = array("q")
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self._round_days.append(epoch_millis(round.start_time) // DAY_MS)
+        self._round_maps.append(self.maps.intern(round.map))
+
+    def picks(self) -> MapPicks:
+        days = np.frombuffer(self._round_days, dtype=np.int64)
+        maps = np.frombuffer(self._round_maps, dtype=np.int64)
+        n_maps = len(self.maps)
+        if len(days) == 0:
+            return MapPicks(self.maps, 0, np.zeros((0, n_maps), dtype=np.int64))
+        first_day = int(days.min())
+        n_days = int(days.max()) - first_day + 1
+        counts = np.bincount((days - first_day) * n_maps + maps, minlength=n_days * n_maps).reshape(n_days, n_maps)
+        return MapPicks(self.maps, first_day, counts)
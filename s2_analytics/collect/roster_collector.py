@@ -0,0 +1,49 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Union
+
+from s2_analytics.constants import TIERS
+from s2_analytics.importer import GameDetails, GameRatings
+
+
+@dataclass
+class RosterPlayer:
+    id: str
+    name: str
+    tier: int
+    team: Union[str, None] = None
+
+
+class PlayerRosterCollector:
+    """
+    Fills `player` and `tier` dimension tables. Players come from `roster` if one is given, otherwise from games
+    (named by their playfab id, without a team). Tier of a player is the one after their latest rated game,
+    or the one from `roster` if they have no rated games.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, roster: Union[list[RosterPlayer], None] = None):
+        self.connection = conn
+        self.cursor = self.connection.cursor()
+        self.roster = roster
+
+    def init(self) -> "PlayerRosterCollector":
+        self.cursor.execute('CREATE TABLE player ("id" PRIMARY KEY, "name", "tier", "team")')
+        self.cursor.execute('CREATE TABLE tier ("id" PRIMARY KEY, "name")')
+        self.cursor.executemany("insert into tier values (?, ?)", enumerate(TIERS))
+        if self.roster is not None:
+            self.cursor.executemany("insert into player values (?, ?, ?, ?)",
+                                    [(p.id, p.name, p.tier, p.team) for p in self.roster])
+        self.connection.commit()
+        return self
+
+    def process_ratings(self, ratings: GameRatings, game: GameDetails):
+        self._add_players(ratings.players)
+        self.cursor.executemany("update player set tier = ? where id = ?", zip(ratings.tier_after, ratings.players))
+
+    def process_game(self, game: GameDetails):
+        self._add_players([player for players in game.teams.values() for player in players])
+
+    def _add_players(self, players: list[str]):
+        if self.roster is None:
+            self.cursor.executemany("insert or ignore into player values (?, ?, null, null)",
+                                    [(player, player) for player in players])
@@ -3,7 +3,7 @@ import sqlite3
 import tempfile
 import uuid
 from os.path import exists
-from typing import List, Union
+from typing import List, Union, Iterable
 
 import atexit
 
@@ -20,6 +20,7 @@ class SqliteCollector(GameProcessor, RoundProcessor, EventProcessor):
         self.connection: Union[sqlite3.Connection, None] = sqlite_conn
         self.cursor: Union[sqlite3.Cursor, None] = None
         self.round_id = 0
+        self._game_rows, self._round_rows, self._kill_rows, self._cap_rows = [], [], [], []
 
     def init(self) -> "SqliteCollector":
         if self.connection is None:
@@ -34,6 +35,14 @@ class SqliteCollector(GameProcessor, RoundProcessor, EventProcessor):
             CREATE TABLE round ('id', 'game', 'date', 'round', 'mapName', 'startTime', 'endTime', 'blueCaps', 'redCaps', 'result')
             CREATE TABLE event_kill ('game', 'round', 'timestamp', 'date', 'killerPlayfabId', 'killerTeam', 'victimPlayfabId', 'victimTeam', 'weaponName')
             CREATE TABLE event_cap ('game', 'round', 'mapName', 'timestamp', 'cappingTeam', 'playfabId', 'millisSinceStart')
+            CREATE INDEX game_date ON game ('date')
+            CREATE INDEX round_game ON round ('game', 'round')
+            CREATE INDEX round_map ON round ('mapName', 'date')
+            CREATE INDEX event_kill_killer ON event_kill ('killerPlayfabId', 'weaponName')
+            CREATE INDEX event_kill_victim ON event_kill ('victimPlayfabId')
+            CREATE INDEX event_kill_weapon ON event_kill ('weaponName', 'date')
+            CREATE INDEX event_cap_player ON event_cap ('playfabId')
+            CREATE INDEX event_cap_round ON event_cap ('game', 'round')
         """
         for query in queries.strip().split("\n"):
             self.cursor.execute(query)
@@ -55,48 +64,53 @@ class SqliteCollector(GameProcessor, RoundProcessor, EventProcessor):
         atexit.register(delete_if_exists, sqlite_path)
 
     def process_game(self, game: GameDetails):
-        self.cursor.execute("""
-                insert into game 
-                    values (:startTime, :date, :playlistCode, :scoreRed, :scoreBlue, :winner)
-            """, {"startTime": game.id, "date": game.date_iso, "playlistCode": game.playlist_code,
-                  "scoreRed": game.score_red, "scoreBlue": game.score_blue, "winner": game.winner})
+        # rows of a game are buffered until the game is processed and inserted together
+        self._game_rows.append((game.id, game.date_iso, game.playlist_code, game.score_red, game.score_blue,
+                                game.winner))
+        self._flush()
 
     def process_round(self, round: RoundData, game: GameDetails):
         self.round_id += 1
-        self.cursor.execute("""
-                insert into round 
-                    values (:id, :game, :date, :round, :mapName, :startTime, 
-                        :endTime, :blueCaps, :redCaps, :winner) 
-            """, {"id": self.round_id, "game": game.id, "date": round.date_iso, "round": round.number,
-                  "mapName": round.map, "startTime": round.start_time, "endTime": round.end_time,
-                  "blueCaps": round.score_blue, "redCaps": round.score_red,
-                  "winner": round.winner})
+        self._round_rows.append((self.round_id, game.id, round.date_iso, round.number, round.map, round.start_time,
+                                 round.end_time, round.score_blue, round.score_red, round.winner))
 
     def process_event(self, event: EventData, round: RoundData, game: GameDetails):
         if isinstance(event, EventKill):
-            self.cursor.execute("""
-                insert into event_kill 
-                    values (:game, :round, :timestamp, :date, :killer, 
-                        :killerTeam, :victim, :victimTeam, :weapon)""",
-                                {
-                                    "game": game.id, "round": round.game_id, "timestamp": event.timestamp,
-                                    "date": event.date_iso, "killer": event.killer_id, "killerTeam": event.killer_team,
-                                    "victim": event.victim_id, "victimTeam": event.victim_team,
-                                    "weapon": event.weapon
-                                })
+            self._kill_rows.append((game.id, round.number, event.timestamp_sql, event.date_iso, event.killer_id,
+                                    event.killer_team, event.victim_id, event.victim_team, event.weapon))
         elif isinstance(event, EventFlagCap):
-            self.cursor.execute("""
-            insert into event_cap 
-                        values (:game, :round, :map, :timestamp,
-                            :team, :player, :millisSinceStart)""",
-                                {
-                                    "game": game.id, "round": round.game_id, "map":round.map, "timestamp": event.timestamp,
-                                    "date": event.date_iso, "team": event.capping_team,
-                                    "player": event.capping_player_id,
-                                    "millisSinceStart": (event.timestamp.timestamp()-round.start_time.timestamp())*1000
-                                })
+            self._cap_rows.append((game.id, round.number, round.map, event.timestamp_sql, event.capping_team,
+                                   event.capping_player_id,
+                                   (event.timestamp.timestamp() - round.start_time.timestamp()) * 1000))
+
+    def _flush(self):
+        self.cursor.executemany("insert into game values (?, ?, ?, ?, ?, ?)", self._game_rows)
+        self.cursor.executemany("insert into round values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._round_rows)
+        self.cursor.executemany("insert into event_kill values (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._kill_rows)
+        self.cursor.executemany("insert into event_cap values (?, ?, ?, ?, ?, ?, ?)", self._cap_rows)
+        self._game_rows, self._round_rows, self._kill_rows, self._cap_rows = [], [], [], []
+
+    def copy_games(self, source: "SqliteCollector", game_ids: Iterable[int]):
+        """
+        Copies rows of games `game_ids` from the database file of `source`, e.g. games of one report out of an ingest
+        shared by many reports, with set-based inserts rather than processing the games again
+        """
+        source.connection.commit()
+        _, _, path = source.connection.execute("PRAGMA database_list").fetchone()
+        self.connection.commit()
+        self.connection.execute("ATTACH DATABASE ? AS source", (path,))
+        try:
+            self.connection.execute("CREATE TEMP TABLE copied_game ('id' PRIMARY KEY)")
+            self.connection.executemany("insert into copied_game values (?)", ((game_id,) for game_id in game_ids))
+            for table, column in [("game", "id"), ("round", "game"), ("event_kill", "game"), ("event_cap", "game")]:
+                self.connection.execute(f"insert into main.{table} select * from source.{table} "
+                                        f"where {column} in (select id from copied_game) order by rowid")
+            self.connection.execute("DROP TABLE copied_game")
+            self.connection.commit()
+        finally:
+            self.connection.execute("DETACH DATABASE source")
+        self.round_id = self.connection.execute("select coalesce(max(id), 0) from round").fetchone()[0]
 
     def finalize_game_processing(self):
         self.cursor.close()
         self.connection.commit()
-
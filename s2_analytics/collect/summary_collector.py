@@ -2,22 +2,24 @@ import datetime
 import sqlite3
 from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Union
 
 from s2_analytics.collect.sqlite_collector import SqliteCollector
 
 
 @dataclass
 class Summary:
-    first_game_starttime: datetime.datetime
-    last_game_starttime: datetime.datetime
+    # None when no games were collected
+    first_game_starttime: Union[datetime.datetime, None]
+    last_game_starttime: Union[datetime.datetime, None]
     total_games: int
     total_rounds: int
     games_by_playlist: dict[str, int]
 
     def to_table(self):
         table = [
-            ["First game", self.first_game_starttime.date().isoformat()],
-            ["Last game", self.last_game_starttime.date().isoformat()],
+            ["First game", _date(self.first_game_starttime)],
+            ["Last game", _date(self.last_game_starttime)],
             ["Games total", self.total_games],
             ["Rounds total", self.total_rounds],
         ]
@@ -26,6 +28,14 @@ class Summary:
         return table
 
 
+def _date(time: Union[datetime.datetime, None]) -> str:
+    return time.date().isoformat() if time is not None else "-"
+
+
+def _start_time(game_id: Union[int, None]) -> Union[datetime.datetime, None]:
+    return datetime.datetime.utcfromtimestamp(game_id / 1000) if game_id is not None else None
+
+
 class SummaryCollector:
     def __init__(self, conn: sqlite3.Connection, sqlite_collector: SqliteCollector):
         self.conn = conn
@@ -53,8 +63,8 @@ class SummaryCollector:
             game_mode_count[game_mode] = count
 
         return Summary(
-            first_game_starttime=datetime.datetime.utcfromtimestamp(first_game_time / 1000),
-            last_game_starttime=datetime.datetime.utcfromtimestamp(last_game_time / 1000),
+            first_game_starttime=_start_time(first_game_time),
+            last_game_starttime=_start_time(last_game_time),
             total_games=game_count,
             total_rounds=round_count,
             games_by_playlist=game_mode_count
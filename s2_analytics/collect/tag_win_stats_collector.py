@@ -0,0 +1,128 @@
+import sqlite3
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, Union
+
+import numpy as np
+
+from s2_analytics.analyze.tag_correlation import TeamRoundTagSets, DailyTagWinStats
+from s2_analytics.collect.summary_collector import Summary, _start_time
+from s2_analytics.collect.team_round_tag_collector import TagWinCorrelations, TeamRoundTagging
+from s2_analytics.importer import GameDetails, RoundData, EventData, epoch_millis
+from s2_analytics.session import Window
+
+
+class TagWinStatsCollector:
+    """
+    Daily tag/win statistics of team-rounds (see `DailyTagWinStats`) and the games they were counted from,
+    kept in a sqlite file at `path` across imports. A session imports games only from `import_start` on and
+    `finish` merges them into stored statistics, so that correlations and the summary of a report's window
+    come from stored buckets without replaying older games.
+    Team-rounds and games of buckets the window covers only partly (e.g. its first day) are left out.
+    """
+
+    def __init__(self, path: str, taggers, era_boundaries: Iterable[datetime] = (), key: str = ""):
+        """
+        :param key: what is counted (filters of games, taggers, code), statistics stored with another key are
+        collected again from the whole window
+        """
+        self.path = path
+        self.taggers = taggers
+        self.tagging = TeamRoundTagging(taggers)
+        self.era_boundaries = list(era_boundaries)
+        self.key = key
+        self.tag_sets = TeamRoundTagSets()
+        self._game_ids = array("q")
+        self._game_rounds = array("q")
+        self._game_playlists: list[str] = []
+        self._rounds = 0
+        # statistics and games of all stored days, and the window they're reported for, once finished
+        self.statistics: Union[DailyTagWinStats, None] = None
+        self.games: Union[tuple[np.ndarray, np.ndarray, np.ndarray], None] = None
+        self.window: Union[Window, None] = None
+
+    def _load(self) -> DailyTagWinStats:
+        return DailyTagWinStats.load(self.path, self.era_boundaries, self.key)
+
+    def import_start(self, window: Window) -> datetime:
+        """
+        :return: start of games to import for `window`: start of the last stored day, or start of the window
+        if stored statistics don't reach back to it
+        """
+        stored = self._load()
+        start = window[0]
+        if stored.covered_since is None or stored.covered_since > start or stored.resume_date() is None:
+            return start
+        return max(start, stored.resume_date())
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        self.tagging.process_event(event, round, game)
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self._rounds += 1
+        self.tagging.process_round(round, game)
+
+    def process_game(self, game: GameDetails):
+        for round, tags_by_team in self.tagging.process_game(game):
+            for team, tags in tags_by_team.items():
+                self.tag_sets.add(round.map, tags, round.winner == team, epoch_millis(round.start_time))
+        self._game_ids.append(game.id)
+        self._game_playlists.append(game.playlist_code)
+        self._game_rounds.append(self._rounds)
+        self._rounds = 0
+
+    def finish(self, window: Window, imported: Window):
+        """
+        Merges complete days of games imported from `imported` into stored statistics and keeps statistics
+        of all stored days to report `window`
+        """
+        stored = self._load()
+        resume = stored.resume_date()
+        reset = resume is None or stored.covered_since is None or imported[0] > resume + timedelta(days=1)
+        if reset:
+            # stored days don't adjoin imported ones
+            stored = DailyTagWinStats(self.era_boundaries, self.key)
+        self.statistics = stored.merge(
+            DailyTagWinStats.from_tag_sets(self.tag_sets, self.era_boundaries, self.key).whole_days(*imported))
+        self.statistics.save(self.path)
+        con = sqlite3.connect(self.path)
+        with con:
+            con.execute('CREATE TABLE IF NOT EXISTS tag_win_stats_game ("id", "playlist", "rounds")')
+            if reset:
+                con.execute("delete from tag_win_stats_game")
+            else:
+                con.execute("delete from tag_win_stats_game where id >= ? and id <= ?",
+                            (epoch_millis(imported[0]), epoch_millis(imported[1])))
+            con.executemany("insert into tag_win_stats_game values (?, ?, ?)",
+                            zip(self._game_ids.tolist(), self._game_playlists, self._game_rounds.tolist()))
+            games = con.execute("select id, playlist, rounds from tag_win_stats_game order by id").fetchall()
+        con.close()
+        ids, playlists, rounds = zip(*games) if len(games) > 0 else ((), (), ())
+        self.games = (np.array(ids, dtype=np.int64), np.array(playlists, dtype=object),
+                      np.array(rounds, dtype=np.int64))
+        self.window = window
+        self.tag_sets = TeamRoundTagSets()
+
+    def correlations(self) -> TagWinCorrelations:
+        """
+        Correlations and counts of team-rounds in the reported window
+        """
+        return TagWinCorrelations(self.statistics.maps.values, self.statistics.tags.values,
+                                  self.statistics.counts_by_map(*self.window))
+
+    def summary(self) -> Summary:
+        """
+        Summary of games counted in the reported window, as `SummaryCollector.get_summary` of these games
+        """
+        ids, playlists, rounds = self.games
+        counted = self.statistics.within(ids, *self.window)
+        ids, playlists, rounds = ids[counted], playlists[counted], rounds[counted]
+        values, counts = np.unique(playlists.astype(str), return_counts=True)
+        return Summary(
+            first_game_starttime=_start_time(int(ids.min())) if len(ids) > 0 else None,
+            last_game_starttime=_start_time(int(ids.max())) if len(ids) > 0 else None,
+            total_games=len(ids),
+            total_rounds=int(rounds.sum()),
+            games_by_playlist=OrderedDict((str(v), int(c)) for v, c in zip(values, counts))
+        )
@@ -1,22 +1,27 @@
 import sqlite3
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Union, Callable
 
-import pandas as pd
+import numpy as np
 
+from s2_analytics.analyze.bootstrap import BootstrapIntervals, bootstrap_win_correlations
 from s2_analytics.analyze.main_weapon_correlation import OneWeaponCorrelations, Correlation
+from s2_analytics.analyze.tag_correlation import TeamRoundTagSets, TagWinCounts, correlations_by_group
 from s2_analytics.collect.sqlite_collector import SqliteCollector
-from s2_analytics.importer import RoundData, GameDetails, EventData
+from s2_analytics.constants import WeaponModEras
+from s2_analytics.importer import RoundData, GameDetails, EventData, epoch_millis, _has_method
 
 
 class TeamRoundTagCorrelationAnalyzer:
     def __init__(self, conn: sqlite3.Connection, sqlite_collector: SqliteCollector, taggers,
                  round_filter: Union[Callable[[RoundData], bool], None] = None):
         assert sqlite_collector is not None  # ensure dependency met; its tables are used in sqlite queries
-        self.round_filter = round_filter if round_filter is not None else lambda r: True
+        self.round_filter = round_filter if round_filter is not None else _all_rounds
         self.taggers = taggers
+        self.tagging = TeamRoundTagging(taggers)
         self.connection = conn
         self.cursor = self.connection.cursor()
+        self.tag_sets = TeamRoundTagSets()
 
     def init(self) -> "TeamRoundTagCorrelationAnalyzer":
         self._create_tables()
@@ -32,34 +37,23 @@ class TeamRoundTagCorrelationAnalyzer:
     def process_round(self, round: RoundData, game: GameDetails):
         if not self.round_filter(round):
             return
-        for t in self.taggers:
-            t.process_round(round, game)
-            round_tags = t.get_team_round_tags()
-            if round_tags is not None:
-                for team in ["Red", "Blue"]:
-                    tags = round_tags[team]
-                    team_tags = []
-                    for tag in tags:
-                        team_tags.append(tag)
-                    if round.winner == team:
-                        team_tags.append("win")
-                    else:
-                        team_tags.append("lose")
-                    if len(team_tags) == 0:
-                        raise ValueError("each team-round should have at least one entry for joins")
-                    if len(set(team_tags)) != len(team_tags):
-                        raise AssertionError("team tags are supposed to be unique at this point")
-                    for tag in team_tags:
-                        self.cursor.execute("""
-                           insert into team_round_tag values (:game, :round, :team, :tag)
-                        """, {"game": game.id, "round": round.number, "team": team, "tag": tag})
-        self.connection.commit()
+        self.tagging.process_round(round, game)
 
     def process_event(self, event: EventData, round: RoundData, game: GameDetails):
         if not self.round_filter(round):
             return
-        for t in self.taggers:
-            t.process_event(event, round, game)
+        self.tagging.process_event(event, round, game)
+
+    def process_game(self, game: GameDetails):
+        for round, tags_by_team in self.tagging.process_game(game):
+            for team, tags in tags_by_team.items():
+                won = round.winner == team
+                self.tag_sets.add(round.map, tags, won, epoch_millis(round.start_time))
+                team_tags = tags + ["win" if won else "lose"]
+                self.cursor.executemany("""
+                   insert into team_round_tag values (?, ?, ?, ?)
+                """, [(game.id, round.number, team, tag) for tag in team_tags])
+        self.connection.commit()
 
     def tags_by_round(self, tag_filter: Callable[[str], bool] = None):
         if tag_filter is None:
@@ -73,107 +67,260 @@ class TeamRoundTagCorrelationAnalyzer:
                 r.append(t)
         return r
 
+    def correlations(self) -> "TagWinCorrelations":
+        """
+        Correlations and counts of all collected team-rounds
+        """
+        return TagWinCorrelations(self.tag_sets.maps.values, self.tag_sets.tags.values, self.tag_sets.counts_by_map())
+
     def tag_counts(self, tag_filter: Callable[[str], bool] = None, map_name=None):
+        return self.correlations().tag_counts(tag_filter, map_name)
+
+    def calculate_win_correlation(self, map_name=None, weapon_name=None) -> dict[str, float]:
+        return self.correlations().calculate_win_correlation(map_name, weapon_name)
+
+    def correlations_for_weapon_tag(self, weapon_tag) -> OneWeaponCorrelations:
+        return self.correlations_for_weapon_tags([weapon_tag])[weapon_tag]
+
+    def correlations_for_weapon_tags(self, weapon_tags: Union[list[str], None] = None,
+                                     intervals: Union[BootstrapIntervals, None] = None) \
+            -> dict[str, OneWeaponCorrelations]:
+        """
+        Confidence intervals are attached if `intervals` (see `bootstrap_intervals`) are provided.
+        See `TagWinCorrelations.correlations_for_weapon_tags`.
+        """
+        return self.correlations().correlations_for_weapon_tags(weapon_tags, intervals)
+
+    def bootstrap_intervals(self, replicates: int = 1000, confidence: float = 0.95, seed: int = 0,
+                            workers: Union[int, None] = None) -> BootstrapIntervals:
+        return bootstrap_win_correlations(self.tag_sets, replicates, confidence, seed, workers)
+
+    def statistics_per_map(self, tag_filter: Callable[[str], bool] = None,
+                           workers: Union[int, None] = None) -> dict[str, dict[str, Correlation]]:
+        return self.correlations().statistics_per_map(tag_filter, workers)
+
+    def pair_statistics_per_map(self, tag_filter: Callable[[str], bool] = None, min_support: int = 1) \
+            -> dict[str, dict[tuple[str, str], Correlation]]:
+        """
+        Win correlation and sample count of team-rounds having both tags of a pair, for every pair of tags
+        seen together in at least `min_support` team-rounds of a map
+        """
         if tag_filter is None:
             tag_filter = lambda t: True
-        where_clause = ""
-        if map_name is not None:
-            where_clause = f"where mapName = '{map_name}'"
-
-        fetchall = self.cursor.execute(f"""
-               select tag, count(*) as count 
-               from team_round_tag trt
-                   join round r on r.game = trt.game and r.round = trt.round
-                   {where_clause}
-               group by trt.tag 
-               """).fetchall()
-        return {tag: count for tag, count in fetchall if tag_filter(tag)}
-
-    def calculate_win_correlation(self, map_name=None, weapon_name=None):
-        round_filters = []
-        if map_name is not None:
-            round_filters.append(f"r.mapName = '{map_name}'")
-        if weapon_name is not None:
-            round_filters.append(f"trt.tag in ('win', 'lose', '{weapon_name}')")
-        filter_query = " AND ".join(round_filters)
-        where_clause = "" if filter_query == "" else " WHERE " + filter_query
-        resultset = self.cursor.execute(f"""
-            select group_concat(tag, ';') as tags 
-            from team_round_tag trt
-                join round r on r.game = trt.game and r.round = trt.round
-                {where_clause}
-            group by trt.game, trt.round, trt.team 
-            """)
-        cols = set()
-        pd_dicts = []
-        fetchall = resultset.fetchall()
-        for row in fetchall:
-            row_dict = {}
-            for tag in row[0].split(";"):
-                cols.add(tag)
-                row_dict[tag] = 1.0
-            pd_dicts.append(row_dict)
-        from_dict = pd.DataFrame.from_records(pd_dicts)
-        fillna = from_dict \
-            .fillna(0)
-        corr = fillna.corr()
-        data = corr["win"] \
-            .to_dict()
-
-        del data["win"]
-        del data["lose"]
-        return data
+        tags = self.tag_sets.tags.values
+        tag_mask = np.array([tag_filter(tag) for tag in tags], dtype=bool)
+        result = {}
+        for map, counts in zip(self.tag_sets.maps.values, self.tag_sets.pair_counts_by_map(tag_mask, min_support)):
+            correlations = counts.correlations()
+            result[map] = {(tags[first], tags[second]): Correlation(float(correlation), int(sample_count))
+                           for first, second, correlation, sample_count in
+                           zip(counts.first, counts.second, correlations, counts.pair_rows)}
+        return result
 
-    def correlations_for_weapon_tag(self, weapon_tag) -> OneWeaponCorrelations:
-        q = f"""
-            select r.mapName, group_concat(tag, ';') as tags 
-            from team_round_tag trt
-                join round r on r.game = trt.game and r.round = trt.round
-                 WHERE trt.tag in ('win', 'lose', '{weapon_tag}')
-            group by trt.game, trt.round, trt.team 
-            """
-        resultset = self.cursor.execute(q)
-        cols = set()
-        pd_dicts = defaultdict(lambda: [])
-        fetchall = resultset.fetchall()
-        for row in fetchall:
-            row_dict = {}
-            for tag in row[1].split(";"):
-                cols.add(tag)
-                row_dict[tag] = 1.0
-            pd_dicts[row[0]].append(row_dict)
+    def statistics_per_era(self, eras: WeaponModEras, tag_filter: Callable[[str], bool] = None) \
+            -> dict[str, dict[str, Correlation]]:
+        """
+        Win correlation and sample count of every tag in each weapon mod era, keyed by era label
+        """
+        if tag_filter is None:
+            tag_filter = lambda t: True
+        tags = self.tag_sets.tags.values
+        tag_mask = np.array([tag_filter(tag) for tag in tags], dtype=bool)
+        boundaries = np.array([epoch_millis(b) for b in eras.boundaries], dtype=np.int64)
+        row_eras = np.searchsorted(boundaries, self.tag_sets.row_times(), side="right")
+        return correlations_by_group(eras.labels(), tags, tag_mask, self.tag_sets.counts_by_group(row_eras, len(eras)))
+
+    def calculate_win_correlation_per_map(self, workers: Union[int, None] = None) -> dict[str, dict[str, float]]:
+        return self.correlations().calculate_win_correlation_per_map(workers)
+
+    def tag_counts_per_map(self, tag_filter: Callable[[str], bool] = None) -> dict[str, dict[str, int]]:
+        return self.correlations().tag_counts_per_map(tag_filter)
+
+
+class TagWinCorrelations:
+    """
+    Win correlations and sample counts of tags, overall and on each map, from per-map counts of team-rounds
+    (e.g. of collected tags or of stored daily statistics)
+    """
+
+    def __init__(self, maps: list[str], tags: list[str], counts: TagWinCounts):
+        """
+        :param counts: per-map counts, rows indexed by position of maps in `maps`, columns by position of tags
+        """
+        self.maps = maps
+        self.tags = tags
+        self.counts = counts
+
+    def _map_counts(self, map_name=None) -> TagWinCounts:
+        if map_name is None:
+            return TagWinCounts(int(self.counts.rows.sum()), int(self.counts.wins.sum()),
+                                self.counts.tag_rows.sum(axis=0), self.counts.tag_wins.sum(axis=0))
+        if map_name not in self.maps:
+            none = np.zeros(len(self.tags), dtype=np.int64)
+            return TagWinCounts(0, 0, none, none)
+        map_id = self.maps.index(map_name)
+        return TagWinCounts(int(self.counts.rows[map_id]), int(self.counts.wins[map_id]),
+                            self.counts.tag_rows[map_id], self.counts.tag_wins[map_id])
+
+    def _tag_mask(self, tag_filter: Union[Callable[[str], bool], None]) -> np.ndarray:
+        return np.array([tag_filter is None or tag_filter(tag) for tag in self.tags], dtype=bool)
+
+    def tag_counts(self, tag_filter: Callable[[str], bool] = None, map_name=None) -> dict[str, int]:
+        if tag_filter is None:
+            tag_filter = lambda t: True
+        counts = self._map_counts(map_name)
+        result = {self.tags[tag_id]: int(counts.tag_rows[tag_id]) for tag_id in np.flatnonzero(counts.tag_rows)}
+        result.update(_result_tag_counts(counts.rows, counts.wins))
+        return {tag: count for tag, count in result.items() if tag_filter(tag)}
+
+    def calculate_win_correlation(self, map_name=None, weapon_name=None) -> dict[str, float]:
+        counts = self._map_counts(map_name)
+        correlations = counts.correlations()
         result = {}
-        for map in pd_dicts.keys():
-            df = pd.DataFrame.from_records(pd_dicts[map])
-
-            sample_count = int(df[weapon_tag].value_counts()[1]) if weapon_tag in df else 0
-            data = df.fillna(0).corr()["win"].to_dict()
-            del data["win"]
-            del data["lose"]
-
-            result[map] = Correlation(data[weapon_tag] if weapon_tag in data else 0.0, sample_count)
-        return OneWeaponCorrelations(weapon_tag, result)
-
-    def calculate_win_correlation_per_map(self):
-        resultset = self.cursor.execute(f"""
-            select distinct mapName from round
-            """).fetchall()
-        results = {}
-        for map, in resultset:
-            results[map] = self.calculate_win_correlation(map)
-        return results
-
-    def _iter_all_maps(self):
-        resultset = self.cursor.execute(f"""
-            select distinct mapName from round
-            """).fetchall()
-        results = {}
-        for map, in resultset:
-            yield map
-
-    def tag_counts_per_map(self, tag_filter: Callable[[str], bool] = None):
+        for tag_id in np.flatnonzero(counts.tag_rows):
+            tag = self.tags[tag_id]
+            if weapon_name is None or tag == weapon_name:
+                result[tag] = float(correlations[tag_id])
+        return result
+
+    def correlations_for_weapon_tags(self, weapon_tags: Union[list[str], None] = None,
+                                     intervals: Union[BootstrapIntervals, None] = None) \
+            -> dict[str, OneWeaponCorrelations]:
+        """
+        Per-map correlations of many tags from a single scan of counts.
+        All tags seen (except win/lose) are used if `weapon_tags` is not provided.
+        Confidence intervals are attached if `intervals` of the same maps and tags are provided.
+        """
+        if weapon_tags is None:
+            weapon_tags = list(self.tags)
+        tag_ids = {tag: tag_id for tag_id, tag in enumerate(self.tags)}
+        correlations = self.counts.correlations()
         result = {}
-        for map in self._iter_all_maps():
-            result[map] = self.tag_counts(tag_filter, map)
+        for weapon_tag in weapon_tags:
+            tag_id = tag_ids.get(weapon_tag)
+            by_map = {}
+            intervals_by_map = {}
+            for map_id, map in enumerate(self.maps):
+                sample_count = 0 if tag_id is None else int(self.counts.tag_rows[map_id, tag_id])
+                correlation = float(correlations[map_id, tag_id]) if sample_count > 0 else 0.0
+                by_map[map] = Correlation(correlation, sample_count)
+                if intervals is not None and sample_count > 0:
+                    intervals_by_map[map] = intervals.interval(map_id, tag_id)
+            result[weapon_tag] = OneWeaponCorrelations(weapon_tag, by_map, intervals_by_map)
+        return result
+
+    def statistics_per_map(self, tag_filter: Callable[[str], bool] = None,
+                           workers: Union[int, None] = None) -> dict[str, dict[str, Correlation]]:
+        """
+        Win correlation and sample count of every tag on every map.
+        Statistics of maps are split between `workers` processes if more than one is requested.
+        """
+        tag_mask = self._tag_mask(tag_filter)
+        if workers is None or workers <= 1 or len(self.maps) < 2:
+            return correlations_by_group(self.maps, self.tags, tag_mask, self.counts)
 
+        result = {}
+        chunks = [chunk for chunk in np.array_split(np.arange(len(self.maps)), workers) if len(chunk) > 0]
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            futures = [executor.submit(correlations_by_group, [self.maps[i] for i in chunk], self.tags, tag_mask,
+                                       self.counts.take(chunk))
+                       for chunk in chunks]
+            for future in futures:
+                result.update(future.result())
         return result
+
+    def calculate_win_correlation_per_map(self, workers: Union[int, None] = None) -> dict[str, dict[str, float]]:
+        return {map: {tag: c.correlation for tag, c in stats.items()}
+                for map, stats in self.statistics_per_map(workers=workers).items()}
+
+    def tag_counts_per_map(self, tag_filter: Callable[[str], bool] = None) -> dict[str, dict[str, int]]:
+        if tag_filter is None:
+            tag_filter = lambda t: True
+        result = {}
+        for map, stats in correlations_by_group(self.maps, self.tags, self._tag_mask(tag_filter), self.counts).items():
+            map_id = self.maps.index(map)
+            tag_counts = {tag: c.sample_count for tag, c in stats.items()}
+            for tag, count in _result_tag_counts(self.counts.rows[map_id], self.counts.wins[map_id]).items():
+                if tag_filter(tag):
+                    tag_counts[tag] = count
+            result[map] = tag_counts
+        return result
+
+
+class TeamRoundTagging:
+    """
+    Tags of both teams of rounds given by `taggers`, collected until their game ends.
+    Taggers tag each round after `process_round` (`get_team_round_tags`), or, if they have `get_game_round_tags`,
+    all rounds of a game at once after `process_game`, e.g. to search kills of the whole game in one array pass.
+    """
+
+    def __init__(self, taggers):
+        self.taggers = taggers
+        self._game_taggers = [t for t in taggers if _has_method(t, "get_game_round_tags")]
+        self._round_taggers = [t for t in taggers if not _has_method(t, "get_game_round_tags")]
+        self._event_hooks = [t.process_event for t in taggers if _has_method(t, "process_event")]
+        # rounds of the game in progress and tags given to each of them by round taggers
+        self._rounds: list[RoundData] = []
+        self._round_tags: list[list[Union[dict[str, list[str]], None]]] = []
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        for process_event in self._event_hooks:
+            process_event(event, round, game)
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        for t in self._game_taggers:
+            t.process_round(round, game)
+        round_tags = []
+        for t in self._round_taggers:
+            t.process_round(round, game)
+            round_tags.append(t.get_team_round_tags())
+        self._rounds.append(round)
+        self._round_tags.append(round_tags)
+
+    def process_game(self, game: GameDetails) -> list[tuple[RoundData, dict[str, list[str]]]]:
+        """
+        :return: rounds of the game tagged by any of taggers, with tags of both teams
+        """
+        game_tags = []
+        for t in self._game_taggers:
+            t.process_game(game)
+            game_tags.append(t.get_game_round_tags())
+        tagged = []
+        for i, round in enumerate(self._rounds):
+            tags_by_team = _merged_tags(self._round_tags[i] + [tags[i] for tags in game_tags])
+            if tags_by_team is not None:
+                tagged.append((round, tags_by_team))
+        self._rounds, self._round_tags = [], []
+        return tagged
+
+
+def _merged_tags(round_tags: list[Union[dict[str, list[str]], None]]) -> Union[dict[str, list[str]], None]:
+    """
+    Tags of both teams given by all taggers of a round, None if none of them tags the round
+    """
+    tags_by_team = None
+    for tags in round_tags:
+        if tags is not None:
+            if tags_by_team is None:
+                tags_by_team = {"Red": [], "Blue": []}
+            for team in tags_by_team:
+                tags_by_team[team].extend(tags[team])
+    if tags_by_team is not None:
+        for tags in tags_by_team.values():
+            if len(set(tags)) != len(tags):
+                raise AssertionError("team tags are supposed to be unique at this point")
+    return tags_by_team
+
+
+def _all_rounds(round: RoundData) -> bool:
+    return True
+
+
+def _result_tag_counts(rows: int, wins: int) -> dict[str, int]:
+    result = {}
+    if wins > 0:
+        result["win"] = int(wins)
+    if rows - wins > 0:
+        result["lose"] = int(rows - wins)
+    return result
+
@@ -1,4 +1,5 @@
 import datetime
+from bisect import bisect_right
 from typing import List
 
 W_CHAINSAW = "Chainsaw"
@@ -74,6 +75,38 @@ class WeaponModCatalog:
     def previous(self, n=1):
         return self.wms[n]
 
+    def eras(self) -> "WeaponModEras":
+        return WeaponModEras(self.wms)
+
+
+class WeaponModEras:
+    """
+    Splits time into eras separated by weapon mods: era 0 lasts until the oldest mod, era N starts with N-th mod
+    """
+
+    def __init__(self, wms: List[WeaponMod]):
+        self.mods = sorted(wms, key=lambda wm: wm.datetime)
+        self.boundaries = [wm.datetime for wm in self.mods]
+
+    def __len__(self):
+        return len(self.mods) + 1
+
+    def era_of(self, time: datetime.datetime) -> int:
+        return bisect_right(self.boundaries, time)
+
+    def label(self, era: int) -> str:
+        return f"before {self.mods[0]}" if era == 0 else str(self.mods[era - 1])
+
+    def labels(self) -> List[str]:
+        return [self.label(era) for era in range(len(self))]
+
+    def mods_between(self, start: datetime.datetime, end: datetime.datetime = None) -> List[WeaponMod]:
+        """
+        :return: mods released after `start` (and not after `end`)
+        """
+        last = len(self.mods) if end is None else bisect_right(self.boundaries, end)
+        return self.mods[bisect_right(self.boundaries, start):last]
+
 
 WEAPON_MODS = [
     WeaponMod(datetime.datetime(2024, 8, 4, 19, 00), """
@@ -82,3 +115,27 @@ loads of changes =.=
     ]
 
 WEAPON_MODS_CATALOG = WeaponModCatalog(WEAPON_MODS)
+WEAPON_MOD_ERAS = WEAPON_MODS_CATALOG.eras()
+
+# rating tier names indexed by tier number
+TIERS = [
+    "UNRANKED",
+    "BRONZE_I",
+    "BRONZE_II",
+    "BRONZE_III",
+    "SILVER_I",
+    "SILVER_II",
+    "SILVER_III",
+    "GOLD_I",
+    "GOLD_II",
+    "GOLD_III",
+    "PLATINUM_I",
+    "PLATINUM_II",
+    "PLATINUM_III",
+    "DIAMOND_I",
+    "DIAMOND_II",
+    "DIAMOND_III",
+    "CHAMPION_I",
+    "CHAMPION_II",
+    "CHAMPION_III",
+]
@@ -0,0 +1,295 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import zipfile
+from typing import IO, Iterable, Iterator, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+DATA_DIR = "build/markdown/data"
+CHUNK_ROWS = 50_000
+
+# formats published by default; plain "csv" and "parquet" can be asked for, parquet is written only when pyarrow
+# is installed
+FORMATS = ("csv.gz", "npz", "summary.json")
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+def _chunks(data: Union[DataFrame, Iterable[DataFrame]], chunk_rows: int) -> Iterable[DataFrame]:
+    if isinstance(data, DataFrame):
+        for start in range(0, max(len(data), 1), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+class _ColumnSummary:
+    """
+    Summary of a column updated one chunk at a time: range and mean of numbers and dates, most frequent strings
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.kind = None
+        self.count = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.sum = 0.0
+        self.values: dict[str, int] = {}
+
+    def update(self, column: pd.Series):
+        if self.kind is None:
+            self.kind = "date" if pd.api.types.is_datetime64_any_dtype(column) else \
+                "number" if pd.api.types.is_numeric_dtype(column) else "string"
+        present = column.dropna()
+        self.count += len(column)
+        self.nulls += len(column) - len(present)
+        if len(present) == 0:
+            return
+        if self.kind == "string":
+            for value, count in present.astype(str).value_counts(sort=False).items():
+                self.values[value] = self.values.get(value, 0) + int(count)
+            return
+        low, high = present.min(), present.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        if self.kind == "number":
+            self.sum += float(present.sum())
+
+    def to_dict(self, top: int = 10) -> dict:
+        result = {"name": self.name, "kind": self.kind, "count": self.count, "nulls": self.nulls}
+        if self.kind == "string":
+            result["distinct"] = len(self.values)
+            result["top"] = dict(sorted(self.values.items(), key=lambda kv: (-kv[1], kv[0]))[:top])
+        elif self.min is not None:
+            if self.kind == "date":
+                result["min"], result["max"] = self.min.isoformat(), self.max.isoformat()
+            else:
+                result["min"], result["max"] = self.min.item(), self.max.item()
+                result["mean"] = self.sum / (self.count - self.nulls)
+        return result
+
+
+class _SpooledColumn:
+    """
+    Values of one column written to a temporary file chunk by chunk, with dtype and length of each chunk
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.file = tempfile.TemporaryFile()
+        self.parts: list[tuple[np.dtype, int]] = []
+        # strings seen so far and their codes, in order of first appearance
+        self.dictionary: dict[str, int] = {}
+
+    def append(self, values: np.ndarray):
+        self.file.write(np.ascontiguousarray(values).tobytes())
+        self.parts.append((values.dtype, len(values)))
+
+    def __len__(self):
+        return sum(length for _, length in self.parts)
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        self.file.seek(0)
+        for dtype, length in self.parts:
+            yield np.frombuffer(self.file.read(dtype.itemsize * length), dtype=dtype)
+
+
+class _ColumnarWriter:
+    """
+    Writes columns in the .npz form: strings are dictionary encoded (sorted unique values and smallest int codes,
+    -1 for nulls), dates are stored as epoch milliseconds. Chunks are spooled to temporary files, so that only
+    dictionaries of strings are kept in memory.
+    """
+
+    def __init__(self):
+        self.columns: dict[str, _SpooledColumn] = {}
+
+    def update(self, chunk: DataFrame):
+        for name, column in chunk.items():
+            spooled = self.columns.get(str(name))
+            if spooled is None:
+                spooled = self.columns[str(name)] = _SpooledColumn(
+                    "date" if pd.api.types.is_datetime64_any_dtype(column) else
+                    "number" if pd.api.types.is_numeric_dtype(column) else "string")
+            spooled.append(self._encoded(column, spooled))
+
+    @staticmethod
+    def _encoded(column: pd.Series, spooled: _SpooledColumn) -> np.ndarray:
+        if spooled.kind == "date":
+            return column.values.astype("datetime64[ms]").view(np.int64)
+        if spooled.kind == "number":
+            return column.to_numpy()
+        codes, uniques = pd.factorize(column)
+        # codes of nulls are -1, which picks the last element
+        known = [spooled.dictionary.setdefault(str(value), len(spooled.dictionary)) for value in uniques]
+        return np.array(known + [-1], dtype=np.int64)[codes]
+
+    def save(self, path: str):
+        """
+        Same as `np.savez_compressed`, but with fixed timestamps of entries so that same arrays give the same file
+        """
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, column in self.columns.items():
+                if column.kind == "string":
+                    values = np.array(list(column.dictionary), dtype=str)
+                    order = np.argsort(values, kind="stable")
+                    # position of each code in sorted values, with -1 kept for nulls
+                    sorted_codes = np.full(len(values) + 1, -1, dtype=np.int64)
+                    sorted_codes[order] = np.arange(len(values))
+                    with _npz_entry(archive, f"{name}.values") as f:
+                        np.lib.format.write_array(f, values[order], allow_pickle=False)
+                    _write_npy(archive, f"{name}.codes", np.min_scalar_type(-max(len(values), 1)), len(column),
+                               (sorted_codes[codes] for codes in column.chunks()))
+                elif column.kind == "date":
+                    _write_npy(archive, f"{name}.epoch_millis", np.dtype(np.int64), len(column), column.chunks())
+                else:
+                    dtype = np.result_type(*[dtype for dtype, _ in column.parts]) if column.parts else np.float64
+                    _write_npy(archive, name, dtype, len(column), column.chunks())
+
+    def close(self):
+        for column in self.columns.values():
+            column.file.close()
+
+
+def _npz_entry(archive: zipfile.ZipFile, name: str) -> IO[bytes]:
+    entry = zipfile.ZipInfo(f"{name}.npy", date_time=(1980, 1, 1, 0, 0, 0))
+    entry.compress_type = zipfile.ZIP_DEFLATED
+    return archive.open(entry, "w", force_zip64=True)
+
+
+def _write_npy(archive: zipfile.ZipFile, name: str, dtype: np.dtype, length: int, chunks: Iterable[np.ndarray]):
+    """
+    Writes an .npy entry of a 1-d array one chunk at a time
+    """
+    with _npz_entry(archive, name) as f:
+        np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(dtype),
+                                                 "fortran_order": False, "shape": (length,)})
+        for chunk in chunks:
+            f.write(chunk.astype(dtype, copy=False).tobytes())
+
+
+class _ParquetWriter:
+    """
+    Appends chunks to a parquet file as row groups
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+
+    def update(self, chunk: DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # index is kept as a column, as a range index of a chunk wouldn't describe the whole table
+        table = pa.Table.from_pandas(chunk, preserve_index=True)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        elif not table.schema.equals(self.writer.schema, check_metadata=False):
+            # e.g. a column of strings with nulls only in this chunk
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            pq.write_table(pa.table({}), self.path)
+        else:
+            self.writer.close()
+
+
+def _replace_if_changed(temporary: str, path: str):
+    """
+    Keeps the existing file (and its modification time, for incremental site builds) if content is the same
+    """
+    if os.path.isfile(path) and os.path.getsize(path) == os.path.getsize(temporary):
+        with open(path, "rb") as old, open(temporary, "rb") as new:
+            if old.read() == new.read():
+                os.remove(temporary)
+                return
+    os.replace(temporary, path)
+
+
+def _open_gzip_text(path: str):
+    # without name and modification time in the header, same content gives the same file
+    raw = open(path, "wb")
+    return raw, io.TextIOWrapper(gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=6, mtime=0),
+                                 newline="")
+
+
+def export_table(data: Union[DataFrame, Iterable[DataFrame]], id: str, directory: str = DATA_DIR,
+                 formats: Iterable[str] = FORMATS, chunk_rows: int = CHUNK_ROWS) -> dict[str, str]:
+    """
+    Exports a table as gzipped and/or plain csv, columnar .npz and parquet, and a JSON summary of its columns.
+    `data` can be a DataFrame or an iterable of DataFrame chunks (e.g. `pd.read_sql_query(..., chunksize=)`),
+    which are written one at a time.
+    :return: file names of exported formats, relative to `directory`
+    """
+    formats = [f for f in formats if f != "parquet" or _parquet_available()]
+    os.makedirs(directory, exist_ok=True)
+    names = {format: f"{id}.{format}" for format in formats}
+    temporary = {format: os.path.join(directory, f".{name}.tmp") for format, name in names.items()}
+
+    # text files written with the csv, each with the raw file under it if there is one
+    csv_files: list[tuple[IO[str], Union[IO[bytes], None]]] = []
+    if "csv.gz" in formats:
+        raw_file, csv_file = _open_gzip_text(temporary["csv.gz"])
+        csv_files.append((csv_file, raw_file))
+    if "csv" in formats:
+        csv_files.append((open(temporary["csv"], "w", newline=""), None))
+    columnar = _ColumnarWriter() if "npz" in formats else None
+    parquet = _ParquetWriter(temporary["parquet"]) if "parquet" in formats else None
+    summaries: dict[str, _ColumnSummary] = {}
+    rows = 0
+    try:
+        for i, chunk in enumerate(_chunks(data, chunk_rows)):
+            for csv_file, _ in csv_files:
+                chunk.to_csv(csv_file, header=i == 0)
+            if columnar is not None:
+                columnar.update(chunk)
+            if parquet is not None:
+                parquet.update(chunk)
+            for name, column in chunk.items():
+                summaries.setdefault(str(name), _ColumnSummary(str(name))).update(column)
+            rows += len(chunk)
+        if columnar is not None:
+            columnar.save(temporary["npz"])
+    finally:
+        for csv_file, raw_file in csv_files:
+            csv_file.close()
+            if raw_file is not None:
+                raw_file.close()
+        if columnar is not None:
+            columnar.close()
+        if parquet is not None:
+            parquet.close()
+
+    if "summary.json" in formats:
+        with open(temporary["summary.json"], "w") as f:
+            json.dump({"id": id, "rows": rows, "columns": [s.to_dict() for s in summaries.values()]}, f, indent=1)
+
+    for format, name in names.items():
+        _replace_if_changed(temporary[format], os.path.join(directory, name))
+    return names
+
+
+def data_links(names: dict[str, str], prefix: str = "data/") -> str:
+    """
+    Markdown links to exported files of a table
+    """
+    return "Chart data: " + ", ".join(f"[{format}]({prefix}{name})" for format, name in names.items())
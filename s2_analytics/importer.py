@@ -1,11 +1,16 @@
 import json
 import re
+import time
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cached_property
 from os import listdir
 from os.path import isfile, join
-from typing import Union, Protocol, List, Callable
+from typing import Union, Protocol, List, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from s2_analytics.instrumentation import ImportStats
 
 
 @dataclass
@@ -76,11 +81,16 @@ class EventProcessor(Protocol):
         ...
 
 
+class RatingProcessor(Protocol):
+    def process_ratings(self, ratings: "GameRatings", game: GameDetails):
+        ...
+
+
 class FullProcessor(GameProcessor, RoundProcessor, EventProcessor):
     pass
 
 
-Processor = Union[GameProcessor, RoundProcessor, EventProcessor]
+Processor = Union[GameProcessor, RoundProcessor, EventProcessor, RatingProcessor]
 
 
 @dataclass
@@ -94,10 +104,18 @@ class EventKill:
     victim_team: str
     weapon: str
 
-    @property
+    # cached, as the same event is passed to many processors
+    @cached_property
     def date_iso(self) -> str:
         return self.timestamp.strftime('%Y-%m-%d')
 
+    @cached_property
+    def timestamp_sql(self) -> str:
+        """
+        Timestamp as sqlite3 stores datetimes by default
+        """
+        return self.timestamp.isoformat(" ")
+
 
 @dataclass
 class EventFlagCap:
@@ -107,10 +125,34 @@ class EventFlagCap:
     capping_player_id: str
     capping_team: str
 
-    @property
+    @cached_property
     def date_iso(self) -> str:
         return self.timestamp.strftime('%Y-%m-%d')
 
+    @cached_property
+    def timestamp_sql(self) -> str:
+        return self.timestamp.isoformat(" ")
+
+
+@dataclass
+class GameRatings:
+    """
+    Ratings of players before and after a game, one column per rating attribute
+    """
+    game_id: int
+    players: list[str]
+    mu_before: list[float]
+    sigma_before: list[float]
+    tier_before: list[int]
+    mu_after: list[float]
+    sigma_after: list[float]
+    tier_after: list[int]
+    kills: list[int]
+    deaths: list[int]
+
+    def __len__(self):
+        return len(self.players)
+
 
 EventData = Union[EventFlagCap, EventKill]
 RoundsEventData = List[List[EventData]]
@@ -137,12 +179,27 @@ class Game:
         return players
 
 
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def epoch_millis(time: datetime) -> int:
+    """
+    Milliseconds since unix epoch of a naive UTC datetime (as produced by the importer)
+    """
+    return (time - _EPOCH) // _MILLISECOND
+
+
 def import_games(logs_dir: str, period_days: int = 60, start_date=None, end_date=None,
                  processors: List[Union[GameProcessor, EventProcessor, RoundProcessor]] = None,
-                 game_filters: List[GameFilter] = None
+                 game_filters: List[GameFilter] = None,
+                 stats: "ImportStats" = None
                  ):
-    decoder = JsonGameDeserializer(processors, game_filters=game_filters)
-    for game_json in read_games_dir(logs_dir, period_days, start_date, end_date):
+    """
+    :param stats: collects time spent reading, decoding and in each processor, imports aren't timed without it
+    """
+    decoder = JsonGameDeserializer(processors, game_filters=game_filters, stats=stats)
+    for game_json in read_games_dir(logs_dir, period_days, start_date, end_date, stats):
         decoder.deserialize_game(game_json)
 
 
@@ -150,23 +207,34 @@ def _has_method(obj, method):
     return callable(getattr(obj, method, None))
 
 
-def read_games_dir(logs_dir: str, period_days: int = 60, start_date: datetime = None, end_date: datetime = None):
+def read_games_dir(logs_dir: str, period_days: int = 60, start_date: datetime = None, end_date: datetime = None,
+                   stats: "ImportStats" = None):
+    """
+    Loads game logs one at a time, in order of game start time
+    """
     if start_date is None:
         start_date = datetime.today() - timedelta(days=period_days)
     if end_date is None:
         end_date = datetime.today() + timedelta(days=1)
-    games = _read_games_json(logs_dir, start_date, end_date)
-
-    for gameData in games:
-        yield gameData
-
-
-def _read_games_json(logs_dir, start_timestamp: datetime, end_timestamp: datetime):
-    logs = [f for f in listdir(logs_dir) if isfile(join(logs_dir, f))]
-    games = []
-    for log in logs:
+    for log_path in _game_log_paths(logs_dir, start_date, end_date):
+        if stats is None:
+            with open(log_path, "r") as f:
+                yield json.load(f)
+            continue
+        started = time.perf_counter()
+        with open(log_path, "r") as f:
+            text = f.read()
+        read = time.perf_counter()
+        data = json.loads(text)
+        stats.record_file(len(text), read - started, time.perf_counter() - read)
+        yield data
+
+
+def _game_log_paths(logs_dir, start_timestamp: datetime, end_timestamp: datetime) -> list[str]:
+    logs = []
+    for log in listdir(logs_dir):
         match = re.match("^game_([0-9]{13}).json", log)
-        if not match:
+        if not match or not isfile(join(logs_dir, log)):
             continue
         timestamp = int(match.group(1))
         game_start_time = datetime.utcfromtimestamp(timestamp / 1000)
@@ -174,45 +242,67 @@ def _read_games_json(logs_dir, start_timestamp: datetime, end_timestamp: datetim
             continue
         if game_start_time > end_timestamp:
             continue
-        with open(logs_dir + "/" + log, "r") as f:
-            games.append(json.load(f))
-    return games
+        logs.append((timestamp, logs_dir + "/" + log))
+    return [path for _, path in sorted(logs)]
 
 
 class JsonGameDeserializer:
     def __init__(self, processors: list[Union[GameProcessor, RoundProcessor, EventProcessor]] = None,
-                 game_filters: Union[GameFilter, List[GameFilter]] = None):
+                 game_filters: Union[GameFilter, List[GameFilter]] = None, stats: "ImportStats" = None):
         game_filters = game_filters if game_filters is not None else []
         self.game_filters = game_filters if isinstance(game_filters, list) else [game_filters]
         if processors is None:
             processors = []
+        self.stats = stats
+        if stats is not None:
+            processors = [stats.timed(p) for p in processors]
         self.game_processors = [p for p in processors if _has_method(p, "process_game")]
         self.round_processors = [p for p in processors if _has_method(p, "process_round")]
         self.event_processors = [p for p in processors if _has_method(p, "process_event")]
+        self.rating_processors = [p for p in processors if _has_method(p, "process_ratings")]
 
     def deserialize_games(self, game_json_datas: list[dict]):
         for data in game_json_datas:
             self.deserialize_game(data)
 
     def deserialize_game(self, game_json_data: dict):
+        if self.stats is None:
+            self._deserialize_game(game_json_data)
+            return
+        started = time.perf_counter()
+        imported = self._deserialize_game(game_json_data)
+        self.stats.record_game(game_json_data, imported, time.perf_counter() - started)
+
+    def _deserialize_game(self, game_json_data: dict) -> bool:
+        """
+        :return: whether the game was passed to processors
+        """
         try:
             game: GameDetails = self._decode_game(game_json_data)
         except NotImplementedError as e:
-            return
-        if all([f(game) for f in self.game_filters]):
-            for i, round_data in enumerate(game_json_data["rounds"]):
-                round = self._decode_round(i + 1, round_data, game)
-                for event_data in round_data["events"]:
-                    if len(self.event_processors) > 0:
-                        event = self._decode_event(event_data, round, game)
-                        for processor in self.event_processors:
-                            processor.process_event(event, round, game)
-
-                for processor in self.round_processors:
-                    processor.process_round(round, game)
-
-            for processor in self.game_processors:
-                processor.process_game(game)
+            return False
+        if not all([f(game) for f in self.game_filters]):
+            return False
+        for i, round_data in enumerate(game_json_data["rounds"]):
+            round = self._decode_round(i + 1, round_data, game)
+            for event_data in round_data["events"]:
+                if len(self.event_processors) > 0:
+                    event = self._decode_event(event_data, round, game)
+                    for processor in self.event_processors:
+                        processor.process_event(event, round, game)
+
+            for processor in self.round_processors:
+                processor.process_round(round, game)
+
+        if len(self.rating_processors) > 0:
+            ratings = self._decode_ratings(game_json_data, game)
+            if ratings is not None:
+                for processor in self.rating_processors:
+                    processor.process_ratings(ratings, game)
+
+        for processor in self.game_processors:
+            processor.process_game(game)
+        return True
 
     def _decode_event(self, data: dict, round: RoundData, game: GameDetails) -> EventData:
         if data["type"] == "PLAYER_KILL":
@@ -247,7 +337,29 @@ class JsonGameDeserializer:
             round["redCaps"]
         )
 
+    def _decode_ratings(self, data: dict, game: GameDetails) -> Union[GameRatings, None]:
+        rated = [p for p in data.get("players", [])
+                 if p.get("oldRating") is not None and p.get("newRating") is not None]
+        if len(rated) == 0:
+            return None
+        kills_and_deaths = data.get("playerKillsAndDeaths", {})
+        no_kills = {"kills": 0, "deaths": 0}
+        return GameRatings(
+            game.id,
+            [p["playfabId"] for p in rated],
+            [p["oldRating"]["mu"] for p in rated],
+            [p["oldRating"]["sigma"] for p in rated],
+            [p["oldRating"]["tierNumber"] for p in rated],
+            [p["newRating"]["mu"] for p in rated],
+            [p["newRating"]["sigma"] for p in rated],
+            [p["newRating"]["tierNumber"] for p in rated],
+            [kills_and_deaths.get(p["playfabId"], no_kills)["kills"] for p in rated],
+            [kills_and_deaths.get(p["playfabId"], no_kills)["deaths"] for p in rated],
+        )
+
     def _decode_game(self, data: dict) -> GameDetails:
+        if "playlistCode" not in data and "redPlayers" in data:
+            return self._decode_legacy_game(data)
         playlist_code = data["playlistCode"]
         if "Red" not in data["teamRoundWins"]:
             raise NotImplementedError("no support for custom team names: " + ", ".join(data["teamRoundWins"]))
@@ -266,3 +378,18 @@ class JsonGameDeserializer:
             data["matchQuality"],
             data["teamWinProbabilities"]
         )
+
+    def _decode_legacy_game(self, data: dict) -> GameDetails:
+        """
+        Games logged before playlists were introduced (e.g. first tournament) list players of each team separately
+        """
+        return GameDetails(
+            data["startTime"],
+            datetime.utcfromtimestamp(data["startTime"] / 1000),
+            None,
+            data["blueRoundWins"],
+            data["redRoundWins"],
+            {"Red": list(data["redPlayers"]), "Blue": list(data["bluePlayers"])},
+            data["matchQuality"],
+            {"Red": data["redWinProbability"], "Blue": data["blueWinProbability"]}
+        )
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+from datetime import datetime
+from glob import glob
+from typing import Union
+
+from s2_analytics.importer import GameDetails, JsonGameDeserializer, _game_log_paths
+from s2_analytics.session import Report, SESSION_DIR
+
+MANIFEST_PATH = "build/manifest.json"
+# fingerprints of reports at the time of the latest session run, used by later build steps
+FINGERPRINTS_PATH = f"{SESSION_DIR}/fingerprints.json"
+MARKDOWN_DIR = "build/markdown"
+# details of games of all logs read by earlier builds
+GAME_INDEX_PATH = "build/game_index.pickle"
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _digest(*parts: Union[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return _digest(f.read())
+
+
+def code_version() -> str:
+    """
+    Digest of all s2_analytics sources, any change of code may change any report
+    """
+    paths = sorted(glob(os.path.join(_PACKAGE_DIR, "**", "*.py"), recursive=True))
+    return _digest(*[os.path.relpath(p, _PACKAGE_DIR) + file_digest(p) for p in paths])
+
+
+def logs_digest(logs_dir: str, start_date: datetime, end_date: datetime) -> str:
+    """
+    Digest of names, sizes and modification times of game logs started between `start_date` and `end_date`
+    """
+    parts = []
+    for path in _game_log_paths(logs_dir, start_date, end_date):
+        stat = os.stat(path)
+        parts.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return _digest(*parts)
+
+
+class _GameDetails:
+    def __init__(self):
+        self.game: Union[GameDetails, None] = None
+
+    def process_game(self, game: GameDetails):
+        self.game = game
+
+
+class GameIndex:
+    """
+    Details of games of logs, by log file name. A log is read and decoded again only if it is new,
+    or its size or modification time changed since it was indexed. Logs indexed by other code are read again.
+    """
+
+    def __init__(self, path: str = GAME_INDEX_PATH, version: str = None):
+        self.path = path
+        self.version = version if version is not None else code_version()
+        # log file name: size, modification time and details of its game (None for logs not imported)
+        self.entries: dict[str, tuple[int, int, Union[GameDetails, None]]] = {}
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+            if saved["version"] == self.version:
+                self.entries = saved["entries"]
+
+    def games(self, logs_dir: str, start_date: datetime, end_date: datetime) -> list[GameDetails]:
+        """
+        :return: details of games of logs started between `start_date` and `end_date`, in order of start time
+        """
+        games = []
+        for path in _game_log_paths(logs_dir, start_date, end_date):
+            name, stat = os.path.basename(path), os.stat(path)
+            entry = self.entries.get(name)
+            if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+                details = _GameDetails()
+                with open(path) as f:
+                    JsonGameDeserializer([details]).deserialize_game(json.load(f))
+                entry = self.entries[name] = (stat.st_size, stat.st_mtime_ns, details.game)
+            if entry[2] is not None:
+                games.append(entry[2])
+        return games
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "wb") as f:
+            pickle.dump({"version": self.version, "entries": self.entries}, f)
+
+
+def notebook_fingerprint(notebook: str, version: str = None) -> str:
+    """
+    Fingerprint of a notebook that doesn't declare the games it reads
+    """
+    return _digest(version if version is not None else code_version(), file_digest(notebook))
+
+
+def report_fingerprints(reports: list[Report], logs_dir: str = "logs_ranked/",
+                        index_path: str = GAME_INDEX_PATH) -> dict[str, str]:
+    """
+    Fingerprints of reports' inputs: ids of games each report selects, code version and the report's notebook
+    (which holds its parameters) if there is one. Games are selected from details kept in a `GameIndex`,
+    so only logs added or changed since the previous build are read.
+    """
+    windows = {report.name: report.window() for report in reports}
+    version = code_version()
+    index = GameIndex(index_path, version)
+    games = index.games(logs_dir, min(start for start, _ in windows.values()),
+                        max(end for _, end in windows.values()))
+    index.save()
+    fingerprints = {}
+    for report in reports:
+        notebook = f"{report.name}.ipynb"
+        notebook_digest = file_digest(notebook) if os.path.isfile(notebook) else ""
+        start, end = windows[report.name]
+        # same selection as the session's, see `_ReportDispatcher`
+        ids = [g.id for g in games if start <= g.start_time <= end and all(f(g) for f in report.game_filters)]
+        fingerprints[report.name] = _digest(version, notebook_digest, ",".join(str(i) for i in ids))
+    return fingerprints
+
+
+def save_fingerprints(fingerprints: dict[str, str], path: str = FINGERPRINTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fingerprints, f, indent=1)
+
+
+def load_fingerprints(path: str = FINGERPRINTS_PATH) -> dict[str, str]:
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def linked_files(markdown_path: str) -> list[str]:
+    """
+    Local files a markdown document links to (charts, data), relative to its directory
+    """
+    with open(markdown_path) as f:
+        targets = re.findall(r"\]\(([^)\s]+)\)", f.read())
+    return sorted({t for t in targets if "://" not in t and not t.startswith(("/", "#", "mailto:"))})
+
+
+class BuildManifest:
+    """
+    Fingerprints of inputs of reports whose outputs in `markdown_dir` are up to date, with files of these outputs
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH, markdown_dir: str = MARKDOWN_DIR):
+        self.path = path
+        self.markdown_dir = markdown_dir
+        # report name: {"fingerprint": ..., "outputs": [paths relative to markdown_dir]}
+        self.entries: dict[str, dict] = {}
+        if os.path.isfile(path):
+            with open(path) as f:
+                # entries of older manifests, holding only a fingerprint, are dropped
+                self.entries = {name: entry for name, entry in json.load(f).items() if isinstance(entry, dict)}
+
+    def is_current(self, name: str, fingerprint: Union[str, None]) -> bool:
+        entry = self.entries.get(name)
+        return fingerprint is not None and entry is not None and entry["fingerprint"] == fingerprint and \
+            all(os.path.isfile(os.path.join(self.markdown_dir, output)) for output in entry["outputs"])
+
+    def outputs(self, name: str) -> list[str]:
+        """
+        Markdown of a report and files it links to
+        """
+        markdown = f"{name}.md"
+        path = os.path.join(self.markdown_dir, markdown)
+        return [markdown] + (linked_files(path) if os.path.isfile(path) else [])
+
+    def record(self, name: str, fingerprint: str, outputs: list[str] = None):
+        """
+        :param outputs: files of the report relative to `markdown_dir`, `outputs(name)` by default
+        """
+        self.entries[name] = {"fingerprint": fingerprint,
+                              "outputs": sorted(outputs if outputs is not None else self.outputs(name))}
+
+    def forget(self, name: str):
+        self.entries.pop(name, None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
@@ -0,0 +1,174 @@
+import time
+from typing import Any, Callable, Union
+
+from s2_analytics.importer import _has_method
+
+HOOKS = ["process_game", "process_round", "process_event", "process_ratings"]
+
+
+class _HookTiming:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.
+
+
+def _timed_hook(hook: Callable, timing: _HookTiming) -> Callable:
+    perf_counter = time.perf_counter
+
+    def call(*args):
+        started = perf_counter()
+        try:
+            return hook(*args)
+        finally:
+            timing.seconds += perf_counter() - started
+            timing.calls += 1
+
+    return call
+
+
+class _TimedProcessor:
+    """
+    Stands in for a processor, timing each of its hooks. Only hooks the processor has are bound,
+    so that the importer decodes the same data as for the processor itself.
+    """
+
+    def __init__(self, processor: Any, timings: dict[str, _HookTiming]):
+        self.processor = processor
+        for hook in HOOKS:
+            if _has_method(processor, hook):
+                setattr(self, hook, _timed_hook(getattr(processor, hook), timings.setdefault(hook, _HookTiming())))
+
+
+class ImportStats:
+    """
+    Where time of an import goes: reading and parsing of game logs, decoding, and each hook of each processor.
+    Pass it to `import_games` (or `JsonGameDeserializer`, `AnalysisSession.run`) to collect it; imports without
+    it aren't instrumented at all.
+    Decoding time is time of deserializing games not spent in processors.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.read_seconds = 0.
+        self.parse_seconds = 0.
+        self.deserialize_seconds = 0.
+        self.games = 0
+        self.skipped_games = 0
+        self.rounds = 0
+        self.events = 0
+        self.processors: dict[str, dict[str, _HookTiming]] = {}
+        # names of timed processors called by other timed processors, their time is part of their caller's
+        self._callers: dict[str, str] = {}
+
+    def timed(self, processor: Any, name: str = None, caller: str = None) -> Any:
+        """
+        :param name: name in the report, class name of the processor by default
+        :param caller: name of the timed processor calling this one, if it isn't called by the importer
+        :return: processor timing hooks of `processor` into these stats
+        """
+        if isinstance(processor, _TimedProcessor):
+            return processor
+        name = name if name is not None else type(processor).__name__
+        unique, n = name, 1
+        while unique in self.processors:
+            n += 1
+            unique = f"{name}#{n}"
+        if caller is not None:
+            self._callers[unique] = caller
+        return _TimedProcessor(processor, self.processors.setdefault(unique, {}))
+
+    def record_file(self, size: int, read_seconds: float, parse_seconds: float):
+        self.files += 1
+        self.bytes += size
+        self.read_seconds += read_seconds
+        self.parse_seconds += parse_seconds
+
+    def record_game(self, data: dict, imported: bool, seconds: float):
+        self.deserialize_seconds += seconds
+        if not imported:
+            self.skipped_games += 1
+            return
+        self.games += 1
+        self.rounds += len(data["rounds"])
+        self.events += sum(len(r["events"]) for r in data["rounds"])
+
+    @property
+    def processors_seconds(self) -> float:
+        return sum(t.seconds for name, hooks in self.processors.items() if name not in self._callers
+                   for t in hooks.values())
+
+    @property
+    def decode_seconds(self) -> float:
+        return max(self.deserialize_seconds - self.processors_seconds, 0.)
+
+    @property
+    def total_seconds(self) -> float:
+        return self.read_seconds + self.parse_seconds + self.deserialize_seconds
+
+    def _per_second(self, count: int) -> float:
+        return count / self.total_seconds if self.total_seconds > 0 else 0.
+
+    def to_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "games": self.games,
+            "skipped_games": self.skipped_games,
+            "rounds": self.rounds,
+            "events": self.events,
+            "seconds": {
+                "read": self.read_seconds,
+                "parse": self.parse_seconds,
+                "decode": self.decode_seconds,
+                "processors": self.processors_seconds,
+                "total": self.total_seconds,
+            },
+            "per_second": {
+                "games": self._per_second(self.games),
+                "rounds": self._per_second(self.rounds),
+                "events": self._per_second(self.events),
+            },
+            "processors": {
+                name: {
+                    "caller": self._callers.get(name),
+                    "seconds": sum(t.seconds for t in hooks.values()),
+                    "hooks": {hook: {"calls": t.calls, "seconds": t.seconds} for hook, t in hooks.items()},
+                } for name, hooks in self.processors.items()
+            },
+        }
+
+    def table(self) -> str:
+        """
+        Printable report, processors slowest first, each one followed by processors it calls
+        """
+        total = self.total_seconds
+        rows: list[tuple[str, Any, float]] = [("read", self.files, self.read_seconds),
+                                              ("parse", self.files, self.parse_seconds),
+                                              ("decode", self.games + self.skipped_games, self.decode_seconds)]
+
+        def processor_rows(caller: Union[str, None], indent: str):
+            called = [name for name in self.processors if self._callers.get(name) == caller]
+            for name in sorted(called, key=lambda n: -sum(t.seconds for t in self.processors[n].values())):
+                hooks = self.processors[name]
+                rows.append((f"{indent}{name}", "", sum(t.seconds for t in hooks.values())))
+                for hook, timing in hooks.items():
+                    rows.append((f"{indent}  {hook}", timing.calls, timing.seconds))
+                processor_rows(name, indent + "    ")
+
+        processor_rows(None, "")
+        width = max(len(name) for name, _, _ in rows)
+        lines = [
+            f"{self.files} files ({self.bytes / 1e6:.1f} MB), {self.games} games ({self.skipped_games} skipped), "
+            f"{self.rounds} rounds, {self.events} events in {total:.3f}s: "
+            f"{self._per_second(self.games):.0f} games/s, {self._per_second(self.rounds):.0f} rounds/s, "
+            f"{self._per_second(self.events):.0f} events/s",
+            f"{'':{width}} {'calls':>9} {'seconds':>9} {'share':>7}",
+        ]
+        for name, calls, seconds in rows:
+            share = f"{100 * seconds / total:6.1f}%" if total > 0 else f"{'-':>7}"
+            lines.append(f"{name:{width}} {calls:>9} {seconds:9.3f} {share}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.table()
@@ -1,9 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
 from typing import Union
 
+import matplotlib
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
 from matplotlib import pyplot as plt
+from matplotlib.colors import to_rgb
 from matplotlib.figure import Figure
 from matplotlib.offsetbox import AnchoredText
 
@@ -25,6 +29,30 @@ class MinMax:
         return self.min, self.max
 
 
+def shared_limits(weapon_corr: list[OneWeaponCorrelations]) -> tuple[MinMax, MinMax]:
+    """
+    :return: limits of correlations and of sample counts over all maps of all weapons, for charts drawn to scale
+    """
+    minmax_corr = MinMax(0, 0)
+    minmax_samples = MinMax(0, 0)
+    for w in weapon_corr:
+        for map in w.maps:
+            minmax_corr.update(w.correlation(map))
+            minmax_samples.update(w.sample_count(map))
+    return minmax_corr, minmax_samples
+
+
+def _barh(ax, frame: pd.DataFrame, x: str, y: str):
+    """
+    Horizontal bars looking like seaborn's barplot of one value per category, without its aggregation overhead
+    """
+    positions = np.arange(len(frame))
+    ax.barh(positions - 0.4, frame[x], height=0.8, align="edge", color=sns.desaturate(to_rgb("C0"), 0.75))
+    ax.set_yticks(positions, frame[y])
+    ax.set_ylim(len(frame) - 0.5, -0.5)
+    ax.yaxis.grid(False)
+
+
 class CorrelationChartMaker:
     def _chart_height(self, maps_count):
         return max(3, maps_count / 15 * 3.3) if maps_count > 0 else 1.5
@@ -33,12 +61,7 @@ class CorrelationChartMaker:
         weapon_corr = [w.filter(min_samples) for w in weapon_corr]
         chart_height = sum([self._chart_height(len(w.maps)) for w in weapon_corr])
 
-        minmax_corr = MinMax(0, 0)
-        minmax_samples = MinMax(0, 0)
-        for w in weapon_corr:
-            for map in w.maps:
-                minmax_corr.update(w.correlation(map))
-                minmax_samples.update(w.sample_count(map))
+        minmax_corr, minmax_samples = shared_limits(weapon_corr)
 
         fig, axes = plt.subplots(len(weapon_corr), 2)
         fig: Figure
@@ -57,7 +80,7 @@ class CorrelationChartMaker:
             self._subplot(corr, min_samples, corr_ax, samples_ax)
 
     def plot(self, weapon_corr: OneWeaponCorrelations, min_samples=None, count_max: float = None,
-             corr_minmax: tuple[float, float] = None):
+             corr_minmax: tuple[float, float] = None) -> Figure:
         if min_samples is not None:
             weapon_corr = weapon_corr.filter(min_samples)
         maps_count = len(weapon_corr.maps)
@@ -69,6 +92,7 @@ class CorrelationChartMaker:
         axes: list["AxesSubplot"]
         axes = axes.flatten()
         self._subplot(weapon_corr, min_samples, axes[0], axes[1], count_max, corr_minmax)
+        return fig
 
     def _calculate_chart_height(self, maps_count):
         return 1.5 + maps_count / 15 * 3
@@ -82,13 +106,15 @@ class CorrelationChartMaker:
             if min_samples is not None and sample_count < min_samples:
                 skipped_maps.append(map)
             else:
-                data.append((f"{map:>20}", weapon_corr.correlation(map), sample_count))
+                correlation = weapon_corr.correlation(map)
+                low, high = weapon_corr.confidence_interval(map) or (correlation, correlation)
+                data.append((f"{map:>20}", correlation, sample_count, low, high))
 
         if count_max is not None:
             ax_cnt.set(xlim=(0, count_max))
         if corr_minmax is not None:
             ax_corr.set(xlim=corr_minmax)
-        frame = pd.DataFrame(data, columns=["map", "corr", "cnt"]).sort_values(["corr"], ascending=False)
+        frame = pd.DataFrame(data, columns=["map", "corr", "cnt", "low", "high"]).sort_values(["corr"], ascending=False)
         if len(skipped_maps) > 0:
             at = AnchoredText(
                 f"skipped {len(skipped_maps)} maps with less than {min_samples} samples", prop=dict(size=7),
@@ -97,7 +123,44 @@ class CorrelationChartMaker:
             ax_cnt.add_artist(at)
 
         if len(frame) > 0:
-            sns.barplot(frame, x="corr", y="map", ax=ax_corr) \
-                .set(xlabel="Round victory correlation coefficient", ylabel=None)
-            sns.barplot(frame, x="cnt", y="map", ax=ax_cnt) \
-                .set(xlabel="Count of entries", ylabel=None)
+            _barh(ax_corr, frame, x="corr", y="map")
+            ax_corr.set(xlabel="Round victory correlation coefficient", ylabel=None)
+            # percentile intervals may not contain the estimate, so arms are clipped; NaN intervals aren't drawn
+            positions = np.arange(len(frame))
+            drawn = np.isfinite(frame["low"].to_numpy()) & np.isfinite(frame["high"].to_numpy()) & \
+                (frame["low"] != frame["high"]).to_numpy()
+            if drawn.any():
+                shown = frame[drawn]
+                ax_corr.errorbar(shown["corr"], positions[drawn], fmt="none", ecolor="black", capsize=2,
+                                 xerr=[np.clip(shown["corr"] - shown["low"], 0, None),
+                                       np.clip(shown["high"] - shown["corr"], 0, None)])
+            _barh(ax_cnt, frame, x="cnt", y="map")
+            ax_cnt.set(xlabel="Count of entries", ylabel=None)
+
+
+def _init_worker():
+    matplotlib.use("Agg")
+
+
+def _render_chart(weapon_corr: OneWeaponCorrelations, path: str, min_samples: Union[int, None], count_max: float,
+                  corr_minmax: tuple[float, float]) -> str:
+    fig = CorrelationChartMaker().plot(weapon_corr, min_samples, count_max, corr_minmax)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_charts(weapon_corr: list[OneWeaponCorrelations], paths: list[str], min_samples: int = None,
+                  workers: Union[int, None] = None) -> list[str]:
+    """
+    Saves a correlation chart of each weapon to its path, all drawn to the same scale.
+    Charts are split between `workers` processes rendering on the Agg backend if more than one is requested.
+    """
+    if min_samples is not None:
+        weapon_corr = [w.filter(min_samples) for w in weapon_corr]
+    corr_minmax, count_minmax = shared_limits(weapon_corr)
+    args = [(w, path, min_samples, count_minmax.max, corr_minmax.as_tuple()) for w, path in zip(weapon_corr, paths)]
+    if workers is None or workers <= 1 or len(args) < 2:
+        return [_render_chart(*a) for a in args]
+    with ProcessPoolExecutor(min(workers, len(args)), initializer=_init_worker) as executor:
+        return list(executor.map(_render_chart, *zip(*args)))
@@ -0,0 +1,29 @@
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from s2_analytics.incremental import BuildManifest, load_fingerprints
+from s2_analytics.render.catalog import RENDERED_REPORTS
+from s2_analytics.render.report import render_report
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    fingerprints = load_fingerprints()
+    manifest = BuildManifest()
+    for report in RENDERED_REPORTS:
+        if len(names) > 0 and report.name not in names:
+            continue
+        fingerprint = fingerprints.get(report.name)
+        if manifest.is_current(report.name, fingerprint):
+            print(f"=== Unchanged: {report.name} ===")
+            continue
+        started = time.perf_counter()
+        manifest.forget(report.name)
+        path = render_report(report)
+        if fingerprint is not None:
+            manifest.record(report.name, fingerprint)
+        manifest.save()
+        print(f"=== Rendered: {path} ({time.perf_counter() - started:.1f}s) ===")
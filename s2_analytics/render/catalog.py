@@ -0,0 +1,5 @@
+from s2_analytics.render.maps_trends import MapsTrendsReport
+from s2_analytics.render.ranked import RankedReport
+
+# reports rendered without notebooks; notebooks of the same name are kept for exploration and not executed by the build
+RENDERED_REPORTS = [MapsTrendsReport(), RankedReport()]
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pandas as pd
+import seaborn as sns
+from matplotlib import pyplot as plt
+from matplotlib.lines import Line2D
+from matplotlib.ticker import FixedLocator
+
+from s2_analytics.collect.map_trends_collector import MapPicks
+from s2_analytics.constants import WEAPON_MOD_ERAS
+from s2_analytics.render.page import MarkdownPage
+from s2_analytics.render.report import RenderedReport
+from s2_analytics.reports import MAPS_TRENDS, AVG_PERIOD_LONG
+from s2_analytics.rolling_average import RollingAveragePeriod
+
+# maps of each chart, split alphabetically
+MAP_GROUPS = {
+    "a-g": lambda map_name: map_name < "ctf_h",
+    "h-z": lambda map_name: map_name >= "ctf_h",
+}
+
+
+def _rolling_average_map_pick(page: MarkdownPage, map_picks: MapPicks, group: str, period: RollingAveragePeriod,
+                              height=10):
+    df = map_picks.rolling_pick_percentages(period, MAP_GROUPS[group])
+    if df["rolling average"].isnull().all():
+        page.text(f"Not enough data for {period.window_days}-days rolling average (maps {group})")
+        return
+    page.data(df, f"map-trends-{group}-{period.window_days}-days-avg")
+    with sns.axes_style("darkgrid"):
+        fig, ax = plt.subplots(figsize=(10, height))
+        sns.lineplot(df, x="date", y="rolling average", style="mapName", hue="mapName", linewidth=2.5, ax=ax)
+    ax.xaxis.set_major_locator(FixedLocator(ax.get_xticks().tolist()))
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=90)
+    ax.set_title(f"{period.window_days}-days rolling average of map picks percentage over "
+                 f"{period.total_days_visible} days (maps {group})")
+    sns.move_legend(ax, "upper left", bbox_to_anchor=(1, 1))
+
+    # weaponmod marker
+    chart_start_date = df[~pd.isnull(df["rolling average"])]["date"].min()
+    for wm in WEAPON_MOD_ERAS.mods_between(chart_start_date):
+        ax.axvline(wm.datetime, color="red", linestyle="dotted", zorder=3)
+        ax.text(wm.datetime, 0, wm, rotation=90, color="white", bbox=dict(facecolor='red', alpha=0.5), zorder=3)
+
+    # average period marker
+    max_date = df["date"].max()
+    ax.add_line(Line2D([max_date - timedelta(days=period.window_days), max_date], [-0.4, -0.4], color="green",
+                       zorder=3, marker="|", markersize=7))
+    ax.text(max_date, -0.5, f"{period.window_days} days", color="green", ha="right", va="top", zorder=3)
+    page.chart(fig)
+
+
+class MapsTrendsReport(RenderedReport):
+    """
+    Rendered version of stats_maps_trends.ipynb
+    """
+    data = MAPS_TRENDS
+
+    def render(self, page: MarkdownPage, processors: dict[str, Any]):
+        con = processors["sqlite_collector"].connection
+        map_picks = processors["map_trends_collector"].picks()
+
+        page.heading("Map picking trends")
+        page.heading("Data summary", 2)
+        page.table(processors["summary_collector"].get_summary().to_table(), index=False, header=False)
+        page.table(pd.read_sql_query("select playlistCode, count(1) games_count from game group by playlistCode",
+                                     con))
+
+        page.heading("Map picking trends", 2)
+        for group in MAP_GROUPS:
+            _rolling_average_map_pick(page, map_picks, group, AVG_PERIOD_LONG, height=7)
+
+        page.heading("Maps not played in last 7 days", 2)
+        last_played = map_picks.last_played()
+        page.table(last_played[last_played["last_played"] < datetime.utcnow() - timedelta(days=7)]
+                   .reset_index(drop=True))
@@ -0,0 +1,66 @@
+import os
+from typing import Union
+
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+from pandas import DataFrame
+
+from s2_analytics.export import export_table, data_links
+
+MARKDOWN_DIR = "build/markdown"
+
+
+class MarkdownPage:
+    """
+    Markdown document of one report, with charts saved as PNG files next to it the way nbconvert saves
+    outputs of a notebook (`<name>_files/<name>_<n>.png`), so that rendered pages replace converted notebooks
+    """
+
+    def __init__(self, name: str, directory: str = MARKDOWN_DIR):
+        self.name = name
+        self.directory = directory
+        self.blocks: list[str] = []
+        self.charts = 0
+
+    def heading(self, text: str, level: int = 1) -> "MarkdownPage":
+        self.blocks.append(f"{'#' * level} {text}")
+        return self
+
+    def text(self, markdown: str) -> "MarkdownPage":
+        self.blocks.append(markdown)
+        return self
+
+    def table(self, df: Union[DataFrame, list[list]], index: bool = True, header: bool = True) -> "MarkdownPage":
+        if not isinstance(df, DataFrame):
+            df = DataFrame(df)
+        self.blocks.append(df.to_html(index=index, header=header, border=0))
+        return self
+
+    def chart(self, fig: Figure) -> "MarkdownPage":
+        """
+        Saves a chart as PNG and closes its figure
+        """
+        files_dir = f"{self.name}_files"
+        os.makedirs(os.path.join(self.directory, files_dir), exist_ok=True)
+        path = f"{files_dir}/{self.name}_{self.charts}.png"
+        self.charts += 1
+        fig.savefig(os.path.join(self.directory, path), bbox_inches="tight")
+        plt.close(fig)
+        self.blocks.append(f"![png]({path})")
+        return self
+
+    def data(self, df: DataFrame, id: str) -> "MarkdownPage":
+        """
+        Exports data of a chart into the site's data dir and links to it
+        """
+        return self.text(data_links(export_table(df, id, os.path.join(self.directory, "data"))))
+
+    def to_markdown(self) -> str:
+        return "\n\n".join(self.blocks) + "\n"
+
+    def save(self) -> str:
+        path = os.path.join(self.directory, f"{self.name}.md")
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.to_markdown())
+        return path
@@ -0,0 +1,80 @@
+from typing import Any
+
+import pandas as pd
+import seaborn as sns
+from matplotlib import pyplot as plt
+
+from s2_analytics.render.page import MarkdownPage
+from s2_analytics.render.report import RenderedReport
+from s2_analytics.reports import RANKED
+
+
+def _barplot(page: MarkdownPage, df: pd.DataFrame, y: str, x: str, title: str):
+    fig, ax = plt.subplots(figsize=(6.4, max(2.0, 0.25 * len(df))))
+    sns.barplot(df, y=y, x=x, orient="h", ax=ax).set(title=title)
+    page.chart(fig)
+
+
+class RankedReport(RenderedReport):
+    """
+    Rendered version of stats_ranked.ipynb
+    """
+    data = RANKED
+
+    def render(self, page: MarkdownPage, processors: dict[str, Any]):
+        con = processors["sqlite_collector"].connection
+        cap_timings = processors["cap_timing_collector"].timings()
+
+        page.heading("Ranked games")
+        page.table(pd.read_sql_query("""
+            select
+                datetime(min(id)/1000, 'unixepoch') first_game_start_time,
+                datetime(max(id)/1000, 'unixepoch') last_game_start_time,
+                count(1) games_count
+            from game
+            """, con))
+
+        page.heading("Maps played", 2)
+        maps_played = pd.read_sql_query(
+            "select mapName, count(1) as count from round group by mapName order by count desc", con)
+        _barplot(page, maps_played, "mapName", "count", "Maps played")
+        page.table(maps_played)
+
+        page.heading("Average cap count per round", 2)
+        caps_per_round = cap_timings.caps_per_round_by_map()[["mapName", "avg_caps_per_round"]].round(1)
+        _barplot(page, caps_per_round, "mapName", "avg_caps_per_round", "Average cap count per round")
+        page.table(caps_per_round)
+
+        page.heading("Average rounds per game", 2)
+        rounds_per_game = pd.read_sql_query("""
+            select
+            "all_games" as all_games,
+            (select count(distinct game) from round) games_played,
+            (select count(1) from round) rounds_played,
+            round(1.0*(select count(1) from round)/(select count(distinct game) from round),1) avg_rounds_per_game
+            """, con)
+        _barplot(page, rounds_per_game, "all_games", "avg_rounds_per_game", "Average rounds per game")
+        page.table(rounds_per_game)
+
+        page.heading("Winning team", 2)
+        round_result = pd.read_sql_query("select result, count(1) rounds_count from round group by result", con)
+        _barplot(page, round_result, "result", "rounds_count", "Round result")
+
+        page.heading("Rounds finished before time limit", 2)
+        finished_before_limit = pd.read_sql_query("""
+            select
+            5 - abs(blueCaps - redCaps) losing_team_caps,
+            count(1) as rounds_count,
+            round(315 - (1.0*endTime - startTime)/1000,1) seconds_left_avg
+            from round where blueCaps = 5 or redCaps = 5 group by losing_team_caps
+            """, con)
+        _barplot(page, finished_before_limit, "losing_team_caps", "rounds_count", "Rounds finished before time limit")
+        page.table(finished_before_limit)
+
+        page.heading("Kills per weapon", 2)
+        kills_per_weapon = pd.read_sql_query("""
+            select weaponName, round(100.0*count(1)/(select count(1) from event_kill ek),2) as percentage_of_all_kills
+            from event_kill group by weaponName order by percentage_of_all_kills desc
+            """, con)
+        _barplot(page, kills_per_weapon, "weaponName", "percentage_of_all_kills", "Kills per weapon")
+        page.table(kills_per_weapon)
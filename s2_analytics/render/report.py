@@ -0,0 +1,36 @@
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any
+
+from s2_analytics.render.page import MarkdownPage, MARKDOWN_DIR
+from s2_analytics.session import Report, report_processors, SESSION_DIR
+
+
+class RenderedReport(ABC):
+    """
+    Report rendered straight to markdown, without executing a notebook.
+    `data` declares processors and games the report needs; its name is also the name of the rendered page.
+    """
+    data: Report
+
+    @property
+    def name(self) -> str:
+        return self.data.name
+
+    @abstractmethod
+    def render(self, page: MarkdownPage, processors: dict[str, Any]):
+        pass
+
+
+def render_report(report: RenderedReport, logs_dir: str = "logs_ranked/", session_dir: str = SESSION_DIR,
+                  markdown_dir: str = MARKDOWN_DIR) -> str:
+    """
+    Renders a report using processors saved by a session run (or imported for the report alone)
+    :return: path of the rendered markdown
+    """
+    # charts of the previous rendering may outnumber the new ones
+    shutil.rmtree(os.path.join(markdown_dir, f"{report.name}_files"), ignore_errors=True)
+    page = MarkdownPage(report.name, markdown_dir)
+    report.render(page, report_processors(report.data, logs_dir, session_dir))
+    return page.save()
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+from typing import Callable
+
+from s2_analytics.analyze.cap_timing import CapTimingCollector
+from s2_analytics.analyze.kill_sequence import KillSequenceRoundTagger
+from s2_analytics.analyze.main_weapon_analyzer import MainWeaponRoundTagger
+from s2_analytics.collect.fris_weapon_usage_collector import FriWeaponUsageCollector
+from s2_analytics.collect.map_trends_collector import MapTrendsCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.summary_collector import SummaryCollector
+from s2_analytics.collect.tag_win_stats_collector import TagWinStatsCollector
+from s2_analytics.constants import WEAPONS_PRIMARY, WEAPON_MODS_CATALOG
+from s2_analytics.filters import PLAYLIST_CTF, BALANCED, max_imbalance
+from s2_analytics.incremental import code_version
+from s2_analytics.rolling_average import RollingAveragePeriod
+from s2_analytics.session import Report
+
+AVG_PERIOD_LONG = RollingAveragePeriod(14, 3, 0.75)
+AVG_PERIOD_SHORT = RollingAveragePeriod(7, 3, 0.75)
+
+CORRELATION_MAX_IMBALANCE = 0.20
+CORRELATION_PLAYLISTS = ["CTF-Standard-6"]
+CORRELATION_MONTHS = 6
+# daily tag/win statistics of correlation reports, one file per report, kept across builds (unlike the session dir)
+CORRELATION_STATS_DIR = "build/tag_win_stats"
+# what correlation statistics count, statistics stored with another key are collected again
+CORRELATION_STATS_KEY = f"playlists={','.join(CORRELATION_PLAYLISTS)};max_imbalance={CORRELATION_MAX_IMBALANCE};" \
+                        f"taggers=main_weapon,kill_sequence"
+
+
+def _sqlite_with_summary() -> dict:
+    conn = sqlite3.connect("file::memory:")
+    sqlite_collector = SqliteCollector(sqlite_conn=conn).init()
+    return {"sqlite_collector": sqlite_collector, "summary_collector": SummaryCollector(conn, sqlite_collector)}
+
+
+def _maps_trends() -> dict:
+    return {**_sqlite_with_summary(), "map_trends_collector": MapTrendsCollector()}
+
+
+def _ranked() -> dict:
+    return {"sqlite_collector": SqliteCollector("file::memory:").init(), "cap_timing_collector": CapTimingCollector()}
+
+
+def _weapon_usage_trends() -> dict:
+    return {"sqlite_collector": SqliteCollector("file::memory:").init()}
+
+
+def _weapon_usage_trends_v2() -> dict:
+    return {"sqlite_collector": SqliteCollector().init(), "fri_collector": FriWeaponUsageCollector().init()}
+
+
+def correlation_taggers() -> list:
+    """
+    Taggers of team-rounds of correlation reports: main weapons and kill sequences
+    """
+    return [MainWeaponRoundTagger([WEAPONS_PRIMARY]), KillSequenceRoundTagger()]
+
+
+def _weapon_win_correlation(name: str) -> Callable[[], dict]:
+    def processors() -> dict:
+        os.makedirs(CORRELATION_STATS_DIR, exist_ok=True)
+        return {"tag_win_stats": TagWinStatsCollector(
+            os.path.join(CORRELATION_STATS_DIR, f"{name}.sqlite"), correlation_taggers(),
+            WEAPON_MODS_CATALOG.boundaries, key=f"{CORRELATION_STATS_KEY};code={code_version()}")}
+
+    return processors
+
+
+def _correlation_filters() -> list:
+    return [lambda g: g.playlist_code in CORRELATION_PLAYLISTS, max_imbalance(CORRELATION_MAX_IMBALANCE)]
+
+
+MAPS_TRENDS = Report("stats_maps_trends", _maps_trends, period_days=AVG_PERIOD_LONG.days_of_data_needed,
+                     game_filters=[PLAYLIST_CTF])
+RANKED = Report("stats_ranked", _ranked, period_days=90, game_filters=[PLAYLIST_CTF, BALANCED])
+WEAPON_USAGE_TRENDS = Report("stats_weapon_usage_trends", _weapon_usage_trends, period_days=63,
+                             game_filters=[PLAYLIST_CTF])
+WEAPON_USAGE_TRENDS_V2 = Report("stats_weapon_usage_trends_v2", _weapon_usage_trends_v2, period_days=90,
+                                game_filters=[PLAYLIST_CTF])
+WEAPON_WIN_CORRELATION_RANKED = Report("stats_weapon_win_correlation_ranked",
+                                       _weapon_win_correlation("stats_weapon_win_correlation_ranked"),
+                                       period_days=round(365.25 / 12 * CORRELATION_MONTHS),
+                                       game_filters=_correlation_filters())
+WEAPON_WIN_CORRELATION_WM = Report("stats_weapon_win_correlation_wm",
+                                   _weapon_win_correlation("stats_weapon_win_correlation_wm"),
+                                   start_date=WEAPON_MODS_CATALOG.latest().datetime,
+                                   game_filters=_correlation_filters())
+
+# reports of ranked games, imported together by a single session before notebooks are executed
+RANKED_REPORTS = [MAPS_TRENDS, RANKED, WEAPON_USAGE_TRENDS, WEAPON_USAGE_TRENDS_V2, WEAPON_WIN_CORRELATION_RANKED,
+                  WEAPON_WIN_CORRELATION_WM]
@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from math import ceil
 
+import numpy as np
+
 
 @dataclass
 class RollingAveragePeriod:
@@ -19,4 +21,21 @@ class RollingAveragePeriod:
 
     @property
     def min_days_for_avg(self):
-        return ceil(self.window_days * self.required_values_ratio)
\ No newline at end of file
+        return ceil(self.window_days * self.required_values_ratio)
+
+
+def rolling_mean(values: np.ndarray, window_days: int, min_days: int) -> np.ndarray:
+    """
+    Trailing `window_days` average of each column of a day x series matrix with a row for every calendar day,
+    as `DataFrame.rolling(f"{window_days}D", min_periods=min_days).mean()` on the days having values.
+    Days without a value are NaN; averages over fewer than `min_days` values are NaN.
+    """
+    present = ~np.isnan(values)
+    sums = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(np.where(present, values, 0.), axis=0)])
+    counts = np.concatenate([np.zeros((1,) + values.shape[1:], dtype=np.int64), np.cumsum(present, axis=0)])
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window_days, 0)
+    window_counts = counts[ends] - counts[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (sums[ends] - sums[starts]) / window_counts
+    return np.where(present & (window_counts >= max(min_days, 1)), means, np.nan)
@@ -0,0 +1,341 @@
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Union, Any, TYPE_CHECKING
+
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.importer import GameDetails, RoundData, EventData, GameRatings, GameFilter, Processor, \
+    import_games, _has_method
+
+if TYPE_CHECKING:
+    from s2_analytics.instrumentation import ImportStats
+
+SESSION_DIR = "build/session"
+
+
+Window = tuple[datetime, datetime]
+
+# name of the sqlite ingest shared by reports in import stats
+SHARED_SQLITE = "shared_sqlite"
+
+
+class Report:
+    """
+    Processors of one report and the games they should see: games started within `period_days` before now
+    (or between `start_date` and `end_date`) passing all `game_filters`, as in `import_games`.
+    Windows relative to now are computed when the report is run, not when it is declared.
+    `processors` creates named processors of a fresh report.
+    Processors may keep what they collected from older games across runs: if all of them have
+    `import_start(window)`, games are imported only from the earliest start they return, and each processor
+    having `finish(window, imported)` is called with both windows after the import.
+    """
+
+    def __init__(self, name: str, processors: Callable[[], dict[str, Any]], period_days: int = 60,
+                 start_date: Union[datetime, None] = None, end_date: Union[datetime, None] = None,
+                 game_filters: list[GameFilter] = None):
+        self.name = name
+        self.processors = processors
+        self.period_days = period_days
+        self._start_date = start_date
+        self._end_date = end_date
+        self.game_filters = game_filters if game_filters is not None else []
+
+    @property
+    def start_date(self) -> datetime:
+        return self._start_date if self._start_date is not None else \
+            datetime.today() - timedelta(days=self.period_days)
+
+    @property
+    def end_date(self) -> datetime:
+        return self._end_date if self._end_date is not None else datetime.today() + timedelta(days=1)
+
+    def window(self) -> Window:
+        return self.start_date, self.end_date
+
+
+def _accepts(report: Report, window: Window, game: GameDetails) -> bool:
+    return window[0] <= game.start_time <= window[1] and all(f(game) for f in report.game_filters)
+
+
+class _ReportDispatcher:
+    """
+    Forwards games within window of a report that pass its filters to its processors.
+    Hooks are bound only for kinds of processors the report has, so that the importer decodes
+    events and ratings only when some report needs them.
+    """
+
+    def __init__(self, report: Report, processors: list[Processor], window: Window = None):
+        self.report = report
+        self.start_date, self.end_date = window if window is not None else report.window()
+        self._game_processors = [p for p in processors if _has_method(p, "process_game")]
+        self._round_processors = [p for p in processors if _has_method(p, "process_round")]
+        self._event_processors = [p for p in processors if _has_method(p, "process_event")]
+        self._rating_processors = [p for p in processors if _has_method(p, "process_ratings")]
+        self._game_id = None
+        self._accepted = False
+        if len(self._event_processors) > 0:
+            self.process_event = self._process_event
+        if len(self._round_processors) > 0:
+            self.process_round = self._process_round
+        if len(self._rating_processors) > 0:
+            self.process_ratings = self._process_ratings
+        if len(self._game_processors) > 0:
+            self.process_game = self._process_game
+
+    def _accepts(self, game: GameDetails) -> bool:
+        if self._game_id != game.id:
+            self._game_id = game.id
+            self._accepted = _accepts(self.report, (self.start_date, self.end_date), game)
+        return self._accepted
+
+    def _process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        if self._accepts(game):
+            for processor in self._event_processors:
+                processor.process_event(event, round, game)
+
+    def _process_round(self, round: RoundData, game: GameDetails):
+        if self._accepts(game):
+            for processor in self._round_processors:
+                processor.process_round(round, game)
+
+    def _process_ratings(self, ratings: GameRatings, game: GameDetails):
+        if self._accepts(game):
+            for processor in self._rating_processors:
+                processor.process_ratings(ratings, game)
+
+    def _process_game(self, game: GameDetails):
+        if self._accepts(game):
+            for processor in self._game_processors:
+                processor.process_game(game)
+
+
+class _AcceptedGames:
+    """
+    Ids of games accepted by a report, to select its rows of the shared sqlite ingest
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+
+    def process_game(self, game: GameDetails):
+        self.ids.append(game.id)
+
+
+class AnalysisSession:
+    """
+    Imports games once for many reports. Games of the union of report windows are read in a single pass
+    and each report's processors see only games of its own window and filters.
+    Games are ingested into sqlite once for all reports having a `SqliteCollector`, each of them copies
+    rows of its games from the shared database after the import.
+    """
+
+    def __init__(self, reports: list[Report], logs_dir: str = "logs_ranked/"):
+        self.reports = reports
+        self.logs_dir = logs_dir
+        self.processors: dict[str, dict[str, Any]] = {}
+        # windows of reports as of the latest run, and windows of games imported for them
+        self.windows: dict[str, Window] = {}
+        self.import_windows: dict[str, Window] = {}
+        self.import_seconds: Union[float, None] = None
+
+    def run(self, stats: "ImportStats" = None) -> "AnalysisSession":
+        """
+        :param stats: collects time spent in each report and in each of its processors
+        """
+        self.processors = {report.name: report.processors() for report in self.reports}
+        self.windows = {report.name: report.window() for report in self.reports}
+        self.import_windows = {name: _import_window(self.processors[name], window)
+                               for name, window in self.windows.items()}
+        sqlite_reports = [r for r in self.reports if len(_sqlite_collectors(self.processors[r.name])) > 0]
+        accepted = {report.name: _AcceptedGames() for report in sqlite_reports}
+        dispatchers = []
+        for report in self.reports:
+            window = self.import_windows[report.name]
+            processors = {name: p for name, p in self.processors[report.name].items()
+                          if not isinstance(p, SqliteCollector)}
+            recorders = [accepted[report.name]] if report.name in accepted else []
+            if stats is None:
+                dispatchers.append(_ReportDispatcher(report, list(processors.values()) + recorders, window))
+                continue
+            timed = [stats.timed(p, f"{report.name}/{name}", caller=report.name) for name, p in processors.items()]
+            dispatchers.append(stats.timed(_ReportDispatcher(report, timed + recorders, window), report.name))
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as directory:
+            shared = None
+            if len(sqlite_reports) > 0:
+                shared = SqliteCollector(os.path.join(directory, "shared.sqlite")).init()
+                dispatchers.append(self._shared_dispatcher(shared, sqlite_reports, stats))
+            import_games(self.logs_dir, start_date=min(start for start, _ in self.import_windows.values()),
+                         end_date=max(end for _, end in self.import_windows.values()), processors=dispatchers,
+                         stats=stats)
+            if shared is not None:
+                for report in sqlite_reports:
+                    for collector in _sqlite_collectors(self.processors[report.name]):
+                        collector.copy_games(shared, accepted[report.name].ids)
+                shared.connection.close()
+        for name, processors in self.processors.items():
+            for processor in processors.values():
+                if _has_method(processor, "finish"):
+                    processor.finish(self.windows[name], self.import_windows[name])
+        self.import_seconds = time.perf_counter() - started
+        return self
+
+    def _shared_dispatcher(self, shared: SqliteCollector, reports: list[Report],
+                           stats: Union["ImportStats", None]) -> _ReportDispatcher:
+        """
+        Forwards games accepted by any of `reports` to the sqlite collector shared by them
+        """
+        windows = [self.import_windows[report.name] for report in reports]
+        union = Report(SHARED_SQLITE, lambda: {}, start_date=min(start for start, _ in windows),
+                       end_date=max(end for _, end in windows),
+                       game_filters=[lambda g: any(_accepts(r, w, g) for r, w in zip(reports, windows))])
+        if stats is None:
+            return _ReportDispatcher(union, [shared])
+        timed = stats.timed(shared, f"{SHARED_SQLITE}/sqlite_collector", caller=SHARED_SQLITE)
+        return stats.timed(_ReportDispatcher(union, [timed]), SHARED_SQLITE)
+
+    def save(self, directory: str = SESSION_DIR):
+        """
+        Pickles processors of each report into `directory`; sqlite databases they use are saved next to them,
+        and so are the inputs they were imported from
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, processors in self.processors.items():
+            path = os.path.join(directory, f"{name}.pickle")
+            save_processors(processors, path)
+            with open(f"{path}.inputs.json", "w") as f:
+                json.dump(processors_inputs(self.logs_dir, self.windows[name]), f, indent=1)
+
+
+def _sqlite_collectors(processors: dict[str, Any]) -> list[SqliteCollector]:
+    return [p for p in processors.values() if isinstance(p, SqliteCollector)]
+
+
+def _import_window(processors: dict[str, Any], window: Window) -> Window:
+    """
+    Window of games to import for processors of a report: from the earliest `import_start` of processors
+    if all of them have one, the whole report window otherwise
+    """
+    starts = [p.import_start(window) for p in processors.values() if _has_method(p, "import_start")]
+    if len(starts) == 0 or len(starts) < len(processors):
+        return window
+    return max(window[0], min(starts)), window[1]
+
+
+class _SqlitePickler(pickle.Pickler):
+    """
+    Pickles sqlite connections as copies of their databases saved next to the pickle, cursors as their connection
+    """
+
+    def __init__(self, file, path: str):
+        super().__init__(file)
+        self.path = path
+        self.databases: dict[int, str] = {}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, sqlite3.Cursor):
+            return "cursor", self._database(obj.connection)
+        if isinstance(obj, sqlite3.Connection):
+            return "connection", self._database(obj)
+        return None
+
+    def _database(self, connection: sqlite3.Connection) -> str:
+        database = self.databases.get(id(connection))
+        if database is None:
+            database = f"{os.path.basename(self.path)}.{len(self.databases)}.sqlite"
+            target_path = os.path.join(os.path.dirname(self.path), database)
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            connection.commit()
+            target = sqlite3.connect(target_path)
+            connection.backup(target)
+            target.close()
+            self.databases[id(connection)] = database
+        return database
+
+
+class _SqliteUnpickler(pickle.Unpickler):
+    """
+    Loads saved sqlite databases into memory, so that reports can change them without touching saved copies
+    """
+
+    def __init__(self, file, path: str):
+        super().__init__(file)
+        self.path = path
+        self.connections: dict[str, sqlite3.Connection] = {}
+
+    def persistent_load(self, pid):
+        kind, database = pid
+        connection = self.connections.get(database)
+        if connection is None:
+            saved = sqlite3.connect(os.path.join(os.path.dirname(self.path), database))
+            connection = self.connections[database] = sqlite3.connect("file::memory:")
+            saved.backup(connection)
+            saved.close()
+        return connection.cursor() if kind == "cursor" else connection
+
+
+def save_processors(processors: dict[str, Any], path: str):
+    with open(path, "wb") as f:
+        _SqlitePickler(f, path).dump(processors)
+
+
+def load_processors(path: str) -> dict[str, Any]:
+    with open(path, "rb") as f:
+        return _SqliteUnpickler(f, path).load()
+
+
+def processors_inputs(logs_dir: str, window: Window) -> dict[str, str]:
+    """
+    What processors of a report depend on: the code, and names, sizes and modification times of logs in its window
+    """
+    from s2_analytics.incremental import code_version, logs_digest
+
+    return {"code": code_version(), "logs": logs_digest(logs_dir, *window)}
+
+
+def _saved_inputs(path: str) -> Union[dict[str, str], None]:
+    if not os.path.isfile(f"{path}.inputs.json"):
+        return None
+    with open(f"{path}.inputs.json") as f:
+        return json.load(f)
+
+
+def report_processors(report: Report, logs_dir: str = "logs_ranked/", directory: str = SESSION_DIR,
+                      stats: "ImportStats" = None) -> dict[str, Any]:
+    """
+    Processors of a report saved by a session run, or processors of the report imported alone if there are none
+    or they were imported from other logs or by other code
+    :param stats: collects timings of the import, if games are imported
+    """
+    path = os.path.join(directory, f"{report.name}.pickle")
+    if os.path.exists(path) and _saved_inputs(path) == processors_inputs(logs_dir, report.window()):
+        return load_processors(path)
+    return AnalysisSession([report], logs_dir).run(stats).processors[report.name]
+
+
+if __name__ == "__main__":
+    import shutil
+
+    from s2_analytics.api import write_endpoints
+    from s2_analytics.incremental import BuildManifest, report_fingerprints, save_fingerprints
+    from s2_analytics.reports import RANKED_REPORTS
+
+    shutil.rmtree(SESSION_DIR, ignore_errors=True)
+    fingerprints = report_fingerprints(RANKED_REPORTS)
+    save_fingerprints(fingerprints)
+    manifest = BuildManifest()
+    changed = [r for r in RANKED_REPORTS if not manifest.is_current(r.name, fingerprints[r.name])]
+    if len(changed) == 0:
+        print(f"No changes in games or code of {len(RANKED_REPORTS)} reports")
+    else:
+        session = AnalysisSession(changed).run()
+        session.save()
+        # endpoints are written from the same processors as charts, while they're in memory
+        write_endpoints(session.processors, windows=session.windows)
+        print(f"Imported games for {len(session.reports)} changed reports in {session.import_seconds:.1f}s")
@@ -1,22 +1,26 @@
 import json
 import os
-from typing import List, Callable, Union
-
-import matplotlib.pyplot as plt
-from IPython.core.display import Markdown
-from IPython.core.display_functions import display
-from pandas import DataFrame
+from typing import List, Callable, Union, TYPE_CHECKING
 
 from s2_analytics.collect.object_collector import GameObjectCollector
 from s2_analytics.importer import JsonGameDeserializer, Processor, Game, RoundData, EventData, EventKill, EventFlagCap, \
     GameFilter
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+def dump_csv(df: "DataFrame", id: str):
+    """
+    Exports chart data into the site (gzipped csv, columnar npz and a summary) and links to it
+    """
+    # notebook-only dependencies, not loaded by scripts that only import games
+    from IPython.core.display import Markdown
+    from IPython.core.display_functions import display
+    from s2_analytics.export import export_table, data_links, DATA_DIR
 
-def dump_csv(df: DataFrame, id: str):
-    csv_path = f"data/{id}.csv"
-    csv_abs_path = f"{os.getcwd()}/build/markdown/{csv_path}"
-    df.to_csv(csv_abs_path)
-    display(Markdown(f"Chart data: [csv]({csv_path})"))
+    names = export_table(df, id, f"{os.getcwd()}/{DATA_DIR}")
+    display(Markdown(data_links(names)))
 
 
 def _encode_event(e: EventData) -> dict:
@@ -95,4 +99,5 @@ def process_game(path):
 
 class PlotShow:
     def show(self):
+        import matplotlib.pyplot as plt
         plt.show()
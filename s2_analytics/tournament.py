@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import datetime
+from typing import Union
+
+from s2_analytics.collect.roster_collector import PlayerRosterCollector, RosterPlayer
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.importer import import_games, Processor
+
+TOURNAMENT_LOGS_DIR = "logs_tournament"
+
+# first tournament (Dec 2022) was played before ranked ratings were logged, tiers are the ones players had then
+TOURNAMENT_ROSTER = [
+    RosterPlayer("9EDB977D8849AD0C", "papu", 18, "WeAreTeam7"),
+    RosterPlayer("EBA9074566BEA3E7", "proto", 16, "BaseHot"),
+    RosterPlayer("EDB92702EC149828", "nino", 17, "Maroon5"),
+    RosterPlayer("C19637F2290726EB", "haste", 13, "DotDotDot"),
+    RosterPlayer("6446A9422BE1BD7D", "dD", 13, "NoMoreOverheat"),
+    RosterPlayer("82FC63DE46014718", "YnGwi3", 13, "2Tilted"),
+    RosterPlayer("D35B7050036AAD3", "fri", 13, "Mortals"),
+    RosterPlayer("C42975C9A8E4E66B", "Psycho", 11, "DotDotDot"),
+    RosterPlayer("517348F5DF244DE5", "Anna", 11, "Maroon5"),
+    RosterPlayer("9AB6234BDDCE14D9", "dbfseventsd", 11, "Mortals"),
+    RosterPlayer("9DD00BA9F5AA7525", "Norbo11", 10, "2Tilted"),
+    RosterPlayer("47167D5CB3751A2C", "challz", 9, "NoMoreOverheat"),
+    RosterPlayer("CF4B8D60F1735398", "thyro", 8, "WeAreTeam7"),
+    RosterPlayer("D482320672E27418", "Jok", 8, "BaseHot"),
+    RosterPlayer("784CD6C79930CC43", "evhO", 7, "BaseHot"),
+    RosterPlayer("6AF4A5EF7DB4F012", "kahukerr", 1, "Mortals"),
+    RosterPlayer("85D4CB1D1C2A72CD", "xQ:Le1T0r", 7, "WeAreTeam7"),
+    RosterPlayer("B83C6CC780CDF96C", "SigHunter", 6, "2Tilted"),
+    RosterPlayer("F029E4BFE212BE18", "Morgoth", 5, "Maroon5"),
+    RosterPlayer("298FD01685544F0", "danyukhin", 0, "DotDotDot"),
+    RosterPlayer("DEEA9A62468B4158", "kevin16king", 0, "NoMoreOverheat"),
+]
+
+
+def import_tournament(logs_dir: str = TOURNAMENT_LOGS_DIR, roster: list[RosterPlayer] = None,
+                      sqlite_path: Union[str, None] = None, processors: list[Processor] = None) -> sqlite3.Connection:
+    """
+    Imports all games of a tournament into sqlite db with `game`, `round`, `event_kill` and `event_cap` tables
+    of `SqliteCollector`, and `player` and `tier` tables of `PlayerRosterCollector`.
+    Games are passed to additional `processors` during the same import.
+    """
+    if roster is None:
+        roster = TOURNAMENT_ROSTER
+    sqlite_collector = SqliteCollector(sqlite_path).init()
+    roster_collector = PlayerRosterCollector(sqlite_collector.connection, roster).init()
+    import_games(logs_dir, start_date=datetime(1970, 1, 1), end_date=datetime.max,
+                 processors=[sqlite_collector, roster_collector] + (processors if processors is not None else []))
+    sqlite_collector.connection.commit()
+    return sqlite_collector.connection
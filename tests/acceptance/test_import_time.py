@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+import pytest
+
+from tests.project_root import get_project_root
+
+# cumulative import time budgets (milliseconds) of modules used by scripts that only import and aggregate games,
+# generous enough for slow machines but well below the cost of importing pandas or plotting
+IMPORT_BUDGETS_MS = {
+    "s2_analytics.importer": 250,
+    "s2_analytics.tools": 250,
+    "s2_analytics.session": 250,
+    "s2_analytics.incremental": 250,
+    "s2_analytics.collect.sqlite_collector": 250,
+    "s2_analytics.collect.summary_collector": 250,
+    "s2_analytics.collect.fris_weapon_usage_collector": 250,
+    "s2_analytics.collect.map_trends_collector": 500,
+    "s2_analytics.collect.era_collector": 500,
+    "s2_analytics.collect.team_round_tag_collector": 500,
+    "s2_analytics.reports": 500,
+    "s2_analytics.api": 500,
+}
+
+# loaded only by code that builds tables or charts
+HEAVY_MODULES = ["pandas", "matplotlib", "IPython", "seaborn"]
+
+
+def _import_time_ms(module: str) -> float:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=get_project_root(), capture_output=True, text=True, check=True)
+    # lines are "import time: self [us] | cumulative | imported package"
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"no import time of {module} in\n{completed.stderr}")
+
+
+def _loaded_heavy_modules(module: str) -> list[str]:
+    completed = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        cwd=get_project_root(), capture_output=True, text=True, check=True)
+    return completed.stdout.split()
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGETS_MS.keys())
+def test_module_doesnt_import_heavy_dependencies(module):
+    assert _loaded_heavy_modules(module) == []
+
+
+@pytest.mark.parametrize("module, budget_ms", IMPORT_BUDGETS_MS.items())
+def test_import_time_within_budget(module, budget_ms):
+    # best of a few runs, so that a busy machine doesn't fail the budget
+    assert min(_import_time_ms(module) for _ in range(3)) < budget_ms
@@ -0,0 +1,49 @@
+import datetime
+import sqlite3
+
+from s2_analytics.collect.roster_collector import PlayerRosterCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.importer import import_games, read_games_dir, GameRatings, GameDetails
+from s2_analytics.tournament import import_tournament
+from tests.project_root import get_project_root
+
+ALL_TIME = {"start_date": datetime.datetime(1970, 1, 1), "end_date": datetime.datetime.max}
+
+
+class RatingsCollector:
+    def __init__(self):
+        self.ratings: list[GameRatings] = []
+
+    def process_ratings(self, ratings: GameRatings, game: GameDetails):
+        self.ratings.append(ratings)
+
+
+def test_reads_games_in_order_of_start_time():
+    start_times = [g["startTime"] for g in read_games_dir(get_project_root() + "/logs_tournament", **ALL_TIME)]
+    assert len(start_times) == 23
+    assert start_times == sorted(start_times)
+
+
+def test_imports_tournament_games_logged_before_playlists():
+    con = import_tournament(get_project_root() + "/logs_tournament")
+
+    assert con.execute("select count(*), sum(winner = 'Red') from game").fetchone() == (23, 10)
+    assert con.execute("select count(*) from round").fetchone() == (58,)
+    assert con.execute("select count(*) from event_kill join player on killerPlayfabId = player.id") \
+               .fetchone() == (6181,)
+    assert con.execute("select tier.name from player join tier on tier.id = player.tier where player.name = 'papu'") \
+               .fetchone() == ("CHAMPION_III",)
+
+
+def test_takes_tiers_from_ratings_of_ranked_games():
+    conn = sqlite3.connect("file::memory:")
+    sqlite_collector = SqliteCollector(sqlite_conn=conn).init()
+    roster_collector = PlayerRosterCollector(conn).init()
+    ratings_collector = RatingsCollector()
+    import_games(get_project_root() + "/fixtures", processors=[sqlite_collector, roster_collector, ratings_collector],
+                 **ALL_TIME)
+
+    ratings = ratings_collector.ratings[0]
+    assert len(ratings) == conn.execute("select count(*) from player").fetchone()[0]
+    tiers = dict(conn.execute("select id, tier from player").fetchall())
+    assert [tiers[player] for player in ratings.players] == ratings.tier_after
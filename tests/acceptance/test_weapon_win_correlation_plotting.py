@@ -1,11 +1,14 @@
 import random
 import sqlite3
 
+import numpy as np
+from matplotlib import image
 from matplotlib import pyplot as plt
 
 from s2_analytics.collect.sqlite_collector import SqliteCollector
-from s2_analytics.constants import WEAPONS_PRIMARY, WEAPONS_SECONDARY, W_STEYR
-from s2_analytics.plot.correlation_chart_maker import CorrelationChartMaker
+from s2_analytics.constants import WEAPONS_PRIMARY, WEAPONS_SECONDARY, W_STEYR, W_BARRETT
+from s2_analytics.analyze.main_weapon_correlation import Correlation, OneWeaponCorrelations
+from s2_analytics.plot.correlation_chart_maker import CorrelationChartMaker, render_charts, shared_limits
 from tests.game_builder import GameBuilderFactory
 from s2_analytics.analyze.main_weapon_analyzer import MainWeaponRoundTagger
 from s2_analytics.collect.team_round_tag_collector import TeamRoundTagCorrelationAnalyzer
@@ -123,6 +126,31 @@ class TestWeaponWinCorrelationPlotting:
         self.plot_show.show()
         pass
 
+    def test_intervals_excluding_correlation_are_clipped_and_missing_ones_skipped(self):
+        correlations = {"ctf_x": Correlation(0.3, 40), "ctf_ash": Correlation(-0.1, 30),
+                        "ctf_pod": Correlation(0.1, 20)}
+        intervals = {"ctf_x": (0.35, 0.6), "ctf_ash": (-0.3, -0.2), "ctf_pod": (float("nan"), float("nan"))}
+        fig = CorrelationChartMaker().plot(OneWeaponCorrelations("SteyrAUG_x1", correlations, intervals))
+        [bars] = fig.axes[0].containers[1:]
+        assert len(bars.lines[2][0].get_segments()) == 2
+        plt.close(fig)
+
+    def test_batch_rendering_matches_single_charts(self, tmp_path):
+        self._generate_games_for_corr(round_count=60, map_count=6, weapon=W_STEYR)
+        self._generate_games_for_corr(round_count=30, map_count=4, weapon=W_BARRETT)
+        process_games(self.factory.finish(), self.collectors)
+        weapon_corr = [self.analyzer.correlations_for_weapon_tag(weapon_tag=tag)
+                       for tag in ["SteyrAUG_x1", "Barrett_x1"]]
+
+        paths = [str(tmp_path / f"batch_{i}.png") for i in range(len(weapon_corr))]
+        assert render_charts(weapon_corr, paths, min_samples=3, workers=2) == paths
+
+        corr_minmax, count_minmax = shared_limits([w.filter(3) for w in weapon_corr])
+        for i, w in enumerate(weapon_corr):
+            CorrelationChartMaker().plot(w, 3, count_minmax.max, corr_minmax.as_tuple()).savefig(tmp_path / "single.png")
+            plt.close()
+            assert np.array_equal(image.imread(paths[i]), image.imread(tmp_path / "single.png"))
+
     def _generate_games_for_corr(self, round_count, map_count, weapon):
         rand = random.Random(1)
         teams_names = list(self.factory._teams.keys())
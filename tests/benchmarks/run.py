@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from dataclasses import asdict
+
+from tests.benchmarks.stages import run_archive
+from tests.benchmarks.synthetic import PRESETS, SyntheticArchive, write_archive
+
+ARCHIVES_DIR = "build/benchmarks/archives"
+RESULTS_DIR = "build/benchmarks"
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# a stage regresses when it is slower than its baseline by this factor...
+THRESHOLD = 1.5
+# ...and by at least this many seconds, so that noise of stages taking a few milliseconds isn't reported
+MIN_REGRESSION_SECONDS = 0.01
+# timings measured with another interpreter or on another architecture aren't comparable
+ENVIRONMENT = ["python", "machine"]
+
+
+def benchmark(preset: str, repeat: int = 1, archives_dir: str = ARCHIVES_DIR) -> dict:
+    archive = PRESETS[preset]
+    logs_dir = write_archive(archive, os.path.join(archives_dir, preset))
+    return {
+        "preset": preset,
+        "archive": asdict(archive),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": run_archive(archive, logs_dir, repeat),
+    }
+
+
+def environment_differences(results: dict, baseline: dict) -> list[str]:
+    """
+    :return: descriptions of environment fields of the results differing from the baseline's
+    """
+    return [f"{field} {results.get(field)}, baseline {baseline.get(field)}" for field in ENVIRONMENT
+            if results.get(field) != baseline.get(field)]
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD,
+            min_seconds: float = MIN_REGRESSION_SECONDS) -> list[str]:
+    """
+    :return: descriptions of stages slower than in the baseline
+    """
+    if SyntheticArchive(**results["archive"]) != SyntheticArchive(**baseline["archive"]):
+        raise ValueError(f"results of {results['archive']} can't be compared with baseline of {baseline['archive']}")
+    differences = environment_differences(results, baseline)
+    if len(differences) > 0:
+        raise ValueError(f"results can't be compared with baseline of another environment: {', '.join(differences)}")
+    regressions = []
+    for name, stage in results["stages"].items():
+        if name not in baseline["stages"]:
+            continue
+        seconds, baseline_seconds = stage["seconds"], baseline["stages"][name]["seconds"]
+        if seconds > baseline_seconds * threshold and seconds - baseline_seconds >= min_seconds:
+            regressions.append(f"{name}: {seconds:.3f}s, baseline {baseline_seconds:.3f}s "
+                               f"({seconds / baseline_seconds:.2f}x)")
+    return regressions
+
+
+def _write_json(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1)
+        f.write("\n")
+
+
+def _print_stages(results: dict, baseline: dict = None):
+    print(f"{'stage':26} {'seconds':>9} {'items':>9} {'items/s':>11} {'baseline':>9}")
+    for name, stage in results["stages"].items():
+        per_second = f"{stage['per_second']:11.0f}" if stage["per_second"] is not None else f"{'-':>11}"
+        reference = baseline["stages"].get(name) if baseline is not None else None
+        reference = f"{reference['seconds']:9.3f}" if reference is not None else f"{'-':>9}"
+        print(f"{name:26} {stage['seconds']:9.3f} {stage['items']:9} {per_second} {reference}")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks import and analysis stages on a synthetic archive")
+    parser.add_argument("--preset", choices=PRESETS, default="small")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each stage, the fastest one is reported")
+    parser.add_argument("--output", help="results file, build/benchmarks/<preset>.json by default")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true", help="store results as the preset's baseline")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.preset, args.repeat)
+    output = args.output or os.path.join(RESULTS_DIR, f"{args.preset}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    _write_json(results, output)
+
+    baseline_path = os.path.join(BASELINES_DIR, f"{args.preset}.json")
+    if args.update_baseline:
+        _write_json(results, baseline_path)
+        _print_stages(results)
+        return 0
+    baseline = None
+    if os.path.isfile(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    _print_stages(results, baseline)
+    if baseline is None:
+        print(f"No baseline of {args.preset}, store one with --update-baseline")
+        return 0
+    differences = environment_differences(results, baseline)
+    if len(differences) > 0:
+        print(f"Not comparing with baseline of {args.preset} measured in another environment "
+              f"({', '.join(differences)}), store one with --update-baseline", file=sys.stderr)
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
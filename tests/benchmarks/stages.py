@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from s2_analytics.collect.fris_weapon_usage_collector import FriWeaponUsageCollector
+from s2_analytics.collect.map_trends_collector import MapTrendsCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.team_round_tag_collector import TeamRoundTagCorrelationAnalyzer
+from s2_analytics.constants import WEAPONS_PRIMARY
+from s2_analytics.importer import JsonGameDeserializer, GameDetails, RoundData, EventData, _game_log_paths, \
+    _has_method
+from s2_analytics.reports import AVG_PERIOD_LONG, correlation_taggers
+from tests.benchmarks.synthetic import SyntheticArchive
+
+
+class _Stage:
+    def __init__(self, unit: str):
+        self.unit = unit
+        self.seconds = 0.
+        self.items = 0
+
+    def to_dict(self) -> dict:
+        return {"seconds": self.seconds, "items": self.items, "unit": self.unit,
+                "per_second": self.items / self.seconds if self.seconds > 0 else None}
+
+
+class _DecodedGame:
+    """
+    Processor calls of a decoded game, replayed into each benchmarked processor separately so that decoding
+    is timed once and each processor's time is only its own
+    """
+
+    def __init__(self):
+        self.calls: list[tuple[str, tuple]] = []
+        self.rounds = 0
+        self.events = 0
+
+    def process_event(self, event: EventData, round: RoundData, game: GameDetails):
+        self.calls.append(("process_event", (event, round, game)))
+        self.events += 1
+
+    def process_round(self, round: RoundData, game: GameDetails):
+        self.calls.append(("process_round", (round, game)))
+        self.rounds += 1
+
+    def process_game(self, game: GameDetails):
+        self.calls.append(("process_game", (game,)))
+
+    def replay(self, processor):
+        hooks = {method: getattr(processor, method) for method in ["process_event", "process_round", "process_game"]
+                 if _has_method(processor, method)}
+        for method, args in self.calls:
+            if method in hooks:
+                hooks[method](*args)
+
+
+def _timed(stage: _Stage, items: int, action: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    result = action()
+    stage.seconds += time.perf_counter() - started
+    stage.items += items
+    return result
+
+
+def run_stages(logs_dir: str, start_date: datetime, end_date: datetime) -> dict[str, dict]:
+    """
+    Benchmarks import and analysis of game logs one stage at a time: directory scan, file read and JSON parse,
+    decoding, ingest of each processor of the session reports, and queries made by the reports' notebooks
+    :return: seconds, items and items per second of each stage
+    """
+    stages = {name: _Stage(unit) for name, unit in [
+        ("scan", "files"), ("parse", "games"), ("decode", "events"), ("sqlite_ingest", "events"),
+        ("fri_weapon_usage_ingest", "events"), ("fri_weapon_usage_query", "queries"),
+        ("tag_correlation_ingest", "rounds"), ("tag_correlation_query", "queries"),
+        ("map_trends_ingest", "rounds"), ("rolling_average", "queries")]}
+
+    paths = _timed(stages["scan"], 0, lambda: _game_log_paths(logs_dir, start_date, end_date))
+    stages["scan"].items = len(paths)
+
+    connection = sqlite3.connect("file::memory:")
+    sqlite_collector = SqliteCollector(sqlite_conn=connection).init()
+    processors = {
+        "sqlite_ingest": sqlite_collector,
+        "fri_weapon_usage_ingest": FriWeaponUsageCollector().init(),
+        "tag_correlation_ingest": TeamRoundTagCorrelationAnalyzer(
+            connection, sqlite_collector, correlation_taggers()).init(),
+        "map_trends_ingest": MapTrendsCollector(),
+    }
+    for path in paths:
+        def parse():
+            with open(path) as f:
+                return json.load(f)
+
+        data = _timed(stages["parse"], 1, parse)
+        decoded = _DecodedGame()
+        _timed(stages["decode"], 0, lambda: JsonGameDeserializer([decoded]).deserialize_game(data))
+        stages["decode"].items += decoded.events
+        for name, processor in processors.items():
+            _timed(stages[name], decoded.rounds if stages[name].unit == "rounds" else decoded.events,
+                   lambda: decoded.replay(processor))
+    _timed(stages["sqlite_ingest"], 0, sqlite_collector.finalize_game_processing)
+
+    period = AVG_PERIOD_LONG
+    _timed(stages["fri_weapon_usage_query"], 1, lambda: processors["fri_weapon_usage_ingest"].get_data(
+        WEAPONS_PRIMARY, period.window_days, period.min_days_for_avg, period.days_of_data_needed))
+    _timed(stages["tag_correlation_query"], 1,
+           lambda: processors["tag_correlation_ingest"].calculate_win_correlation_per_map())
+    _timed(stages["rolling_average"], 1,
+           lambda: processors["map_trends_ingest"].picks().rolling_pick_percentages(period))
+    return {name: stage.to_dict() for name, stage in stages.items()}
+
+
+def run_archive(archive: SyntheticArchive, logs_dir: str, repeat: int = 1) -> dict[str, dict]:
+    """
+    Best of `repeat` runs of every stage over logs of a generated archive
+    """
+    start = datetime.fromisoformat(archive.start)
+    end = start + timedelta(days=archive.days + 1)
+    runs = [run_stages(logs_dir, start, end) for _ in range(repeat)]
+    return {name: min((run[name] for run in runs), key=lambda stage: stage["seconds"]) for name in runs[0]}
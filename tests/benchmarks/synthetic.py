@@ -0,0 +1,161 @@
+import json
+import os
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Iterator
+
+from s2_analytics.constants import WEAPONS_PRIMARY, WEAPONS_SECONDARY
+from s2_analytics.importer import Game
+from s2_analytics.tools import dump_game_as_json_dict
+from tests.game_builder import GameBuilder
+
+MAPS = ["ctf_skylark", "ctf_dropdown", "ctf_sigma", "ctf_omen", "ctf_guardian", "ctf_cargo", "ctf_anthill",
+        "ctf_atlantis", "ctf_rotten", "ctf_steel", "ctf_crossfire", "ctf_viral", "ctf_spark", "ctf_duskwind",
+        "ctf_mint", "ctf_pod", "ctf_limbo_r", "ctf_newbia", "ctf_cobra", "ctf_arcane", "ctf_deathloop", "ctf_basalt",
+        "ctf_huracan", "ctf_hormone", "ctf_division", "ctf_wretch", "ctf_x", "ctf_campsite", "ctf_tyrus", "ctf_ash"]
+PLAYLISTS = {"CTF-Standard-6": 0.85, "CTF-Standard-4": 0.1, "CTF-Standard-8": 0.05}
+TEAMS = ["Red", "Blue"]
+
+# ranked sample has ~2.6 rounds per game and ~90 kills per round
+ROUNDS_PER_GAME = {1: 0.15, 2: 0.25, 3: 0.6}
+MAIN_WEAPON_SHARE = 0.6
+
+
+@dataclass(frozen=True)
+class SyntheticArchive:
+    """
+    Size and shape of a generated archive, games are spread evenly over `days` from `start`
+    """
+    games: int
+    kills_per_round: int = 90
+    players: int = 400
+    players_per_team: int = 6
+    days: int = 90
+    start: str = "2024-01-01"
+    seed: int = 0
+
+    @property
+    def expected_kills(self) -> int:
+        rounds = sum(n * p for n, p in ROUNDS_PER_GAME.items())
+        return round(self.games * rounds * self.kills_per_round)
+
+
+# archives of each size benchmarked and kept as baselines
+PRESETS = {
+    "tiny": SyntheticArchive(games=20, kills_per_round=30, players=40, days=10),
+    "small": SyntheticArchive(games=400),
+    "medium": SyntheticArchive(games=4_000),
+    "large": SyntheticArchive(games=10_000, players=2_000, days=365),
+}
+
+
+@dataclass
+class _Player:
+    id: str
+    skill: float
+    activity: float
+    main_weapon: str
+
+
+def _zipf_weights(n: int, exponent: float = 1.0) -> list[float]:
+    return [1 / (rank + 1) ** exponent for rank in range(n)]
+
+
+class _Generator:
+    def __init__(self, archive: SyntheticArchive):
+        self.archive = archive
+        self.rng = random.Random(archive.seed)
+        self.map_weights = _zipf_weights(len(MAPS), 0.6)
+        self.weapons = WEAPONS_PRIMARY + WEAPONS_SECONDARY
+        self.weapon_weights = _zipf_weights(len(WEAPONS_PRIMARY), 0.8) + [0.05] * len(WEAPONS_SECONDARY)
+        main_weapons = self.rng.choices(WEAPONS_PRIMARY, _zipf_weights(len(WEAPONS_PRIMARY), 0.8),
+                                        k=archive.players)
+        self.players = [_Player(f"{self.rng.getrandbits(64):016X}", self.rng.gauss(0, 1),
+                                self.rng.paretovariate(1.5), weapon) for weapon in main_weapons]
+
+    def _pick_players(self) -> list[_Player]:
+        wanted = min(2 * self.archive.players_per_team, len(self.players))
+        picked = {}
+        while len(picked) < wanted:
+            for player in self.rng.choices(self.players, [p.activity for p in self.players], k=wanted):
+                picked.setdefault(player.id, player)
+        return list(picked.values())[:wanted]
+
+    def start_times(self) -> list[int]:
+        start = int((datetime.fromisoformat(self.archive.start) - datetime(1970, 1, 1)).total_seconds() * 1000)
+        span = self.archive.days * 86_400_000
+        # distinct milliseconds, since the start time is the game id
+        return sorted(self.rng.sample(range(start, start + span, 1000), self.archive.games))
+
+    def game(self, start_time: int) -> Game:
+        players = self._pick_players()
+        self.rng.shuffle(players)
+        teams = {team: players[i::2] for i, team in enumerate(TEAMS)}
+        strength = {team: sum(p.skill for p in members) / len(members) for team, members in teams.items()}
+        red = 1 / (1 + 10 ** ((strength["Blue"] - strength["Red"]) / 2))
+        builder = GameBuilder(start_time, {team: [p.id for p in members] for team, members in teams.items()},
+                              match_quality=1 - abs(red - 0.5), playlist=self._playlist(),
+                              teams_win_probability={"Red": red, "Blue": 1 - red})
+        time = start_time + self.rng.randint(20_000, 60_000)
+        rounds = self.rng.choices(list(ROUNDS_PER_GAME), list(ROUNDS_PER_GAME.values()))[0]
+        for _ in range(rounds):
+            time = self._round(builder, teams, red, time) + self.rng.randint(10_000, 30_000)
+        return builder.build()
+
+    def _playlist(self) -> str:
+        return self.rng.choices(list(PLAYLISTS), list(PLAYLISTS.values()))[0]
+
+    def _round(self, builder: GameBuilder, teams: dict[str, list[_Player]], red: float, start: int) -> int:
+        end = start + self.rng.randint(240_000, 600_000)
+        builder.add_round(start=start, end_time=end, map=self.rng.choices(MAPS, self.map_weights)[0])
+        winner = "Red" if self.rng.random() < red else "Blue"
+        loser = "Blue" if winner == "Red" else "Red"
+        winner_caps = self.rng.randint(1, 5)
+        caps = [(self.rng.randint(start, end), winner) for _ in range(winner_caps)] + \
+               [(self.rng.randint(start, end), loser) for _ in range(self.rng.randint(0, winner_caps - 1))]
+        kills = self.rng.randint(self.archive.kills_per_round // 2, self.archive.kills_per_round * 3 // 2)
+        events = [(t, None) for t in self.rng.choices(range(start, end), k=kills)] + caps
+        for time, capping_team in sorted(events, key=lambda e: e[0]):
+            if capping_team is not None:
+                builder.add_cap(time=time, player=self.rng.choice(teams[capping_team]).id)
+                continue
+            killer_team = self.rng.choice(TEAMS)
+            killer = self.rng.choice(teams[killer_team])
+            victim = self.rng.choice(teams["Blue" if killer_team == "Red" else "Red"])
+            weapon = killer.main_weapon if self.rng.random() < MAIN_WEAPON_SHARE else \
+                self.rng.choices(self.weapons, self.weapon_weights)[0]
+            builder.add_kill(time=time, killer=killer.id, victim=victim.id, weapon=weapon)
+        return end
+
+
+def generate_games(archive: SyntheticArchive) -> Iterator[Game]:
+    """
+    Games with players of varied skill, activity and main weapon, maps and weapons picked with skewed popularity,
+    generated one at a time so that archives of millions of kills don't have to fit in memory
+    """
+    generator = _Generator(archive)
+    for start_time in generator.start_times():
+        yield generator.game(start_time)
+
+
+def write_archive(archive: SyntheticArchive, directory: str) -> str:
+    """
+    Writes game logs of an archive into `directory`, reusing logs written before for the same archive
+    :return: `directory`
+    """
+    marker = os.path.join(directory, "archive.json")
+    if os.path.isfile(marker):
+        with open(marker) as f:
+            if json.load(f) == asdict(archive):
+                return directory
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.startswith("game_"):
+            os.remove(os.path.join(directory, name))
+    for game in generate_games(archive):
+        with open(os.path.join(directory, f"game_{game.details.id}.json"), "w") as f:
+            json.dump(dump_game_as_json_dict(game), f)
+    with open(marker, "w") as f:
+        json.dump(asdict(archive), f, indent=1)
+    return directory
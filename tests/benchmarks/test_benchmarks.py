@@ -0,0 +1,73 @@
+import copy
+import os
+
+import pytest
+
+from s2_analytics.importer import EventKill
+from tests.benchmarks.run import benchmark, compare, environment_differences
+from tests.benchmarks.synthetic import PRESETS, generate_games, write_archive, SyntheticArchive
+
+
+def test_generated_games_are_reproducible_and_varied():
+    archive = SyntheticArchive(games=30, kills_per_round=20, players=50)
+    games = list(generate_games(archive))
+
+    assert games == list(generate_games(archive))
+    assert len({g.details.id for g in games}) == 30
+    kills = [e for g in games for events in g.events_by_round for e in events if isinstance(e, EventKill)]
+    assert len({k.weapon for k in kills}) > 5
+    assert len({r.map for g in games for r in g.rounds}) > 5
+    assert len({p for g in games for team in g.details.teams.values() for p in team}) > 20
+    assert all(r.winner is not None for g in games for r in g.rounds)
+
+
+def test_archive_is_written_once(tmp_path):
+    directory = write_archive(PRESETS["tiny"], str(tmp_path))
+    logs = sorted(n for n in os.listdir(directory) if n.startswith("game_"))
+    modified = os.path.getmtime(os.path.join(directory, logs[0]))
+
+    write_archive(PRESETS["tiny"], directory)
+
+    assert len(logs) == PRESETS["tiny"].games
+    assert os.path.getmtime(os.path.join(directory, logs[0])) == modified
+
+
+def test_benchmark_reports_every_stage(tmp_path):
+    archive = PRESETS["tiny"]
+    kills = sum(1 for g in generate_games(archive) for events in g.events_by_round for e in events
+                if isinstance(e, EventKill))
+
+    results = benchmark("tiny", archives_dir=str(tmp_path))
+
+    stages = results["stages"]
+    assert list(stages) == ["scan", "parse", "decode", "sqlite_ingest", "fri_weapon_usage_ingest",
+                            "fri_weapon_usage_query", "tag_correlation_ingest", "tag_correlation_query",
+                            "map_trends_ingest", "rolling_average"]
+    assert stages["scan"]["items"] == archive.games
+    assert stages["parse"]["items"] == archive.games
+    assert stages["decode"]["items"] == stages["sqlite_ingest"]["items"] > kills
+    assert all(s["seconds"] >= 0 for s in stages.values())
+
+
+def test_slower_stages_are_regressions():
+    baseline = {"archive": {"games": 10}, "stages": {"parse": {"seconds": 1.0}, "decode": {"seconds": 0.001}}}
+    results = copy.deepcopy(baseline)
+    results["stages"]["parse"]["seconds"] = 1.6
+    results["stages"]["decode"]["seconds"] = 0.004
+
+    assert compare(results, baseline) == ["parse: 1.600s, baseline 1.000s (1.60x)"]
+    assert compare(results, baseline, threshold=2.0) == []
+
+
+def test_results_of_other_archives_arent_compared():
+    with pytest.raises(ValueError):
+        compare({"archive": {"games": 10}, "stages": {}}, {"archive": {"games": 20}, "stages": {}})
+
+
+def test_results_of_other_environments_arent_compared():
+    baseline = {"archive": {"games": 10}, "python": "3.11.7", "machine": "x86_64", "stages": {}}
+    results = dict(baseline, machine="arm64")
+
+    assert environment_differences(results, baseline) == ["machine arm64, baseline x86_64"]
+    with pytest.raises(ValueError):
+        compare(results, baseline)
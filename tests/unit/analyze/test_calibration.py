@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+
+from s2_analytics.analyze.calibration import WinProbabilityCalibration, ROUNDS
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+DAY = 24 * 60 * 60 * 1000
+
+
+def _games():
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    # (day, probability of Red win, round winners)
+    for day, probability, winners in [(0, 0.8, ["Red", "Red"]),
+                                      (0, 0.3, ["Red", "Blue", "Blue"]),
+                                      (1, 0.6, ["Blue"]),
+                                      (5, 0.5, ["Red", None])]:
+        builder = factory.add_game(game_start_time=DAY * (19000 + day) + len(factory.finish()),
+                                   teams_win_probability={"Red": probability, "Blue": 1 - probability})
+        for winner in winners:
+            builder.add_round(winner=winner)
+        builder.build()
+    return factory.finish()
+
+
+class TestWinProbabilityCalibration:
+    def setup_method(self):
+        self.calibration = WinProbabilityCalibration({"red_favourite": lambda g: g.team_win_probabilities["Red"] >= 0.5})
+        process_games(_games(), [self.calibration])
+
+    def test_scores_predictions_of_games_and_rounds(self):
+        squared_errors = [0.2 ** 2, 0.3 ** 2, 0.6 ** 2, 0.5 ** 2]
+        assert math.isclose(self.calibration.brier_score(), np.mean(squared_errors))
+        losses = [-math.log(0.8), -math.log(0.7), -math.log(0.4), -math.log(0.5)]
+        assert math.isclose(self.calibration.log_loss(), np.mean(losses))
+        # tied round is left out
+        assert len(self.calibration.arrays(ROUNDS)[0]) == 7
+
+    def test_bins_predictions_by_probability(self):
+        reliability = self.calibration.reliability(bins=[0, 0.5, 1])
+        assert reliability["count"].tolist() == [1, 3]
+        assert reliability["observed"].tolist() == [0.0, 2 / 3]
+        assert np.allclose(reliability["predicted"], [0.3, (0.8 + 0.6 + 0.5) / 3])
+
+    def test_scores_rolling_windows_of_days(self):
+        rolling = self.calibration.rolling(window_days=2)
+        assert rolling["count"].tolist() == [2, 3, 1]
+        assert math.isclose(rolling["brier_score"].iloc[2], 0.25)
+
+    def test_applies_filters_evaluated_during_import(self):
+        assert len(self.calibration.arrays(filter="red_favourite")[0]) == 3
+        assert self.calibration.arrays(ROUNDS, filter="red_favourite")[2].tolist() == [1, 1, 0, 1]
@@ -0,0 +1,69 @@
+import numpy as np
+
+from s2_analytics.analyze.cap_timing import CapTimingCollector, _grouped_quantiles
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+START = 1000
+
+
+def _timings():
+    games = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]}) \
+        .add_game(game_start_time=START) \
+        .add_round(start=START, map="ctf_ash") \
+        .add_cap(START + 30_000, player="B") \
+        .add_cap(START + 10_000, player="B") \
+        .add_cap(START + 50_000, player="A") \
+        .add_cap(START + 60_000, player="A") \
+        .add_cap(START + 90_000, player="A") \
+        .add_round(start=START, map="ctf_x") \
+        .add_cap(START + 20_000, player="A") \
+        .add_round(start=START, map="ctf_ash") \
+        .build() \
+        .finish()
+    collector = CapTimingCollector()
+    process_games(games, [collector])
+    return collector.timings()
+
+
+class TestCapTimings:
+    def test_averages_caps_per_round_of_each_map(self):
+        df = _timings().caps_per_round_by_map()
+        assert df[["mapName", "rounds", "caps", "avg_caps_per_round"]].values.tolist() == [
+            ["ctf_ash", 2, 5, 2.5],
+            ["ctf_x", 1, 1, 1.0],
+        ]
+
+    def test_finds_first_cap_and_intervals_between_caps_of_each_round(self):
+        timings = _timings()
+        first = timings.first_caps()
+        assert first[["round", "playfabId", "team", "seconds"]].values.tolist() == [
+            [1, "B", "Blue", 10.0],
+            [2, "A", "Red", 20.0],
+        ]
+        rounds, seconds = timings.intervals()
+        assert rounds.tolist() == [0, 0, 0, 0]
+        assert seconds.tolist() == [20.0, 20.0, 10.0, 30.0]
+
+    def test_detects_rounds_won_after_trailing(self):
+        comebacks = _timings().comebacks(min_deficit=2)
+        assert comebacks[["round", "winner", "deficit"]].values.tolist() == [[1, "Red", 2]]
+        assert len(_timings().comebacks(min_deficit=3)) == 0
+
+    def test_quantiles_of_first_caps_per_map(self):
+        quantiles = _timings().first_cap_quantiles(quantiles=[0.5, 0.9], by_team=True)
+        assert quantiles[["mapName", "team", "rounds", "q0.5"]].values.tolist() == [
+            ["ctf_ash", "Blue", 1, 10.0],
+            ["ctf_x", "Red", 1, 20.0],
+        ]
+
+    def test_grouped_quantiles_match_numpy(self):
+        rand = np.random.default_rng(0)
+        groups = rand.integers(0, 4, size=500)
+        values = rand.random(500)
+        counts, result = _grouped_quantiles(groups, values, 5, [0.1, 0.5, 0.95])
+
+        assert counts.tolist() == np.bincount(groups, minlength=5).tolist()
+        for group in range(4):
+            assert np.allclose(result[group], np.quantile(values[groups == group], [0.1, 0.5, 0.95]))
+        assert np.isnan(result[4]).all()
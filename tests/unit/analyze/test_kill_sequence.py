@@ -0,0 +1,86 @@
+import numpy as np
+
+from s2_analytics.analyze.kill_sequence import KillSequenceRoundTagger, RoundKillSequence
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+START = 1000
+
+
+def _game() -> list:
+    return GameBuilderFactory(teams={"Red": ["A", "C"], "Blue": ["B", "D"]}) \
+        .add_game(game_start_time=START) \
+        .add_round(start=START, winner="Red") \
+        .add_kill(START + 1_000, killer="B", victim="A") \
+        .add_kill(START + 2_000, killer="C", victim="B") \
+        .add_kill(START + 10_000, killer="D", victim="C") \
+        .add_kill(START + 20_000, killer="A", victim="D") \
+        .add_kill(START + 21_000, killer="A", victim="B") \
+        .add_kill(START + 30_000, killer="A", victim="D") \
+        .add_kill(START + 40_000, killer="B", victim="A") \
+        .add_kill(START + 41_000, killer="A", victim="B") \
+        .build() \
+        .finish()
+
+
+def _tags(tagger: KillSequenceRoundTagger, games: list = None) -> list[dict[str, list[str]]]:
+    games = games if games is not None else _game()
+    tags = []
+
+    class Collector:
+        def process_game(self, game):
+            tags.extend(tagger.get_game_round_tags())
+
+    process_games(games, [tagger, Collector()])
+    return tags
+
+
+class TestKillSequenceRoundTagger:
+    def test_tags_trades_streaks_and_multi_kills(self):
+        assert _tags(KillSequenceRoundTagger()) == [{
+            "Red": ["trades_1+", "streak_3+", "multikill_2+"],
+            "Blue": [],
+        }]
+
+    def test_windows_and_thresholds_are_configurable(self):
+        tagger = KillSequenceRoundTagger(trade_window_ms=10_000, multi_kill_window_ms=500,
+                                         trade_thresholds=(2,), streak_thresholds=(4,), multi_kill_thresholds=(2,))
+        assert _tags(tagger) == [{"Red": ["trades_2+"], "Blue": ["trades_2+"]}]
+
+    def test_kills_of_rounds_of_a_game_dont_form_sequences(self):
+        games = GameBuilderFactory(teams={"Red": ["A", "C"], "Blue": ["B", "D"]}) \
+            .add_game(game_start_time=START) \
+            .add_round(start=START, winner="Red") \
+            .add_kill(START + 1_000, killer="A", victim="B") \
+            .add_kill(START + 2_000, killer="A", victim="D") \
+            .add_round(start=START + 60_000) \
+            .add_kill(START + 61_000, killer="B", victim="C") \
+            .add_round(start=START + 120_000, winner="Blue") \
+            .add_kill(START + 121_000, killer="A", victim="B") \
+            .add_kill(START + 121_500, killer="D", victim="A") \
+            .build() \
+            .finish()
+        tagger = KillSequenceRoundTagger(streak_thresholds=(2, 3))
+        assert _tags(tagger, games) == [
+            {"Red": ["streak_2+", "multikill_2+"], "Blue": []},
+            None,
+            {"Red": [], "Blue": ["trades_1+"]},
+        ]
+
+
+class TestRoundKillSequence:
+    def test_team_kills_end_streaks_without_counting_as_kills(self):
+        sequence = RoundKillSequence(times=np.array([300, 100, 200, 150]), killers=np.array([0, 0, 0, 0]),
+                                     victims=np.array([1, 1, 0, 1]), killer_teams=np.array([0, 0, 0, 0]),
+                                     victim_teams=np.array([1, 1, 0, 1]))
+        assert sequence.longest_streaks(2).tolist() == [2, 0]
+        killers, counts = sequence.multi_kills(window_ms=100)
+        assert killers.tolist() == [0, 0, 0]
+        assert counts.tolist() == [2, 1, 1]
+
+    def test_empty_round(self):
+        empty = np.zeros(0, dtype=np.int64)
+        sequence = RoundKillSequence(empty, empty, empty, empty, empty)
+        assert len(sequence.trades(1000)) == 0
+        assert sequence.longest_streaks(3).tolist() == [0, 0, 0]
+        assert len(sequence.multi_kills(1000)[1]) == 0
@@ -73,6 +73,19 @@ class TestMainWeaponAnalyzer:
         sut.process_kill(self.player1, "knife")
         assert sut.report()["teamA"] == {"knife": 1, "ak": 1}
 
+    def test_ignores_kills_of_players_outside_of_teams(self):
+        sut = MainWeaponAnalyzer([["mp5", "ak"]], {"A": [self.player1]})
+        sut.process_kill(self.player2, "ak")
+        sut.process_kill(self.player1, "mp5")
+        assert sut.report() == {"A": {"mp5": 1}}
+
+    def test_reset_forgets_kills_but_keeps_teams(self):
+        sut = MainWeaponAnalyzer([["mp5", "ak"]], {"A": [self.player1], "B": [self.player2]})
+        sut.process_kill(self.player1, "ak")
+        sut.reset()
+        sut.process_kill(self.player2, "mp5")
+        assert sut.report() == {"A": {}, "B": {"mp5": 1}}
+
 
 NO_RESULT_TAG_FILTER = lambda t: t not in ["win", "lose"]
 
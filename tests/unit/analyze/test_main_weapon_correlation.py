@@ -1,5 +1,8 @@
+import math
 import sqlite3
 
+import pytest
+
 from s2_analytics.collect.sqlite_collector import SqliteCollector
 from s2_analytics.constants import WEAPONS_PRIMARY, WEAPONS_SECONDARY, W_BARRETT, W_STEYR, W_DEAGLES, W_RPG
 from tests.game_builder import GameBuilderFactory, GameBuilder
@@ -277,3 +280,88 @@ class TestMainWeaponCorrelation:
         assert corr.sample_count("ctf_ash") == 1
         assert corr.sample_count("ctf_othermap") == 0
         assert corr.sample_count() == 3
+
+    def test_calculates_correlations_and_counts_for_all_maps_at_once(self):
+        games = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]}) \
+            .add_game() \
+            .add_round(map="ctf_x", winner="Red") \
+            .add_kill(killer="A", weapon=W_STEYR) \
+            .add_kill(killer="B", weapon=W_DEAGLES) \
+            .add_round(map="ctf_ash", winner="Blue") \
+            .add_kill(killer="A", weapon=W_STEYR) \
+            .add_round(map="ctf_ash", winner="Red") \
+            .add_kill(killer="B", weapon=W_STEYR) \
+            .build() \
+            .finish()
+
+        process_games(games, self.collectors)
+        per_map = self.analyzer.statistics_per_map(NO_RESULT_TAG_FILTER)
+        assert per_map == {
+            "ctf_x": {"SteyrAUG_x1": (1.0, 1), "Deagles_x1": (-1.0, 1)},
+            "ctf_ash": {"SteyrAUG_x1": (-1.0, 2)},
+        }
+        assert self.analyzer.statistics_per_map(NO_RESULT_TAG_FILTER, workers=2) == per_map
+
+    def test_calculates_correlations_for_many_weapons_at_once(self):
+        games = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]}) \
+            .add_game() \
+            .add_round(map="ctf_x", winner="Red") \
+            .add_kill(killer="A", weapon=W_STEYR) \
+            .add_kill(killer="B", weapon=W_DEAGLES) \
+            .add_round(map="ctf_ash", winner="Red") \
+            .add_kill(killer="B", weapon=W_STEYR) \
+            .build() \
+            .finish()
+
+        process_games(games, self.collectors)
+        corr = self.analyzer.correlations_for_weapon_tags()
+        assert set(corr.keys()) == {"SteyrAUG_x1", "Deagles_x1"}
+        assert corr["SteyrAUG_x1"].correlation("ctf_x") == 1
+        assert corr["SteyrAUG_x1"].correlation("ctf_ash") == -1
+        assert corr["Deagles_x1"].correlation("ctf_x") == -1
+        assert corr["Deagles_x1"].sample_count("ctf_ash") == 0
+
+        corr = self.analyzer.correlations_for_weapon_tags(["SteyrAUG_x1", "Barrett_x1"])
+        assert corr["SteyrAUG_x1"].sample_count() == 2
+        assert corr["Barrett_x1"].sample_count() == 0
+
+    def test_attaches_bootstrap_confidence_intervals_to_weapon_correlations(self):
+        builder = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]}).add_game()
+        for i in range(0, 30):
+            builder.add_round(map="ctf_x", winner="Red" if i % 3 else "Blue").add_kill(killer="A", weapon=W_STEYR)
+        process_games(builder.build().finish(), self.collectors)
+
+        intervals = self.analyzer.bootstrap_intervals(replicates=200)
+        corr = self.analyzer.correlations_for_weapon_tags(["SteyrAUG_x1"], intervals)["SteyrAUG_x1"]
+        low, high = corr.confidence_interval("ctf_x")
+        assert low < corr.correlation("ctf_x") < high
+        assert corr.filter(min_samples=100).confidence_interval("ctf_x") is None
+
+    def test_calculates_correlations_of_weapon_pairs_used_by_a_team(self):
+        games = GameBuilderFactory(teams={"Red": ["A", "C"], "Blue": ["B", "D"]}) \
+            .add_game() \
+            .add_round(map="ctf_x", winner="Red") \
+            .add_kill(killer="A", weapon=W_STEYR) \
+            .add_kill(killer="C", weapon=W_BARRETT) \
+            .add_kill(killer="B", weapon=W_DEAGLES) \
+            .add_kill(killer="D", weapon=W_RPG) \
+            .add_round(map="ctf_x", winner="Blue") \
+            .add_kill(killer="A", weapon=W_STEYR) \
+            .add_kill(killer="C", weapon=W_RPG) \
+            .add_kill(killer="B", weapon=W_DEAGLES) \
+            .add_kill(killer="D", weapon=W_BARRETT) \
+            .build() \
+            .finish()
+
+        process_games(games, self.collectors)
+        pairs = {frozenset(pair): c for pair, c in self.analyzer.pair_statistics_per_map()["ctf_x"].items()}
+        assert set(pairs) == {frozenset(["SteyrAUG_x1", "Barrett_x1"]), frozenset(["Deagles_x1", "RPG_x1"]),
+                              frozenset(["SteyrAUG_x1", "RPG_x1"]), frozenset(["Deagles_x1", "Barrett_x1"])}
+        steyr_barrett = pairs[frozenset(["SteyrAUG_x1", "Barrett_x1"])]
+        assert steyr_barrett.sample_count == 1
+        assert steyr_barrett.correlation == pytest.approx(1 / math.sqrt(3))
+        assert pairs[frozenset(["Deagles_x1", "RPG_x1"])].correlation == pytest.approx(-1 / math.sqrt(3))
+
+        assert self.analyzer.pair_statistics_per_map(min_support=2) == {"ctf_x": {}}
+        only_primary = self.analyzer.pair_statistics_per_map(lambda t: not t.startswith("Deagles"))["ctf_x"]
+        assert len(only_primary) == 2
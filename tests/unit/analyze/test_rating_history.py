@@ -0,0 +1,48 @@
+import datetime
+import math
+
+from s2_analytics.analyze.rating_history import RatingHistoryCollector
+from s2_analytics.importer import GameRatings, GameDetails, epoch_millis
+
+DAY_1 = datetime.datetime(2024, 8, 1, 20, 0)
+DAY_2 = datetime.datetime(2024, 8, 2, 20, 0)
+
+
+def _rate(collector: RatingHistoryCollector, time: datetime.datetime, ratings: dict[str, tuple[float, int]]):
+    game = GameDetails(epoch_millis(time), time, "CTF-Standard-6", 0, 0, {}, 0.5, {})
+    players = list(ratings.keys())
+    collector.process_ratings(GameRatings(
+        game.id, players,
+        [0.0] * len(players), [1.0] * len(players), [0] * len(players),
+        [r[0] for r in ratings.values()], [1.0] * len(players), [r[1] for r in ratings.values()],
+        [0] * len(players), [0] * len(players)
+    ), game)
+
+
+class TestRatingHistory:
+    def setup_method(self):
+        collector = RatingHistoryCollector()
+        _rate(collector, DAY_1, {"A": (50.0, 7), "B": (40.0, 4)})
+        _rate(collector, DAY_1 + datetime.timedelta(hours=1), {"A": (55.0, 8), "C": (30.0, 1)})
+        _rate(collector, DAY_2, {"B": (45.0, 5), "A": (52.0, 7)})
+        self.history = collector.history()
+
+    def test_groups_ratings_by_player_in_time_order(self):
+        assert self.history.trajectory("A")["mu"].tolist() == [50.0, 55.0, 52.0]
+        assert self.history.trajectory("B")["tier"].tolist() == [4, 5]
+        assert len(self.history.trajectory("nobody")) == 0
+
+    def test_finds_rating_after_last_game_before_given_time(self):
+        assert self.history.rating_at("A", epoch_millis(DAY_1 + datetime.timedelta(minutes=30)))[0] == 50.0
+        assert self.history.rating_at("A", epoch_millis(DAY_2))[0] == 52.0
+        assert math.isnan(self.history.rating_at("C", epoch_millis(DAY_1))[0])
+
+        mu, _ = self.history.ratings_at(["A", "B", "C", "nobody"], epoch_millis(DAY_2) - 1)
+        assert mu[:3].tolist() == [55.0, 40.0, 30.0]
+        assert math.isnan(mu[3])
+
+    def test_counts_tiers_of_players_active_each_day(self):
+        distribution = self.history.tier_distribution_per_day()
+        assert distribution.index.tolist() == [datetime.datetime(2024, 8, 1), datetime.datetime(2024, 8, 2)]
+        assert distribution.loc["2024-08-01", ["BRONZE_I", "SILVER_I", "GOLD_I", "GOLD_II"]].tolist() == [1, 1, 0, 1]
+        assert distribution.loc["2024-08-02"].sum() == 2
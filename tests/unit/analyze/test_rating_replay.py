@@ -0,0 +1,66 @@
+import math
+import random
+
+import numpy as np
+
+from s2_analytics.analyze.rating_replay import RatingReplay
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory, GameBuilder
+
+PLAYERS = ["A", "B", "C", "D", "E", "F"]
+
+
+def _random_games(count: int, seed: int = 0):
+    rand = random.Random(seed)
+    factory = GameBuilderFactory()
+    for i in range(count):
+        players = rand.sample(PLAYERS, 6)
+        builder = GameBuilder(game_start_time=1000 * (i + 1), teams={"Red": players[:3], "Blue": players[3:]},
+                              factory=factory)
+        for _ in range(2):
+            builder.add_round(map=rand.choice(["ctf_ash", "ctf_x"]), winner=rand.choice(["Red", "Blue"]))
+        builder.build()
+    return factory.finish()
+
+
+class TestRatingReplay:
+    def test_rates_one_on_one_game_like_trueskill_without_draws(self):
+        games = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]}) \
+            .add_game() \
+            .add_round(winner="Red") \
+            .build() \
+            .finish()
+        replay = RatingReplay()
+        process_games(games, [replay])
+
+        mu, sigma = replay.rating("A")
+        assert math.isclose(mu, 29.205, abs_tol=1e-3) and math.isclose(sigma, 7.195, abs_tol=1e-3)
+        mu, sigma = replay.rating("B")
+        assert math.isclose(mu, 20.795, abs_tol=1e-3) and math.isclose(sigma, 7.195, abs_tol=1e-3)
+
+    def test_continuing_from_checkpoint_equals_replaying_all_games(self, tmp_path):
+        games = _random_games(40)
+        full = RatingReplay(capacity=2)
+        process_games(games, [full])
+
+        path = str(tmp_path / "ratings.npz")
+        first = RatingReplay(capacity=2)
+        process_games(games[:25], [first])
+        first.save(path)
+        resumed = RatingReplay.load(path)
+        # games already rated are ignored when imported again
+        process_games(games[20:], [resumed])
+
+        assert resumed.players.values == full.players.values
+        assert np.allclose(resumed.mu[:len(PLAYERS)], full.mu[:len(PLAYERS)], rtol=0, atol=1e-12)
+        assert np.array_equal(resumed.games[:len(PLAYERS)], full.games[:len(PLAYERS)])
+        assert resumed.last_game_id == games[-1].details.id
+
+    def test_rates_rounds_per_map(self):
+        replay = RatingReplay(per_map=True)
+        process_games(_random_games(10), [replay])
+
+        ratings = replay.ratings()
+        assert set(ratings["map"]) == {"ctf_ash", "ctf_x"}
+        assert ratings["games"].sum() == 10 * 2 * 6
+        assert replay.rating("A", "ctf_ash") != replay.rating("A")
@@ -0,0 +1,212 @@
+import datetime
+import itertools
+import math
+import random
+
+import numpy as np
+import pandas as pd
+
+from s2_analytics.analyze.bootstrap import bootstrap_win_correlations
+from s2_analytics.analyze.tag_correlation import TeamRoundTagSets, Interner, DailyTagWinStats
+
+
+class TestTeamRoundTagSets:
+    def test_interns_tags_in_order_of_appearance(self):
+        interner = Interner()
+        assert [interner.intern(t) for t in ["b", "a", "b", "c"]] == [0, 1, 0, 2]
+        assert interner.values == ["b", "a", "c"]
+
+    def test_correlations_match_pandas_pearson_correlation(self):
+        rand = random.Random(1)
+        tag_sets = TeamRoundTagSets()
+        records = []
+        for i in range(300):
+            tags = [t for t in ["a", "b", "c", "d"] if rand.random() < 0.3]
+            win = rand.random() < (0.7 if "a" in tags else 0.4)
+            tag_sets.add("ctf_x", tags, win)
+            records.append({**{t: 1.0 for t in tags}, "win": 1.0 if win else 0.0})
+
+        expected = pd.DataFrame.from_records(records).fillna(0).corr()["win"]
+        counts = tag_sets.counts()
+        correlations = counts.correlations()
+
+        for tag, tag_id in tag_sets.tags.ids.items():
+            assert math.isclose(correlations[tag_id], expected[tag], abs_tol=1e-12)
+            assert counts.tag_rows[tag_id] == sum(1 for r in records if tag in r)
+
+    def test_correlation_is_undefined_for_tag_present_in_every_row(self):
+        tag_sets = TeamRoundTagSets()
+        tag_sets.add("ctf_x", ["a"], True)
+        tag_sets.add("ctf_x", ["a"], False)
+        assert math.isnan(tag_sets.counts().correlations()[0])
+
+    def test_counts_only_rows_selected_by_mask(self):
+        tag_sets = TeamRoundTagSets()
+        tag_sets.add("ctf_x", ["a"], True)
+        tag_sets.add("ctf_ash", ["a", "b"], False)
+        tag_sets.add("ctf_ash", [], True)
+
+        counts = tag_sets.counts(tag_sets.map_mask("ctf_ash"))
+        assert (counts.rows, counts.wins) == (2, 1)
+        assert counts.tag_rows.tolist() == [1, 1]
+        assert counts.tag_wins.tolist() == [0, 0]
+
+    def test_pair_counts_match_counting_pairs_of_each_row(self):
+        rand = random.Random(2)
+        tag_sets = TeamRoundTagSets()
+        expected_rows, expected_wins, wins = {}, {}, 0
+        for i in range(200):
+            tags = [t for t in ["a", "b", "c", "d", "e"] if rand.random() < 0.4]
+            win = rand.random() < 0.5
+            tag_sets.add("ctf_x", tags, win)
+            wins += win
+            for pair in itertools.combinations(tags, 2):
+                if "e" not in pair:
+                    expected_rows[pair] = expected_rows.get(pair, 0) + 1
+                    expected_wins[pair] = expected_wins.get(pair, 0) + win
+
+        tag_mask = np.array([t != "e" for t in tag_sets.tags.values])
+        counts = tag_sets.pair_counts(tag_mask=tag_mask, min_support=15)
+        tags = tag_sets.tags.values
+        pairs = [tuple(sorted((tags[f], tags[s]))) for f, s in zip(counts.first, counts.second)]
+        assert dict(zip(pairs, counts.pair_rows.tolist())) == \
+               {pair: rows for pair, rows in expected_rows.items() if rows >= 15}
+        assert dict(zip(pairs, counts.pair_wins.tolist())) == \
+               {pair: expected_wins[pair] for pair, rows in expected_rows.items() if rows >= 15}
+        assert (counts.rows, counts.wins) == (200, wins)
+
+    def test_pair_counts_by_map_match_pair_counts_of_map_rows(self):
+        rand = random.Random(3)
+        tag_sets = TeamRoundTagSets()
+        for i in range(300):
+            tag_sets.add(rand.choice(["ctf_x", "ctf_ash", "ctf_pod"]),
+                         [t for t in ["a", "b", "c", "d", "e"] if rand.random() < 0.4], rand.random() < 0.5)
+        tag_mask = np.array([t != "e" for t in tag_sets.tags.values])
+
+        by_map = tag_sets.pair_counts_by_map(tag_mask, min_support=5)
+        assert len(by_map) == 3
+        for map, actual in zip(tag_sets.maps.values, by_map):
+            expected = tag_sets.pair_counts(tag_sets.map_mask(map), tag_mask, min_support=5)
+            assert (actual.rows, actual.wins) == (expected.rows, expected.wins)
+            for field in ["first", "second", "pair_rows", "pair_wins"]:
+                assert getattr(actual, field).tolist() == getattr(expected, field).tolist()
+
+
+DAY = 24 * 60 * 60 * 1000
+
+
+def _random_tag_sets(days: range, since: int = 0) -> TeamRoundTagSets:
+    tag_sets = TeamRoundTagSets()
+    for day in days:
+        rand = random.Random(day)
+        for i in range(20):
+            tags = [t for t in ["a", "b", "c"] if rand.random() < 0.4]
+            map, win = rand.choice(["ctf_x", "ctf_ash"]), rand.random() < 0.5
+            if day * DAY + i * 1000 >= since:
+                tag_sets.add(map, tags, win, day * DAY + i * 1000)
+    return tag_sets
+
+
+def _day(day: int, seconds: int = 0) -> datetime.datetime:
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(days=day, seconds=seconds)
+
+
+class TestDailyTagWinStats:
+    def test_window_counts_match_counts_of_team_rounds(self):
+        tag_sets = _random_tag_sets(range(19000, 19010))
+        stats = DailyTagWinStats.from_tag_sets(tag_sets)
+
+        expected = tag_sets.counts_by_map()
+        actual = stats.counts_by_map()
+        assert actual.rows.tolist() == expected.rows.tolist()
+        assert actual.tag_wins.tolist() == expected.tag_wins.tolist()
+
+        start = datetime.datetime(1970, 1, 1) + datetime.timedelta(days=19005)
+        row_mask = tag_sets.row_times() >= 19005 * DAY
+        windowed = stats.counts_by_map(start=start)
+        assert windowed.tag_rows.sum() == tag_sets.counts(row_mask).tag_rows.sum()
+        assert windowed.wins.sum() == tag_sets.counts(row_mask).wins
+
+    def test_days_partly_in_range_are_counted_from_rows_or_left_out(self):
+        tag_sets = _random_tag_sets(range(19000, 19010))
+        stats = DailyTagWinStats.from_tag_sets(tag_sets)
+        times = tag_sets.row_times()
+        start, end = _day(19005, seconds=10), _day(19008, seconds=5)
+
+        whole_days = tag_sets.counts((times >= 19006 * DAY) & (times < 19008 * DAY))
+        buckets = stats.counts_by_map(start, end)
+        assert (buckets.rows.sum(), buckets.wins.sum()) == (whole_days.rows, whole_days.wins)
+        assert buckets.tag_rows.sum(axis=0).tolist() == whole_days.tag_rows.tolist()
+
+        exact = tag_sets.counts((times >= 19005 * DAY + 10_000) & (times < 19008 * DAY + 5_000))
+        with_rows = stats.counts_by_map(start, end, tag_sets)
+        assert (with_rows.rows.sum(), with_rows.wins.sum()) == (exact.rows, exact.wins)
+        assert with_rows.tag_rows.sum(axis=0).tolist() == exact.tag_rows.tolist()
+        assert with_rows.tag_wins.sum(axis=0).tolist() == exact.tag_wins.tolist()
+
+    def test_only_whole_days_of_an_import_replace_stored_days(self, tmp_path):
+        path = str(tmp_path / "stats.sqlite")
+        everything = DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19000, 19010)))
+        everything.save(path)
+
+        # an import of a window starting during a stored day
+        start = _day(19005, seconds=10)
+        later = DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19005, 19010), since=19005 * DAY + 10_000))
+        merged = DailyTagWinStats.load(path).merge(later.whole_days(start))
+
+        assert merged.correlations_per_map() == everything.correlations_per_map()
+
+    def test_merging_new_days_equals_collecting_all_days_at_once(self, tmp_path):
+        path = str(tmp_path / "stats.sqlite")
+        everything = DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19000, 19010)))
+        DailyTagWinStats.load(path).merge(DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19000, 19005)))) \
+            .save(path)
+        assert DailyTagWinStats.load(path).resume_date() == datetime.datetime(2022, 1, 12)
+
+        # last stored day is collected again together with new ones, the way an incremental rebuild does
+        merged = DailyTagWinStats.load(path).merge(DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19004, 19010))))
+
+        assert merged.correlations_per_map() == everything.correlations_per_map()
+
+    def test_buckets_are_split_at_era_boundaries(self):
+        tag_sets = _random_tag_sets(range(19000, 19010))
+        boundary = _day(19005, seconds=10)
+        stats = DailyTagWinStats.from_tag_sets(tag_sets, era_boundaries=[boundary])
+
+        exact = tag_sets.counts(tag_sets.row_times() >= 19005 * DAY + 10_000)
+        since = stats.counts_by_map(start=boundary)
+        assert (since.rows.sum(), since.wins.sum()) == (exact.rows, exact.wins)
+        assert since.tag_wins.sum(axis=0).tolist() == exact.tag_wins.tolist()
+
+    def test_statistics_of_other_key_or_eras_arent_loaded(self, tmp_path):
+        path = str(tmp_path / "stats.sqlite")
+        boundaries = [_day(19005, seconds=10)]
+        DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19000, 19010)), boundaries, key="a").save(path)
+
+        assert DailyTagWinStats.load(path, boundaries, key="a").resume_date() == _day(19009)
+        assert DailyTagWinStats.load(path, boundaries, key="b").resume_date() is None
+        assert DailyTagWinStats.load(path, key="a").resume_date() is None
+
+    def test_sliding_window_subtracts_expired_days(self):
+        stats = DailyTagWinStats.from_tag_sets(_random_tag_sets(range(19000, 19010)))
+        for day, counts in stats.sliding_counts(window_days=3):
+            expected = stats.counts_by_map(day - datetime.timedelta(days=2), day + datetime.timedelta(days=1))
+            assert counts.rows.tolist() == expected.rows.tolist()
+            assert counts.tag_rows.tolist() == expected.tag_rows.tolist()
+            assert counts.tag_wins.tolist() == expected.tag_wins.tolist()
+
+
+class TestBootstrapIntervals:
+    def test_intervals_surround_correlation_and_dont_depend_on_worker_count(self):
+        tag_sets = _random_tag_sets(range(19000, 19010))
+        counts = tag_sets.counts_by_map()
+        correlations = counts.correlations()
+
+        intervals = bootstrap_win_correlations(tag_sets, replicates=300, seed=3)
+        assert (intervals.low <= correlations + 1e-12).all()
+        assert (correlations <= intervals.high + 1e-12).all()
+        assert (intervals.high - intervals.low > 0).all()
+
+        parallel = bootstrap_win_correlations(tag_sets, replicates=300, seed=3, workers=2, chunk_size=100)
+        serial = bootstrap_win_correlations(tag_sets, replicates=300, seed=3, workers=1, chunk_size=100)
+        assert np.array_equal(parallel.low, serial.low) and np.array_equal(parallel.high, serial.high)
@@ -0,0 +1,75 @@
+import datetime
+import sqlite3
+
+from s2_analytics.analyze.main_weapon_analyzer import MainWeaponRoundTagger
+from s2_analytics.collect.era_collector import WeaponModEraCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.team_round_tag_collector import TeamRoundTagCorrelationAnalyzer
+from s2_analytics.constants import WeaponModCatalog, WeaponMod, W_BARRETT, W_MP5, WEAPONS_PRIMARY, WEAPONS_SECONDARY
+from s2_analytics.importer import epoch_millis
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+ERAS = WeaponModCatalog([
+    WeaponMod(datetime.datetime(2024, 6, 1), "second", "no link"),
+    WeaponMod(datetime.datetime(2024, 1, 1), "first", "no link"),
+]).eras()
+
+
+def _games():
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for time, map, weapons in [(datetime.datetime(2023, 12, 1), "ctf_ash", [W_BARRETT, W_BARRETT]),
+                               (datetime.datetime(2024, 3, 1), "ctf_x", [W_MP5, W_BARRETT, W_MP5]),
+                               (datetime.datetime(2024, 3, 2), "ctf_ash", [W_MP5])]:
+        builder = factory.add_game(game_start_time=epoch_millis(time)).add_round(start=time, map=map)
+        for weapon in weapons:
+            builder.add_kill(killer="A", weapon=weapon)
+        builder.add_cap(player="A").build()
+    return factory.finish()
+
+
+class TestWeaponModEras:
+    def test_finds_era_of_time(self):
+        assert len(ERAS) == 3
+        assert ERAS.era_of(datetime.datetime(2023, 1, 1)) == 0
+        assert ERAS.era_of(datetime.datetime(2024, 1, 1)) == 1
+        assert ERAS.era_of(datetime.datetime(2024, 7, 1)) == 2
+        assert ERAS.labels() == ["before WeaponMod 2024-01-01", "WeaponMod 2024-01-01", "WeaponMod 2024-06-01"]
+
+    def test_lists_mods_released_after_date(self):
+        assert [str(wm) for wm in ERAS.mods_between(datetime.datetime(2024, 2, 1))] == ["WeaponMod 2024-06-01"]
+        assert ERAS.mods_between(datetime.datetime(2023, 1, 1), datetime.datetime(2024, 2, 1)) == [ERAS.mods[0]]
+
+
+class TestWeaponModEraCollector:
+    def test_counts_weapon_usage_and_map_picks_per_era(self):
+        collector = WeaponModEraCollector(ERAS)
+        process_games(_games(), [collector])
+
+        usage = collector.weapon_usage()
+        assert usage[["era", "weapon", "kills"]].values.tolist() == [
+            ["before WeaponMod 2024-01-01", W_BARRETT, 2],
+            ["WeaponMod 2024-01-01", W_MP5, 3],
+            ["WeaponMod 2024-01-01", W_BARRETT, 1],
+        ]
+        assert usage["percentage"].tolist() == [100.0, 75.0, 25.0]
+
+        picks = collector.map_picks()
+        assert picks[["era", "map", "rounds", "percentage"]].values.tolist() == [
+            ["before WeaponMod 2024-01-01", "ctf_ash", 1, 100.0],
+            ["WeaponMod 2024-01-01", "ctf_ash", 1, 50.0],
+            ["WeaponMod 2024-01-01", "ctf_x", 1, 50.0],
+        ]
+
+    def test_tag_correlations_are_split_by_era_of_round(self):
+        conn = sqlite3.connect("file::memory:")
+        sqlite_collector = SqliteCollector(sqlite_conn=conn).init()
+        analyzer = TeamRoundTagCorrelationAnalyzer(conn, sqlite_collector, [
+            MainWeaponRoundTagger([WEAPONS_PRIMARY, WEAPONS_SECONDARY])
+        ]).init()
+        process_games(_games(), [sqlite_collector, analyzer])
+
+        statistics = analyzer.statistics_per_era(ERAS)
+        assert list(statistics.keys()) == ["before WeaponMod 2024-01-01", "WeaponMod 2024-01-01"]
+        assert statistics["before WeaponMod 2024-01-01"]["Barrett_x1"].sample_count == 1
+        assert statistics["WeaponMod 2024-01-01"]["MP5_x1"].sample_count == 2
@@ -0,0 +1,47 @@
+import datetime
+
+import numpy as np
+
+from s2_analytics.collect.map_trends_collector import MapTrendsCollector
+from s2_analytics.importer import epoch_millis
+from s2_analytics.rolling_average import RollingAveragePeriod
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+
+def _picks():
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for time, maps in [(datetime.datetime(2024, 3, 1, 12), ["ctf_ash", "ctf_x", "ctf_ash"]),
+                       (datetime.datetime(2024, 3, 3, 12), ["ctf_x"])]:
+        builder = factory.add_game(game_start_time=epoch_millis(time))
+        for map in maps:
+            builder.add_round(start=time, map=map, winner="Red")
+        builder.build()
+    collector = MapTrendsCollector()
+    process_games(factory.finish(), [collector])
+    return collector.picks()
+
+
+class TestMapTrendsCollector:
+    def test_counts_rounds_per_day_and_map(self):
+        picks = _picks()
+        assert [str(d.date()) for d in picks.dates()] == ["2024-03-01", "2024-03-02", "2024-03-03"]
+        assert picks.maps.values == ["ctf_ash", "ctf_x"]
+        assert picks.counts.tolist() == [[2, 1], [0, 0], [0, 1]]
+        assert np.allclose(picks.pick_percentages(), [[200 / 3, 100 / 3], [np.nan, np.nan], [0, 100]],
+                           equal_nan=True)
+
+    def test_rolling_pick_percentages_of_selected_maps(self):
+        df = _picks().rolling_pick_percentages(RollingAveragePeriod(3, 1, 0.5), maps=lambda m: m == "ctf_x")
+        assert [str(d.date()) for d in df["date"]] == ["2024-03-01", "2024-03-03"]
+        assert df["mapName"].tolist() == ["ctf_x", "ctf_x"]
+        assert np.allclose(df["pick_percentage"], [100 / 3, 100])
+        assert np.allclose(df["rolling average"], [np.nan, (100 / 3 + 100) / 2], equal_nan=True)
+
+    def test_last_played(self):
+        last_played = _picks().last_played()
+        assert last_played["mapName"].tolist() == ["ctf_x", "ctf_ash"]
+        assert [str(d.date()) for d in last_played["last_played"]] == ["2024-03-03", "2024-03-01"]
+
+    def test_last_played_without_rounds(self):
+        assert len(MapTrendsCollector().picks().last_played()) == 0
@@ -0,0 +1,93 @@
+import datetime
+import json
+import sqlite3
+
+from s2_analytics.analyze.main_weapon_analyzer import MainWeaponRoundTagger
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.tag_win_stats_collector import TagWinStatsCollector
+from s2_analytics.collect.team_round_tag_collector import TeamRoundTagCorrelationAnalyzer
+from s2_analytics.constants import WEAPONS_PRIMARY, W_STEYR, W_BARRETT
+from s2_analytics.importer import epoch_millis
+from s2_analytics.session import AnalysisSession, Report
+from s2_analytics.tools import dump_game_as_json_dict, process_games
+from tests.game_builder import GameBuilderFactory
+
+START = datetime.datetime(2024, 3, 1)
+END = datetime.datetime(2024, 3, 10)
+
+
+def _games(days: range):
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for day in days:
+        for hour, winner, weapon in [(10, "Red", W_STEYR), (14, "Blue", W_BARRETT), (18, "Red", W_BARRETT)]:
+            time = START + datetime.timedelta(days=day, hours=hour)
+            factory.add_game(game_start_time=epoch_millis(time)) \
+                .add_round(start=time, map="ctf_ash" if day % 2 == 0 else "ctf_x", winner=winner) \
+                .add_kill(time, "A", "B", weapon) \
+                .build()
+    return factory.finish()
+
+
+def _write_games(logs_dir, games):
+    for game in games:
+        with open(logs_dir / f"game_{game.details.id:013d}.json", "w") as f:
+            json.dump(dump_game_as_json_dict(game), f)
+    return str(logs_dir)
+
+
+def _report(tmp_path, key: str = "test") -> Report:
+    return Report("correlation", lambda: {"tag_win_stats": TagWinStatsCollector(
+        str(tmp_path / "stats.sqlite"), [MainWeaponRoundTagger([WEAPONS_PRIMARY])], key=key)},
+                  start_date=START, end_date=END)
+
+
+def _analyzer(games) -> TeamRoundTagCorrelationAnalyzer:
+    conn = sqlite3.connect("file::memory:")
+    analyzer = TeamRoundTagCorrelationAnalyzer(conn, SqliteCollector(sqlite_conn=conn).init(),
+                                               [MainWeaponRoundTagger([WEAPONS_PRIMARY])]).init()
+    process_games(games, [analyzer])
+    return analyzer
+
+
+class TestTagWinStatsCollector:
+    def test_later_runs_import_games_from_last_stored_day(self, tmp_path):
+        logs_dir = tmp_path / "logs"
+        logs_dir.mkdir()
+        _write_games(logs_dir, _games(range(0, 3)))
+        AnalysisSession([_report(tmp_path)], str(logs_dir)).run()
+
+        # games of older days aren't read again, only stored statistics of them count
+        (logs_dir / f"game_{epoch_millis(START + datetime.timedelta(hours=10)):013d}.json").unlink()
+        _write_games(logs_dir, _games(range(3, 5)))
+        session = AnalysisSession([_report(tmp_path)], str(logs_dir)).run()
+
+        assert session.import_windows["correlation"] == (START + datetime.timedelta(days=2), END)
+        collector = session.processors["correlation"]["tag_win_stats"]
+        expected, actual = _analyzer(_games(range(0, 5))).correlations(), collector.correlations()
+        assert actual.tag_counts_per_map() == expected.tag_counts_per_map()
+        assert actual.calculate_win_correlation() == expected.calculate_win_correlation()
+        assert collector.summary().to_table() == [
+            ["First game", "2024-03-01"], ["Last game", "2024-03-05"], ["Games total", 15], ["Rounds total", 15],
+            ["Games in playlist `CTF-Standard-6`", 15]]
+
+    def test_statistics_of_other_key_are_collected_again(self, tmp_path):
+        logs_dir = tmp_path / "logs"
+        logs_dir.mkdir()
+        _write_games(logs_dir, _games(range(0, 3)))
+        AnalysisSession([_report(tmp_path)], str(logs_dir)).run()
+
+        session = AnalysisSession([_report(tmp_path, key="other")], str(logs_dir)).run()
+
+        assert session.import_windows["correlation"] == (START, END)
+        assert session.processors["correlation"]["tag_win_stats"].summary().total_games == 9
+
+    def test_first_day_partly_in_window_is_left_out(self, tmp_path):
+        games = _games(range(0, 3))
+        collector = TagWinStatsCollector(str(tmp_path / "stats.sqlite"), [MainWeaponRoundTagger([WEAPONS_PRIMARY])])
+        process_games(games, [collector])
+        window = (START + datetime.timedelta(hours=12), END)
+        collector.finish(window, window)
+
+        expected = _analyzer([g for g in games if g.details.start_time >= START + datetime.timedelta(days=1)])
+        assert collector.correlations().tag_counts_per_map() == expected.correlations().tag_counts_per_map()
+        assert collector.summary().total_games == 6
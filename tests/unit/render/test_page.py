@@ -0,0 +1,35 @@
+import os
+
+import pandas as pd
+from matplotlib import pyplot as plt
+
+from s2_analytics.render.page import MarkdownPage
+
+
+class TestMarkdownPage:
+    def test_writes_blocks_in_order(self, tmp_path):
+        page = MarkdownPage("report", str(tmp_path))
+        page.heading("Title").heading("Section", 2).text("Some text")
+        path = page.save()
+        with open(path) as f:
+            assert f.read() == "# Title\n\n## Section\n\nSome text\n"
+
+    def test_saves_charts_next_to_page(self, tmp_path):
+        page = MarkdownPage("report", str(tmp_path))
+        figures = []
+        for _ in range(2):
+            fig, ax = plt.subplots()
+            ax.plot([1, 2], [3, 4])
+            page.chart(fig)
+            figures.append(fig.number)
+        assert page.blocks == ["![png](report_files/report_0.png)", "![png](report_files/report_1.png)"]
+        assert os.path.isfile(tmp_path / "report_files" / "report_1.png")
+        assert not set(figures) & set(plt.get_fignums())
+
+    def test_tables_and_chart_data(self, tmp_path):
+        page = MarkdownPage("report", str(tmp_path))
+        df = pd.DataFrame({"map": ["ctf_ash"], "count": [3]})
+        page.table(df, index=False).data(df, "maps")
+        assert "<td>ctf_ash</td>" in page.blocks[0]
+        assert page.blocks[1].startswith("Chart data: [csv.gz](data/maps.csv.gz)")
+        assert pd.read_csv(tmp_path / "data" / "maps.csv.gz", index_col=0).equals(df)
@@ -0,0 +1,39 @@
+import datetime
+import json
+
+import pytest
+
+from s2_analytics.importer import epoch_millis
+from s2_analytics.render.catalog import RENDERED_REPORTS
+from s2_analytics.render.report import render_report
+from s2_analytics.tools import dump_game_as_json_dict
+from tests.game_builder import GameBuilderFactory
+
+
+def _write_recent_games(logs_dir):
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    now = datetime.datetime.utcnow().replace(microsecond=0)
+    for days_ago in range(1, 15):
+        time = now - datetime.timedelta(days=days_ago)
+        map = "ctf_ash" if days_ago % 2 == 0 else "ctf_x"
+        factory.add_game(game_start_time=epoch_millis(time),
+                         teams_win_probability={"Red": 0.5, "Blue": 0.5}) \
+            .add_round(start=time, map=map, winner="Red") \
+            .add_kill(time, "A", "B", "Shotgun") \
+            .build()
+    for game in factory.finish():
+        with open(logs_dir / f"game_{game.details.id:013d}.json", "w") as f:
+            json.dump(dump_game_as_json_dict(game), f)
+
+
+@pytest.mark.parametrize("report", RENDERED_REPORTS, ids=lambda r: r.name)
+def test_renders_report_without_notebook(report, tmp_path):
+    logs_dir = tmp_path / "logs"
+    logs_dir.mkdir()
+    _write_recent_games(logs_dir)
+    path = render_report(report, str(logs_dir), str(tmp_path / "session"), str(tmp_path / "markdown"))
+    with open(path) as f:
+        markdown = f.read()
+    assert markdown.startswith("# ")
+    assert f"![png]({report.name}_files/{report.name}_0.png)" in markdown
+    assert (tmp_path / "markdown" / f"{report.name}_files" / f"{report.name}_0.png").is_file()
@@ -0,0 +1,114 @@
+import datetime
+import json
+import os
+import sqlite3
+
+from s2_analytics.analyze.main_weapon_analyzer import MainWeaponRoundTagger
+from s2_analytics.api import write_daily_shards, write_index, write_endpoints, map_picks_by_day, \
+    weapon_kills_by_day, correlations_by_map, days_within
+from s2_analytics.collect.map_trends_collector import MapTrendsCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.summary_collector import SummaryCollector
+from s2_analytics.collect.tag_win_stats_collector import TagWinStatsCollector
+from s2_analytics.constants import WEAPONS_PRIMARY, W_STEYR, W_BARRETT
+from s2_analytics.importer import epoch_millis
+from s2_analytics.reports import MAPS_TRENDS, WEAPON_USAGE_TRENDS, WEAPON_WIN_CORRELATION_RANKED
+from s2_analytics.tools import process_games
+from tests.game_builder import GameBuilderFactory
+
+
+def _read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _processors(directory, since: datetime.datetime = datetime.datetime(2024, 1, 1)):
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for time, map, weapon in [(datetime.datetime(2024, 7, 31, 12), "ctf_ash", W_STEYR),
+                              (datetime.datetime(2024, 8, 1, 12), "ctf_x", W_BARRETT),
+                              (datetime.datetime(2024, 8, 1, 13), "ctf_ash", W_STEYR)]:
+        factory.add_game(game_start_time=epoch_millis(time)) \
+            .add_round(start=time, map=map, winner="Red") \
+            .add_kill(time, "A", "B", weapon) \
+            .build()
+    conn = sqlite3.connect("file::memory:")
+    sqlite_collector = SqliteCollector(sqlite_conn=conn).init()
+    processors = {
+        "sqlite_collector": sqlite_collector,
+        "summary_collector": SummaryCollector(conn, sqlite_collector),
+        "map_trends_collector": MapTrendsCollector(),
+        "tag_win_stats": TagWinStatsCollector(os.path.join(directory, "tag_win_stats.sqlite"), [
+            MainWeaponRoundTagger([WEAPONS_PRIMARY])]),
+    }
+    process_games(factory.finish(), list(processors.values()), game_filters=[lambda g: g.start_time >= since])
+    window = (since, datetime.datetime(2024, 8, 3))
+    processors["tag_win_stats"].finish(window, window)
+    return processors
+
+
+class TestDailyShards:
+    def test_days_are_sharded_by_month_and_merged_with_history(self, tmp_path):
+        write_daily_shards("kills", {"2024-07-31": {"a": 1}, "2024-08-01": {"a": 2}}, str(tmp_path))
+        shards = write_daily_shards("kills", {"2024-08-01": {"a": 3}, "2024-08-02": {"b": 1}}, str(tmp_path))
+        assert shards == ["kills/2024-08.json"]
+        assert _read(tmp_path / "kills" / "2024-07.json") == {"version": 1, "period": "2024-07",
+                                                              "days": {"2024-07-31": {"a": 1}}}
+        assert _read(tmp_path / "kills" / "2024-08.json")["days"] == {"2024-08-01": {"a": 3}, "2024-08-02": {"b": 1}}
+
+    def test_unchanged_shards_are_kept(self, tmp_path):
+        write_daily_shards("kills", {"2024-07-31": {"a": 1}}, str(tmp_path))
+        os.utime(tmp_path / "kills" / "2024-07.json", (0, 0))
+        write_daily_shards("kills", {"2024-07-31": {"a": 1}}, str(tmp_path))
+        assert os.path.getmtime(tmp_path / "kills" / "2024-07.json") == 0
+
+    def test_index_lists_shards_of_endpoints(self, tmp_path):
+        write_daily_shards("kills/daily", {"2024-07-31": {"a": 1}, "2024-08-01": {"a": 2}}, str(tmp_path))
+        write_index(str(tmp_path))
+        assert _read(tmp_path / "index.json") == {"version": 1, "endpoints": {
+            "kills/daily": ["kills/daily/2024-07.json", "kills/daily/2024-08.json"]}}
+
+
+class TestEndpoints:
+    def test_aggregates_of_processors(self, tmp_path):
+        processors = _processors(str(tmp_path))
+        assert weapon_kills_by_day(processors) == {"2024-07-31": {W_STEYR: 1}, "2024-08-01": {W_BARRETT: 1, W_STEYR: 1}}
+        assert map_picks_by_day(processors["map_trends_collector"].picks()) == {
+            "2024-07-31": {"ctf_ash": 1}, "2024-08-01": {"ctf_ash": 1, "ctf_x": 1}}
+        correlations = correlations_by_map(processors)
+        assert sorted(correlations) == ["ctf_ash", "ctf_x"]
+        assert correlations["ctf_ash"][f"{W_STEYR}_x1"]["samples"] == 2
+
+    def test_writes_endpoints_of_given_reports(self, tmp_path):
+        processors = _processors(str(tmp_path))
+        write_endpoints({MAPS_TRENDS.name: processors, WEAPON_USAGE_TRENDS.name: processors,
+                         WEAPON_WIN_CORRELATION_RANKED.name: processors}, str(tmp_path))
+        assert _read(tmp_path / "index.json")["endpoints"] == {
+            "correlations": ["correlations/ranked.json"],
+            "map_picks/daily": ["map_picks/daily/2024-07.json", "map_picks/daily/2024-08.json"],
+            "summary": ["summary.json"],
+            "weapon_kills/daily": ["weapon_kills/daily/2024-07.json", "weapon_kills/daily/2024-08.json"],
+        }
+        assert _read(tmp_path / "summary.json")["games"] == 3
+
+    def test_reports_without_games(self, tmp_path):
+        processors = _processors(str(tmp_path), since=datetime.datetime(2025, 1, 1))
+        write_endpoints({MAPS_TRENDS.name: processors, WEAPON_USAGE_TRENDS.name: processors,
+                         WEAPON_WIN_CORRELATION_RANKED.name: processors}, str(tmp_path))
+        summary = _read(tmp_path / "summary.json")
+        assert (summary["games"], summary["first_game"], summary["last_game"]) == (0, None, None)
+
+    def test_days_partly_outside_window_dont_replace_stored_days(self, tmp_path):
+        first_window = (datetime.datetime(2024, 7, 31), datetime.datetime(2024, 8, 2))
+        write_endpoints({MAPS_TRENDS.name: _processors(str(tmp_path))}, str(tmp_path), {MAPS_TRENDS.name: first_window})
+        # a later run whose window starts in the middle of 2024-08-01 sees only some of that day's games
+        since = datetime.datetime(2024, 8, 1, 12, 30)
+        write_endpoints({MAPS_TRENDS.name: _processors(str(tmp_path), since)}, str(tmp_path),
+                        {MAPS_TRENDS.name: (since, datetime.datetime(2024, 8, 3))})
+        assert _read(tmp_path / "map_picks" / "daily" / "2024-08.json")["days"] == {
+            "2024-08-01": {"ctf_ash": 1, "ctf_x": 1}}
+
+    def test_days_within_window(self):
+        days = {"2024-07-31": {"a": 1}, "2024-08-01": {"a": 2}, "2024-08-02": {"a": 3}}
+        assert days_within(days, (datetime.datetime(2024, 7, 31, 8), datetime.datetime(2024, 8, 2, 8))) == \
+               {"2024-08-01": {"a": 2}}
+        assert days_within(days, None) == days
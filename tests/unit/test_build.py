@@ -0,0 +1,61 @@
+import threading
+import time
+
+from s2_analytics import build
+from s2_analytics.build import build_notebooks, CpuBudget, missing_tools
+
+
+class _Recorder:
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.started = []
+
+    def run(self, notebook: str, cpus: int):
+        with self.lock:
+            self.started.append(notebook)
+            self.in_use += cpus
+            self.max_in_use = max(self.max_in_use, self.in_use)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.in_use -= cpus
+        if notebook == "broken.ipynb":
+            raise RuntimeError("cell failed")
+
+
+class TestBuildNotebooks:
+    def test_runs_notebooks_within_cpu_budget(self):
+        recorder = _Recorder()
+        results = build_notebooks(["a.ipynb", "b.ipynb", "c.ipynb", "wide.ipynb"], cpus=3,
+                                  notebook_cpus={"wide.ipynb": 2}, run=recorder.run)
+        assert sorted(r.notebook for r in results) == ["a.ipynb", "b.ipynb", "c.ipynb", "wide.ipynb"]
+        assert recorder.max_in_use <= 3
+        assert recorder.started[0] == "wide.ipynb"
+        assert {r.notebook: r.cpus for r in results}["wide.ipynb"] == 2
+
+    def test_notebooks_run_in_parallel(self):
+        recorder = _Recorder(seconds=0.2)
+        started = time.perf_counter()
+        build_notebooks([f"{i}.ipynb" for i in range(4)], cpus=4, notebook_cpus={}, run=recorder.run)
+        assert recorder.max_in_use == 4
+        assert time.perf_counter() - started < 0.6
+
+    def test_failures_are_collected_without_stopping_others(self):
+        results = build_notebooks(["broken.ipynb", "ok.ipynb"], cpus=1, notebook_cpus={}, run=_Recorder(0).run)
+        errors = {r.notebook: r.error for r in results}
+        assert errors == {"broken.ipynb": "cell failed", "ok.ipynb": None}
+
+
+def test_requests_over_budget_are_capped():
+    budget = CpuBudget(2)
+    assert budget.acquire(8) == 2
+    assert budget.available == 0
+    budget.release(2)
+    assert budget.available == 2
+
+
+def test_missing_notebook_tools_are_listed(monkeypatch):
+    monkeypatch.setattr(build, "NOTEBOOK_TOOLS", ["json", "no_such_notebook_tool"])
+    assert missing_tools() == ["no_such_notebook_tool"]
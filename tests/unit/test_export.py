@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from s2_analytics.export import export_table, data_links
+
+
+def _usage():
+    return pd.DataFrame({
+        "weapon": ["Barrett", "Deagles", "Barrett", None],
+        "date": pd.to_datetime(["2024-03-01", "2024-03-01", "2024-03-02", "2024-03-02"]),
+        "usage": [75.0, 25.0, np.nan, 100.0],
+    })
+
+
+class TestExportTable:
+    def test_chunks_are_written_as_one_table(self, tmp_path):
+        df = _usage()
+        names = export_table((df.iloc[i:i + 1] for i in range(len(df))), "usage", str(tmp_path))
+        assert names == {"csv.gz": "usage.csv.gz", "npz": "usage.npz", "summary.json": "usage.summary.json"}
+        actual = pd.read_csv(tmp_path / "usage.csv.gz", index_col=0, parse_dates=["date"])
+        pd.testing.assert_frame_equal(actual, df)
+
+    def test_plain_csv_on_request(self, tmp_path):
+        names = export_table(_usage(), "usage", str(tmp_path), formats=["csv", "csv.gz"], chunk_rows=3)
+        assert names == {"csv": "usage.csv", "csv.gz": "usage.csv.gz"}
+        for name in names.values():
+            actual = pd.read_csv(tmp_path / name, index_col=0, parse_dates=["date"])
+            pd.testing.assert_frame_equal(actual, _usage())
+
+    def test_parquet_on_request(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        # nulls only in the second chunk make its schema differ from the first one's
+        df = pd.DataFrame({"weapon": ["Barrett", "Deagles", None, None], "usage": [75.0, 25.0, 10.0, 5.0]})
+        export_table(df, "usage", str(tmp_path), formats=["parquet"], chunk_rows=2)
+        pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "usage.parquet"), df)
+
+        export_table(df.head(0), "empty", str(tmp_path), formats=["parquet"])
+        assert len(pd.read_parquet(tmp_path / "empty.parquet")) == 0
+
+    def test_columnar_form_encodes_strings_and_dates(self, tmp_path):
+        export_table(_usage(), "usage", str(tmp_path), chunk_rows=3)
+        arrays = np.load(tmp_path / "usage.npz")
+        assert arrays["weapon.values"].tolist() == ["Barrett", "Deagles"]
+        assert arrays["weapon.codes"].dtype == np.int8
+        assert arrays["weapon.codes"].tolist() == [0, 1, 0, -1]
+        assert pd.to_datetime(arrays["date.epoch_millis"], unit="ms").equals(pd.DatetimeIndex(_usage()["date"]))
+        assert np.array_equal(arrays["usage"], _usage()["usage"].values, equal_nan=True)
+
+    def test_dictionary_of_strings_is_built_across_chunks(self, tmp_path):
+        df = pd.DataFrame({"map": [f"ctf_{i % 300:03d}" for i in range(1000, 0, -1)], "n": range(1000)})
+        export_table(df, "maps", str(tmp_path), formats=["npz"], chunk_rows=64)
+        arrays = np.load(tmp_path / "maps.npz")
+        assert arrays["map.values"].tolist() == sorted(set(df["map"]))
+        assert arrays["map.codes"].dtype == np.int16
+        assert arrays["map.values"][arrays["map.codes"]].tolist() == df["map"].tolist()
+        assert arrays["n"].tolist() == list(range(1000))
+
+    def test_summary_of_columns(self, tmp_path):
+        export_table(_usage(), "usage", str(tmp_path), chunk_rows=3)
+        with open(tmp_path / "usage.summary.json") as f:
+            summary = json.load(f)
+        weapon, date, usage = summary["columns"]
+        assert summary["rows"] == 4
+        assert weapon == {"name": "weapon", "kind": "string", "count": 4, "nulls": 1, "distinct": 2,
+                          "top": {"Barrett": 2, "Deagles": 1}}
+        assert (date["min"], date["max"]) == ("2024-03-01T00:00:00", "2024-03-02T00:00:00")
+        assert usage == {"name": "usage", "kind": "number", "count": 4, "nulls": 1, "min": 25.0, "max": 100.0,
+                         "mean": 200 / 3}
+
+    def test_unchanged_files_are_kept(self, tmp_path):
+        export_table(_usage(), "usage", str(tmp_path))
+        paths = [tmp_path / name for name in sorted(os.listdir(tmp_path))]
+        for path in paths:
+            os.utime(path, (0, 0))
+        export_table(_usage(), "usage", str(tmp_path))
+        assert [os.path.getmtime(p) for p in paths] == [0] * len(paths)
+        assert sorted(os.listdir(tmp_path)) == [p.name for p in paths]
+
+        export_table(_usage().head(2), "usage", str(tmp_path))
+        assert os.path.getmtime(tmp_path / "usage.csv.gz") > 0
+
+    def test_links_to_exported_files(self):
+        assert data_links({"csv.gz": "x.csv.gz", "npz": "x.npz"}) == \
+               "Chart data: [csv.gz](data/x.csv.gz), [npz](data/x.npz)"
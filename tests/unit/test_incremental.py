@@ -0,0 +1,104 @@
+import datetime
+import json
+import os
+
+from s2_analytics.importer import epoch_millis
+from s2_analytics.incremental import BuildManifest, report_fingerprints, code_version, GameIndex
+from s2_analytics.session import Report
+from s2_analytics.tools import dump_game_as_json_dict
+from tests.game_builder import GameBuilderFactory
+
+DAY_1 = datetime.datetime(2024, 3, 1, 12)
+DAY_2 = datetime.datetime(2024, 3, 2, 12)
+DAY_3 = datetime.datetime(2024, 3, 3, 12)
+
+
+def _write_game(logs_dir, time: datetime.datetime, playlist: str = "CTF-Standard-6"):
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    millis = epoch_millis(time)
+    factory.add_game(game_start_time=millis, playlist=playlist).add_round(start=time, winner="Red").build()
+    with open(logs_dir / f"game_{millis:013d}.json", "w") as f:
+        json.dump(dump_game_as_json_dict(factory.finish()[0]), f)
+    return logs_dir / f"game_{millis:013d}.json"
+
+
+def _reports():
+    return [Report("early", dict, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_2),
+            Report("ctf6", dict, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_3,
+                   game_filters=[lambda g: g.playlist_code == "CTF-Standard-6"])]
+
+
+class TestReportFingerprints:
+    def test_change_only_when_selected_games_change(self, tmp_path):
+        logs_dir, index = tmp_path / "logs", str(tmp_path / "index.pickle")
+        logs_dir.mkdir()
+        _write_game(logs_dir, DAY_1)
+        before = report_fingerprints(_reports(), str(logs_dir), index)
+        assert report_fingerprints(_reports(), str(logs_dir), index) == before
+
+        _write_game(logs_dir, DAY_3, playlist="CTF-Standard-4")
+        assert report_fingerprints(_reports(), str(logs_dir), index) == before
+
+        _write_game(logs_dir, DAY_3)
+        after = report_fingerprints(_reports(), str(logs_dir), index)
+        assert after["early"] == before["early"]
+        assert after["ctf6"] != before["ctf6"]
+
+    def test_indexed_logs_arent_read_again_unless_changed(self, tmp_path):
+        logs_dir, index = tmp_path / "logs", str(tmp_path / "index.pickle")
+        logs_dir.mkdir()
+        log = _write_game(logs_dir, DAY_1)
+        before = report_fingerprints(_reports(), str(logs_dir), index)
+
+        # same size and modification time, but no longer a game log
+        stat = os.stat(log)
+        log.write_text(" " * stat.st_size)
+        os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert report_fingerprints(_reports(), str(logs_dir), index) == before
+
+        _write_game(logs_dir, DAY_1, playlist="CTF-Standard-4")
+        assert report_fingerprints(_reports(), str(logs_dir), index)["ctf6"] != before["ctf6"]
+
+    def test_index_of_other_code_is_dropped(self, tmp_path):
+        _write_game(tmp_path, DAY_1)
+        index = GameIndex(str(tmp_path / "index.pickle"), "v1")
+        assert len(index.games(str(tmp_path), DAY_1 - datetime.timedelta(hours=1), DAY_2)) == 1
+        index.save()
+        assert len(GameIndex(str(tmp_path / "index.pickle"), "v1").entries) == 1
+        assert GameIndex(str(tmp_path / "index.pickle"), "v2").entries == {}
+
+    def test_code_version_is_stable(self):
+        assert code_version() == code_version()
+
+
+class TestBuildManifest:
+    def test_report_is_current_with_same_fingerprint_and_output(self, tmp_path):
+        manifest = BuildManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+        manifest.record("report", "abc")
+        manifest.save()
+        manifest = BuildManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+        assert not manifest.is_current("report", "abc")
+
+        (tmp_path / "report.md").write_text("# Report")
+        assert manifest.is_current("report", "abc")
+        assert not manifest.is_current("report", "def")
+        assert not manifest.is_current("report", None)
+        manifest.forget("report")
+        assert not manifest.is_current("report", "abc")
+
+    def test_report_isnt_current_without_any_of_its_outputs(self, tmp_path):
+        (tmp_path / "report_files").mkdir()
+        (tmp_path / "report_files" / "report_0.png").write_bytes(b"png")
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "usage.csv").write_text("a,b")
+        (tmp_path / "report.md").write_text("# Report\n\n![png](report_files/report_0.png)\n\n"
+                                            "Chart data: [csv](data/usage.csv), [site](https://example.com/x)\n")
+        manifest = BuildManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+        manifest.record("report", "abc")
+        manifest.save()
+
+        manifest = BuildManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+        assert manifest.entries["report"]["outputs"] == ["data/usage.csv", "report.md", "report_files/report_0.png"]
+        assert manifest.is_current("report", "abc")
+        (tmp_path / "report_files" / "report_0.png").unlink()
+        assert not manifest.is_current("report", "abc")
@@ -0,0 +1,97 @@
+import datetime
+import json
+import time
+
+from s2_analytics.collect.object_collector import GameObjectCollector
+from s2_analytics.importer import JsonGameDeserializer, import_games, RoundData, GameDetails, epoch_millis
+from s2_analytics.instrumentation import ImportStats
+from s2_analytics.session import AnalysisSession, Report
+from s2_analytics.tools import dump_game_as_json_dict
+from tests.game_builder import GameBuilderFactory
+
+DAY_1 = datetime.datetime(2024, 3, 1, 12)
+
+
+def _games():
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for hours, playlist in [(0, "CTF-Standard-6"), (1, "CTF-Standard-6"), (2, "TDM")]:
+        time = DAY_1 + datetime.timedelta(hours=hours)
+        factory.add_game(game_start_time=epoch_millis(time), playlist=playlist) \
+            .add_round(start=time, map="ctf_ash", winner="Red") \
+            .add_kill(time, "A", "B", "Barrett") \
+            .add_kill(time, "B", "A", "Barrett") \
+            .add_round(start=time, map="ctf_x", winner="Blue") \
+            .build()
+    return [dump_game_as_json_dict(g) for g in factory.finish()]
+
+
+class _SlowRounds:
+    def process_round(self, round: RoundData, game: GameDetails):
+        time.sleep(0.01)
+
+
+class TestImportStats:
+    def test_counts_calls_of_each_hook_of_each_processor(self):
+        stats = ImportStats()
+        decoder = JsonGameDeserializer([GameObjectCollector(), _SlowRounds()],
+                                       game_filters=[lambda g: "CTF" in g.playlist_code], stats=stats)
+        for game in _games():
+            decoder.deserialize_game(game)
+
+        report = stats.to_dict()
+        assert (report["games"], report["skipped_games"], report["rounds"], report["events"]) == (2, 1, 4, 8)
+        hooks = report["processors"]["GameObjectCollector"]["hooks"]
+        assert {hook: timing["calls"] for hook, timing in hooks.items()} == \
+               {"process_game": 2, "process_round": 4, "process_event": 8}
+        assert list(report["processors"]["_SlowRounds"]["hooks"]) == ["process_round"]
+        assert report["processors"]["_SlowRounds"]["seconds"] >= 0.04
+        assert report["seconds"]["processors"] >= 0.04
+        assert report["seconds"]["decode"] < report["seconds"]["processors"]
+
+    def test_processors_get_the_same_games(self):
+        timed, plain = GameObjectCollector(), GameObjectCollector()
+        timed_decoder = JsonGameDeserializer([timed], stats=ImportStats())
+        plain_decoder = JsonGameDeserializer([plain])
+        for game in _games():
+            timed_decoder.deserialize_game(game)
+            plain_decoder.deserialize_game(game)
+        assert len(timed.games) == 3
+        assert timed.games == plain.games
+
+    def test_processors_of_the_same_class_are_told_apart(self):
+        stats = ImportStats()
+        JsonGameDeserializer([_SlowRounds(), _SlowRounds()], stats=stats)
+        assert list(stats.processors) == ["_SlowRounds", "_SlowRounds#2"]
+
+    def test_times_reading_and_parsing_files(self, tmp_path):
+        for game in _games():
+            with open(tmp_path / f"game_{game['startTime']:013d}.json", "w") as f:
+                json.dump(game, f)
+        stats = ImportStats()
+        import_games(str(tmp_path), start_date=DAY_1 - datetime.timedelta(days=1),
+                     end_date=DAY_1 + datetime.timedelta(days=1), processors=[GameObjectCollector()], stats=stats)
+
+        assert stats.files == 3
+        assert stats.bytes == sum(f.stat().st_size for f in tmp_path.iterdir())
+        assert stats.read_seconds > 0 and stats.parse_seconds > 0
+        assert stats.to_dict()["per_second"]["games"] > 0
+
+    def test_session_times_processors_of_each_report(self, tmp_path):
+        for game in _games():
+            with open(tmp_path / f"game_{game['startTime']:013d}.json", "w") as f:
+                json.dump(game, f)
+        report = Report("slow", lambda: {"objects": GameObjectCollector(), "slow": _SlowRounds()},
+                        start_date=DAY_1 - datetime.timedelta(days=1), end_date=DAY_1 + datetime.timedelta(days=1))
+        stats = ImportStats()
+        session = AnalysisSession([report], str(tmp_path)).run(stats)
+
+        processors = stats.to_dict()["processors"]
+        assert processors["slow/slow"]["caller"] == "slow"
+        assert processors["slow/slow"]["hooks"]["process_round"]["calls"] == 6
+        assert processors["slow"]["seconds"] >= processors["slow/slow"]["seconds"]
+        assert stats.processors_seconds == processors["slow"]["seconds"]
+        assert isinstance(session.processors["slow"]["objects"], GameObjectCollector)
+        table = stats.table().splitlines()
+        assert [line.split()[0] for line in table[2:]] == \
+               ["read", "parse", "decode", "slow", "process_game", "process_round", "process_event",
+                "slow/slow", "process_round", "slow/objects", "process_game", "process_round", "process_event"]
@@ -1,4 +1,7 @@
-from s2_analytics.rolling_average import RollingAveragePeriod
+import numpy as np
+import pandas as pd
+
+from s2_analytics.rolling_average import RollingAveragePeriod, rolling_mean
 
 
 def test_periods_visible():
@@ -19,3 +22,21 @@ def test_min_days_for_average():
 def test_total_period_days():
     period = RollingAveragePeriod(10, 3, 0.5)
     assert period.total_days_visible == 30
+
+
+def test_rolling_mean_skips_days_without_values():
+    values = np.array([[1.], [np.nan], [3.], [5.], [np.nan], [np.nan], [np.nan]])
+    means = rolling_mean(values, window_days=3, min_days=2)
+    assert np.allclose(means[:, 0], [np.nan, np.nan, 2., 4., np.nan, np.nan, np.nan], equal_nan=True)
+
+
+def test_rolling_mean_matches_pandas_time_window():
+    rng = np.random.default_rng(1)
+    values = np.where(rng.random((60, 3)) < 0.3, np.nan, rng.random((60, 3)))
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    means = rolling_mean(values, window_days=7, min_days=3)
+    for column in range(3):
+        series = pd.Series(values[:, column], index=dates).dropna()
+        expected = series.rolling("7D", min_periods=3).mean()
+        assert np.allclose(means[:, column][~np.isnan(values[:, column])], expected.values, equal_nan=True)
+        assert np.isnan(means[:, column][np.isnan(values[:, column])]).all()
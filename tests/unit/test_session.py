@@ -0,0 +1,115 @@
+import datetime
+import json
+import sqlite3
+
+from s2_analytics.collect.object_collector import GameObjectCollector
+from s2_analytics.collect.sqlite_collector import SqliteCollector
+from s2_analytics.collect.summary_collector import SummaryCollector
+from s2_analytics.importer import epoch_millis
+from s2_analytics.instrumentation import ImportStats
+from s2_analytics.session import AnalysisSession, Report, report_processors
+from s2_analytics.tools import dump_game_as_json_dict
+from tests.game_builder import GameBuilderFactory
+
+DAY_1 = datetime.datetime(2024, 3, 1, 12)
+DAY_2 = datetime.datetime(2024, 3, 2, 12)
+DAY_3 = datetime.datetime(2024, 3, 3, 12)
+
+
+def _write_games(logs_dir):
+    factory = GameBuilderFactory(teams={"Red": ["A"], "Blue": ["B"]})
+    for time, playlist in [(DAY_1, "CTF-Standard-6"), (DAY_2, "CTF-Standard-4"), (DAY_3, "CTF-Standard-6")]:
+        factory.add_game(game_start_time=epoch_millis(time), playlist=playlist) \
+            .add_round(start=time, map="ctf_ash", winner="Red") \
+            .add_kill(time, "A", "B", "Shotgun") \
+            .build()
+    for game in factory.finish():
+        with open(logs_dir / f"game_{game.details.id:013d}.json", "w") as f:
+            json.dump(dump_game_as_json_dict(game), f)
+    return str(logs_dir)
+
+
+def _objects():
+    return {"objects": GameObjectCollector()}
+
+
+def _sqlite_with_summary():
+    conn = sqlite3.connect("file::memory:")
+    sqlite_collector = SqliteCollector(sqlite_conn=conn).init()
+    return {"sqlite_collector": sqlite_collector, "summary_collector": SummaryCollector(conn, sqlite_collector)}
+
+
+def _start_times(collector: GameObjectCollector):
+    return [g.details.start_time for g in collector.games]
+
+
+class TestAnalysisSession:
+    def test_reports_see_games_of_their_window_and_filters(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        early = Report("early", _objects, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_2)
+        late = Report("late", _objects, start_date=DAY_2 - datetime.timedelta(hours=1), end_date=DAY_3,
+                      game_filters=[lambda g: g.playlist_code == "CTF-Standard-6"])
+        session = AnalysisSession([early, late], logs_dir).run()
+        assert _start_times(session.processors["early"]["objects"]) == [DAY_1, DAY_2]
+        assert _start_times(session.processors["late"]["objects"]) == [DAY_3]
+        assert [type(e).__name__ for e in session.processors["late"]["objects"].events[0]] == \
+               ["EventFlagCap", "EventKill"]
+
+    def test_reports_copy_their_games_from_one_sqlite_ingest(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        early = Report("early", _sqlite_with_summary, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_2)
+        late = Report("late", _sqlite_with_summary, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_3,
+                      game_filters=[lambda g: g.playlist_code == "CTF-Standard-6"])
+        stats = ImportStats()
+        session = AnalysisSession([early, late], logs_dir).run(stats)
+
+        # DAY_1 is ingested once for both reports
+        assert stats.processors["shared_sqlite/sqlite_collector"]["process_game"].calls == 3
+        for name, days in [("early", [DAY_1, DAY_2]), ("late", [DAY_1, DAY_3])]:
+            connection = session.processors[name]["sqlite_collector"].connection
+            assert connection.execute("SELECT id FROM game ORDER BY id").fetchall() == \
+                   [(epoch_millis(day),) for day in days]
+            assert connection.execute("SELECT count(*) FROM event_kill").fetchone()[0] == len(days)
+            assert session.processors[name]["summary_collector"].get_summary().total_rounds == len(days)
+
+    def test_saved_processors_share_loaded_database(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        report = Report("summary", _sqlite_with_summary, start_date=DAY_1 - datetime.timedelta(hours=1),
+                        end_date=DAY_3)
+        session = AnalysisSession([report], logs_dir).run()
+        session.save(str(tmp_path / "session"))
+        processors = report_processors(report, logs_dir, str(tmp_path / "session"))
+        assert processors["summary_collector"].conn is processors["sqlite_collector"].connection
+        count = processors["sqlite_collector"].connection.execute("SELECT count(*) FROM game").fetchone()[0]
+        assert count == 3
+
+    def test_report_is_imported_alone_without_saved_session(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        report = Report("objects", _objects, start_date=DAY_2 - datetime.timedelta(hours=1), end_date=DAY_3)
+        processors = report_processors(report, logs_dir, str(tmp_path / "missing"))
+        assert _start_times(processors["objects"]) == [DAY_2, DAY_3]
+
+    def test_saved_processors_of_other_logs_are_imported_again(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        report = Report("objects", _objects, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_3)
+        AnalysisSession([report], logs_dir).run().save(str(tmp_path / "session"))
+        (tmp_path / f"game_{epoch_millis(DAY_1):013d}.json").unlink()
+
+        processors = report_processors(report, logs_dir, str(tmp_path / "session"))
+        assert _start_times(processors["objects"]) == [DAY_2, DAY_3]
+
+    def test_saved_processors_of_another_window_are_imported_again(self, tmp_path):
+        logs_dir = _write_games(tmp_path)
+        AnalysisSession([Report("objects", _objects, start_date=DAY_1 - datetime.timedelta(hours=1), end_date=DAY_3)],
+                        logs_dir).run().save(str(tmp_path / "session"))
+
+        later = Report("objects", _objects, start_date=DAY_2 - datetime.timedelta(hours=1), end_date=DAY_3)
+        processors = report_processors(later, logs_dir, str(tmp_path / "session"))
+        assert _start_times(processors["objects"]) == [DAY_2, DAY_3]
+
+    def test_window_relative_to_now_is_computed_when_run(self):
+        report = Report("recent", _objects, period_days=30)
+        start, end = report.window()
+        now = datetime.datetime.today()
+        assert now - datetime.timedelta(days=30, minutes=1) < start <= now - datetime.timedelta(days=30)
+        assert now < end <= now + datetime.timedelta(days=1)